@@ -25,6 +25,47 @@ class Config:
     translate_api_key: str
     fred_api_key: str
     price_alert_pct: float
+    price_alert_windows: str
+    watch_base_interval: float
+    watch_hot_interval: float
+    notify_global_rate: float
+    notify_chat_rate: float
+    notify_senders: int
+    discord_notify_global_rate: float
+    discord_notify_chat_rate: float
+    discord_shard_count: int
+    discord_shard_ids: str
+    discord_shard_processes: int
+    rate_limit_backend: str
+    rate_limit_db: str
+    provider_quota_wait: float
+    slow_action_ms: float
+    slow_log_sample: float
+    metrics_port: int
+    prefetch_max_inflight: int
+    prefetch_per_user: int
+    prefetch_min_share: float
+    cache_backend: str
+    cache_db: str
+    background_jobs: bool
+    job_lease_ttl: float
+    conversation_cache_size: int
+    broadcast_rate: float
+    broadcast_senders: int
+    broadcast_batch: int
+    conversation_flush_seconds: float
+    log_file: str
+    log_level: str
+    log_max_bytes: int
+    log_rotate_seconds: float
+    log_backups: int
+    log_sample: str
+    supervisor_workers: str
+    supervisor_run_dir: str
+    mini_app_host: str
+    mini_app_port: int
+    mini_app_auth_ttl: float
+    mini_app_auth_cache: int
 
     stripe_secret_key: str
     stripe_webhook_secret: str
@@ -38,6 +79,13 @@ class Config:
     admin_user_ids: set[int]
     discord_server_url: str
     telegram_bot_username: str
+    telegram_mode: str
+    telegram_api_base_url: str
+    telegram_webhook_url: str
+    telegram_webhook_listen: str
+    telegram_webhook_port: int
+    telegram_webhook_secret: str
+    telegram_concurrency: int
 
 
 def _get_env(name: str, default: str = '') -> str:
@@ -73,6 +121,47 @@ def load_config() -> Config:
         translate_api_key=_get_env('TRANSLATE_API_KEY'),
         fred_api_key=_get_env('FRED_API_KEY'),
         price_alert_pct=float(_get_env('PRICE_ALERT_PCT', '1.0') or 1.0),
+        price_alert_windows=_get_env('PRICE_ALERT_WINDOWS', '5m,1h,24h'),
+        watch_base_interval=float(_get_env('WATCH_BASE_INTERVAL', '300') or 300),
+        watch_hot_interval=float(_get_env('WATCH_HOT_INTERVAL', '30') or 30),
+        notify_global_rate=float(_get_env('NOTIFY_GLOBAL_RATE', '30') or 30),
+        notify_chat_rate=float(_get_env('NOTIFY_CHAT_RATE', '1') or 1),
+        notify_senders=int(_get_env('NOTIFY_SENDERS', '8') or 8),
+        discord_notify_global_rate=float(_get_env('DISCORD_NOTIFY_GLOBAL_RATE', '40') or 40),
+        discord_notify_chat_rate=float(_get_env('DISCORD_NOTIFY_CHAT_RATE', '1') or 1),
+        discord_shard_count=int(_get_env('DISCORD_SHARD_COUNT', '0') or 0),
+        discord_shard_ids=_get_env('DISCORD_SHARD_IDS'),
+        discord_shard_processes=int(_get_env('DISCORD_SHARD_PROCESSES', '1') or 1),
+        rate_limit_backend=_get_env('RATE_LIMIT_BACKEND', 'memory').lower(),
+        rate_limit_db=_get_env('RATE_LIMIT_DB', './data/limits.db'),
+        provider_quota_wait=float(_get_env('PROVIDER_QUOTA_MAX_WAIT', '15') or 15),
+        slow_action_ms=float(_get_env('SLOW_ACTION_MS', '1000') or 1000),
+        slow_log_sample=float(_get_env('SLOW_LOG_SAMPLE', '0.2') or 0.2),
+        metrics_port=int(_get_env('METRICS_PORT', '0') or 0),
+        prefetch_max_inflight=int(_get_env('PREFETCH_MAX_INFLIGHT', '8') or 8),
+        prefetch_per_user=int(_get_env('PREFETCH_PER_USER', '1') or 1),
+        prefetch_min_share=float(_get_env('PREFETCH_MIN_SHARE', '0.35') or 0.35),
+        cache_backend=_get_env('CACHE_BACKEND', 'memory').lower(),
+        cache_db=_get_env('CACHE_DB', './data/cache.db'),
+        background_jobs=_get_env('BACKGROUND_JOBS', '1').lower() not in ('0', 'false', 'no', 'off'),
+        job_lease_ttl=float(_get_env('JOB_LEASE_TTL', '15') or 15),
+        broadcast_rate=float(_get_env('BROADCAST_RATE', '25') or 25),
+        broadcast_senders=int(_get_env('BROADCAST_SENDERS', '32') or 32),
+        broadcast_batch=int(_get_env('BROADCAST_BATCH', '1000') or 1000),
+        conversation_cache_size=int(_get_env('CONVERSATION_CACHE_SIZE', '10000') or 10000),
+        conversation_flush_seconds=float(_get_env('CONVERSATION_FLUSH_SECONDS', '1') or 1),
+        log_file=_get_env('LOG_FILE', './logs/telegram.log'),
+        log_level=_get_env('LOG_LEVEL', 'INFO').upper(),
+        log_max_bytes=int(_get_env('LOG_MAX_BYTES', '10485760') or 10485760),
+        log_rotate_seconds=float(_get_env('LOG_ROTATE_SECONDS', '86400') or 86400),
+        log_backups=int(_get_env('LOG_BACKUPS', '7') or 7),
+        log_sample=_get_env('LOG_SAMPLE', 'callback=0.2,message=0.2'),
+        supervisor_workers=_get_env('SUPERVISOR_WORKERS', 'telegram,discord,jobs,api'),
+        supervisor_run_dir=_get_env('SUPERVISOR_RUN_DIR', './data/run'),
+        mini_app_host=_get_env('MINI_APP_HOST', '0.0.0.0'),
+        mini_app_port=int(_get_env('MINI_APP_PORT', '8000') or 8000),
+        mini_app_auth_ttl=float(_get_env('MINI_APP_AUTH_TTL', '86400') or 86400),
+        mini_app_auth_cache=int(_get_env('MINI_APP_AUTH_CACHE', '10000') or 10000),
 
         stripe_secret_key=_get_env('STRIPE_SECRET_KEY'),
         stripe_webhook_secret=_get_env('STRIPE_WEBHOOK_SECRET'),
@@ -86,4 +175,11 @@ def load_config() -> Config:
         admin_user_ids=admin_set,
         discord_server_url=_get_env('DISCORD_SERVER_URL'),
         telegram_bot_username=_get_env('TELEGRAM_BOT_USERNAME'),
+        telegram_mode=_get_env('TELEGRAM_MODE', 'polling').lower(),
+        telegram_api_base_url=_get_env('TELEGRAM_API_BASE_URL'),
+        telegram_webhook_url=_get_env('TELEGRAM_WEBHOOK_URL'),
+        telegram_webhook_listen=_get_env('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0'),
+        telegram_webhook_port=int(_get_env('TELEGRAM_WEBHOOK_PORT', '8443') or 8443),
+        telegram_webhook_secret=_get_env('TELEGRAM_WEBHOOK_SECRET'),
+        telegram_concurrency=int(_get_env('TELEGRAM_CONCURRENCY', '64') or 64),
     )
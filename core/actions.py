@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True, slots=True)
+class ActionSpec:
+    name: str
+    handler: Callable[..., Any]
+    back: str = 'main'
+    gate: str | None = None
+    admin: bool = False
+    payload: bool = False
+    arg: str | None = None
+    ttl: float | None = None
+
+
+def action(
+    name: str,
+    back: str = 'main',
+    gate: str | None = None,
+    admin: bool = False,
+    payload: bool = False,
+    arg: str | None = None,
+    ttl: float | None = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        specs = func.__dict__.setdefault('__actions__', [])
+        specs.append(dict(name=name, back=back, gate=gate, admin=admin, payload=payload, arg=arg, ttl=ttl))
+        return func
+    return decorator
+
+
+def collect_actions(cls: type) -> dict[str, ActionSpec]:
+    registry: dict[str, ActionSpec] = {}
+    for klass in reversed(cls.__mro__):
+        for attr in vars(klass).values():
+            for meta in getattr(attr, '__actions__', ()):
+                registry[meta['name']] = ActionSpec(handler=attr, **meta)
+    return registry
+
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from config import load_config
+from services.conversation_service import ConversationService
+
+logger = logging.getLogger('conversation_state')
+
+# The resolved UserContext is deliberately not persisted: it is looked up through
+# user_cache on every update so tier, language and admin changes apply at once.
+PERSISTED_KEYS = frozenset({
+    'awaiting',
+    'awaiting_action',
+    'menu_message_id',
+    'menu_chat_id',
+    'portfolio_add_type',
+    'favorites_add_type',
+})
+
+
+class UserState(dict):
+    def __init__(self, store: ConversationStore, user_id: int) -> None:
+        super().__init__()
+        self._store = store
+        self._user_id = user_id
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._changed(key)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._changed(key)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._changed(key)
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        super().clear()
+        self._store.mark_dirty(self._user_id, self)
+
+    def _changed(self, key: str) -> None:
+        if key in PERSISTED_KEYS:
+            self._store.mark_dirty(self._user_id, self)
+
+    def dump(self) -> str:
+        data = {key: value for key, value in self.items() if key in PERSISTED_KEYS}
+        return json.dumps(data, ensure_ascii=False)
+
+    def restore(self, raw: str) -> None:
+        data = json.loads(raw)
+        for key in PERSISTED_KEYS:
+            if key in data:
+                super().__setitem__(key, data[key])
+            else:
+                super().pop(key, None)
+
+
+class ConversationStore:
+    def __init__(
+        self,
+        platform: str,
+        service: ConversationService | None = None,
+        maxsize: int = 10000,
+        flush_interval: float = 1.0,
+        revalidate_after: float = 5.0,
+    ) -> None:
+        self.platform = platform
+        self.service = service or ConversationService()
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.revalidate_after = revalidate_after
+        self._entries: OrderedDict[int, UserState] = OrderedDict()
+        self._loaded_at: dict[int, float] = {}
+        self._dirty: dict[int, UserState] = {}
+        self._task: asyncio.Task | None = None
+        self.counters = {'loads': 0, 'restored': 0, 'flushes': 0, 'written': 0, 'evicted': 0, 'errors': 0}
+
+    def get(self, user_id: int) -> UserState:
+        state = self._entries.get(user_id)
+        if state is None:
+            state = self._entries[user_id] = UserState(self, user_id)
+            self._evict()
+        else:
+            self._entries.move_to_end(user_id)
+        return state
+
+    async def load(self, user_id: int) -> UserState:
+        state = self.get(user_id)
+        now = time.monotonic()
+        if user_id in self._dirty or now - self._loaded_at.get(user_id, -self.revalidate_after) < self.revalidate_after:
+            return state
+        self._loaded_at[user_id] = now
+        self.counters['loads'] += 1
+        try:
+            raw = await self.service.load(self.platform, str(user_id))
+        except Exception:
+            self.counters['errors'] += 1
+            logger.warning("Failed to load conversation state user_id=%s", user_id)
+            return state
+        if raw is not None and user_id not in self._dirty:
+            state.restore(raw)
+            self.counters['restored'] += 1
+        return state
+
+    def mark_dirty(self, user_id: int, state: UserState) -> None:
+        self._dirty[user_id] = state
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        batch, self._dirty = self._dirty, {}
+        rows = [(str(user_id), state.dump()) for user_id, state in batch.items()]
+        try:
+            await self.service.save_many(self.platform, rows)
+        except Exception:
+            self.counters['errors'] += 1
+            logger.exception("Failed to flush %s conversation states", len(rows))
+            for user_id, state in batch.items():
+                self._dirty.setdefault(user_id, state)
+            return
+        now = time.monotonic()
+        for user_id in batch:
+            self._loaded_at[user_id] = now
+        self.counters['flushes'] += 1
+        self.counters['written'] += len(rows)
+        self._evict()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f'{self.platform}-conversation-flush')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'size': len(self._entries), 'dirty': len(self._dirty)}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _evict(self) -> None:
+        excess = len(self._entries) - self.maxsize
+        if excess <= 0:
+            return
+        victims: list[int] = []
+        for user_id in self._entries:
+            if len(victims) >= excess:
+                break
+            if user_id not in self._dirty:
+                victims.append(user_id)
+        for user_id in victims:
+            del self._entries[user_id]
+            self._loaded_at.pop(user_id, None)
+        self.counters['evicted'] += len(victims)
+
+
+def _build(platform: str) -> ConversationStore:
+    cfg = load_config()
+    return ConversationStore(platform, maxsize=cfg.conversation_cache_size, flush_interval=cfg.conversation_flush_seconds)
+
+
+telegram_state = _build('telegram')
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+logger = logging.getLogger('dispatcher')
+
+MAX_MESSAGE_LEN = 4000
+MAX_CHAT_BUCKETS = 10000
+
+SendFunc = Callable[[object, str], Awaitable[None]]
+RetryAfterFunc = Callable[[BaseException], 'float | None']
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        send: SendFunc,
+        retry_after: RetryAfterFunc | None = None,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        senders: int = 8,
+        queue_size: int = 10000,
+        coalesce_delay: float = 1.0,
+        max_attempts: int = 3,
+        name: str = 'notify',
+        global_bucket: TokenBucket | None = None,
+    ) -> None:
+        self._send = send
+        self._retry_after = retry_after
+        self._global = global_bucket or TokenBucket(global_rate)
+        self._chat_rate = chat_rate
+        self._chat_buckets: OrderedDict[object, TokenBucket] = OrderedDict()
+        self._pending: dict[object, list[str]] = {}
+        self._first_seen: dict[object, float] = {}
+        self._queue: asyncio.Queue[object] = asyncio.Queue(maxsize=queue_size)
+        self._senders = max(1, senders)
+        self._tasks: list[asyncio.Task] = []
+        self._coalesce_delay = coalesce_delay
+        self._max_attempts = max_attempts
+        self._paused_until = 0.0
+        self.name = name
+        self.counters = {'submitted': 0, 'sent': 0, 'coalesced': 0, 'retried': 0, 'failed': 0, 'dropped': 0}
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(), name=f'{self.name}-sender-{i}') for i in range(self._senders)]
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s: %s chats still pending at shutdown", self.name, len(self._pending))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, chat_id: object, text: str) -> bool:
+        self.counters['submitted'] += 1
+        lines = self._pending.get(chat_id)
+        if lines is not None:
+            lines.append(text)
+            self.counters['coalesced'] += 1
+            return True
+        try:
+            self._queue.put_nowait(chat_id)
+        except asyncio.QueueFull:
+            self.counters['dropped'] += 1
+            return False
+        self._pending[chat_id] = [text]
+        self._first_seen[chat_id] = time.monotonic()
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self.counters,
+            'queue_depth': self._queue.qsize(),
+            'pending_chats': len(self._pending),
+            'chat_buckets': len(self._chat_buckets),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._queue.get()
+            try:
+                await self._deliver(chat_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("%s: delivery crashed chat_id=%s", self.name, chat_id)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, chat_id: object) -> None:
+        first_seen = self._first_seen.get(chat_id, time.monotonic())
+        wait = first_seen + self._coalesce_delay - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self._chat_rate, 1.0)
+            self._chat_buckets[chat_id] = bucket
+        self._chat_buckets.move_to_end(chat_id)
+        await self._wait(bucket)
+        self._first_seen.pop(chat_id, None)
+        lines = self._pending.pop(chat_id, [])
+        for chunk in _chunks(lines):
+            attempt = 1
+            while True:
+                await self._wait(self._global)
+                try:
+                    await self._send(chat_id, chunk)
+                    self.counters['sent'] += 1
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    delay = self._retry_after(exc) if self._retry_after else None
+                    if delay is None or attempt >= self._max_attempts:
+                        self.counters['failed'] += 1
+                        logger.warning("%s: send failed chat_id=%s error=%s", self.name, chat_id, exc)
+                        break
+                    self.counters['retried'] += 1
+                    attempt += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._prune_buckets()
+
+    async def _wait(self, bucket: TokenBucket) -> None:
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        delay = bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _prune_buckets(self) -> None:
+        # Least recently used first; at one message per second per chat these
+        # have long been idle by the time 10k newer chats were served.
+        while len(self._chat_buckets) > MAX_CHAT_BUCKETS:
+            self._chat_buckets.popitem(last=False)
+
+
+def _chunks(lines: list[str]) -> list[str]:
+    chunks: list[str] = []
+    current = ''
+    for line in lines:
+        line = line[:MAX_MESSAGE_LEN]
+        candidate = f"{current}\n\n{line}" if current else line
+        if current and len(candidate) > MAX_MESSAGE_LEN:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import json
+import threading
+from pathlib import Path
+from string import Formatter
 from typing import Any
 
 TRANSLATIONS: dict[str, dict[str, str]] = {
@@ -209,6 +213,7 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'btn.upgrade_elite': '⬆️ Upgrade Elite',
         'btn.broadcast': '📣 Broadcast',
         'btn.user_stats': '👥 User Stats',
+        'btn.latency': '⏲ Latency',
         'btn.feature_toggle': '🎚 Feature Toggle',
         'btn.verify': '✅ Verify User',
         'btn.language': '🌐 Language',
@@ -343,6 +348,8 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'hint.debt_to_equity': 'Debt load vs equity',
         'hint.current_ratio': 'Short-term liquidity',
         'msg.translating': '⏳ Translating…',
+        'msg.loading': '⏳ Loading…',
+        'msg.action_failed': '⚠️ Something went wrong. Please try again.',
         'msg.news_empty': 'No news available right now.',
         'msg.translate_unavailable': 'Translation is not configured. Set TRANSLATE_API_URL to enable.',
         'msg.translate_offline': 'Translation server is not reachable. Start LibreTranslate and try again.',
@@ -368,12 +375,20 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'msg.import_csv_done': 'Imported {count} assets from CSV.',
         'msg.export_csv': 'Your CSV export:',
         'msg.invalid_csv': 'CSV import failed. Check the format.',
-        'msg.broadcast_queued': '📣 Broadcast queued.',
+        'msg.broadcast_queued': '📣 Broadcast queued: {ids}. Progress is shown in Admin → Broadcast.',
+        'msg.broadcast_recent': 'Recent broadcasts',
         'msg.feature_toggled': '🎚 Feature "{feature}" toggled (placeholder).',
         'msg.alert_price_created': '✅ Price alert created.',
         'msg.alert_price_invalid': '⚠️ Invalid format. Use: TYPE SYMBOL TARGET_PRICE',
         'msg.alert_percent_created': '✅ % move alert created.',
         'msg.alert_percent_invalid': '⚠️ Invalid format. Use: TYPE SYMBOL PERCENT_MOVE',
+        'msg.alert_percent_fired': '{emoji} {symbol} moved {pct} in {window}: {price}\n{link}',
+        'msg.watch_stats': '📡 Price Watch',
+        'msg.job_stats': '⏱ Background Jobs',
+        'msg.cache_stats': '🗂 Render Cache',
+        'msg.latency_title': '⏲ Slowest actions (p50/p95/p99 ms)',
+        'msg.latency_empty': 'No timings recorded yet.',
+        'msg.slow_recent': '🐢 Recent slow actions',
     },
     'ru': {
         'main.title': 'Инвестиционный Хаб',
@@ -581,6 +596,7 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'btn.upgrade_elite': '⬆️ Апгрейд Elite',
         'btn.broadcast': '📣 Рассылка',
         'btn.user_stats': '👥 Статистика',
+        'btn.latency': '⏲ Задержки',
         'btn.feature_toggle': '🎚 Переключатель',
         'btn.verify': '✅ Верификация',
         'btn.language': '🌐 Язык',
@@ -715,6 +731,8 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'hint.debt_to_equity': 'Долговая нагрузка',
         'hint.current_ratio': 'Краткосрочная ликвидность',
         'msg.translating': '⏳ Перевожу…',
+        'msg.loading': '⏳ Загружаю…',
+        'msg.action_failed': '⚠️ Что-то пошло не так. Попробуйте ещё раз.',
         'msg.news_empty': 'Пока нет новостей.',
         'msg.translate_unavailable': 'Перевод не настроен. Укажите TRANSLATE_API_URL.',
         'msg.translate_offline': 'Сервер перевода недоступен. Запусти LibreTranslate и попробуй снова.',
@@ -740,12 +758,20 @@ TRANSLATIONS: dict[str, dict[str, str]] = {
         'msg.import_csv_done': 'Импортировано активов: {count}.',
         'msg.export_csv': 'Ваш CSV экспорт:',
         'msg.invalid_csv': 'Не удалось импортировать CSV. Проверьте формат.',
-        'msg.broadcast_queued': '📣 Рассылка запланирована.',
+        'msg.broadcast_queued': '📣 Рассылка запланирована: {ids}. Прогресс — в Админ → Рассылка.',
+        'msg.broadcast_recent': 'Последние рассылки',
         'msg.feature_toggled': '🎚 Функция "{feature}" переключена (заглушка).',
         'msg.alert_price_created': '✅ Цена-алерт создан.',
         'msg.alert_price_invalid': '⚠️ Неверный формат. TYPE SYMBOL TARGET_PRICE',
         'msg.alert_percent_created': '✅ %-алерт создан.',
         'msg.alert_percent_invalid': '⚠️ Неверный формат. TYPE SYMBOL PERCENT_MOVE',
+        'msg.alert_percent_fired': '{emoji} {symbol}: {pct} за {window}, цена {price}\n{link}',
+        'msg.watch_stats': '📡 Мониторинг цен',
+        'msg.job_stats': '⏱ Фоновые задачи',
+        'msg.cache_stats': '🗂 Кэш экранов',
+        'msg.latency_title': '⏲ Самые медленные действия (p50/p95/p99 мс)',
+        'msg.latency_empty': 'Замеров пока нет.',
+        'msg.slow_recent': '🐢 Недавние медленные действия',
     },
 }
 
@@ -761,10 +787,81 @@ def normalize_lang(code: str | None) -> str:
     return 'ru'
 
 
-def t(key: str, lang: str = 'en', **kwargs: Any) -> str:
-    lang = lang if lang in TRANSLATIONS else 'en'
-    template = TRANSLATIONS.get(lang, {}).get(key) or TRANSLATIONS['en'].get(key) or key
+class Template:
+    __slots__ = ('text', 'parts')
+
+    def __init__(self, text: str, parts: tuple[tuple[str, str | None], ...]) -> None:
+        self.text = text
+        self.parts = parts
+
+    def render(self, kwargs: dict[str, Any]) -> str:
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                if field not in kwargs:
+                    return self.text
+                out.append(str(kwargs[field]))
+        return ''.join(out)
+
+
+def compile_template(text: str) -> str | Template:
     try:
-        return template.format(**kwargs)
-    except Exception:
+        parsed = list(Formatter().parse(text))
+    except ValueError:
+        return text
+    if all(field is None for _, field, _, _ in parsed):
+        return ''.join(literal for literal, _, _, _ in parsed)
+    parts = []
+    for literal, field, spec, conversion in parsed:
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return text
+        parts.append((literal, field))
+    return Template(text, tuple(parts))
+
+
+LOCALE_DIR = Path(__file__).resolve().parent / 'locales'
+
+_KEYS: dict[str, int] = {key: index for index, key in enumerate(dict.fromkeys(k for strings in TRANSLATIONS.values() for k in strings))}
+_catalogs: dict[str, list[str | Template]] = {}
+_load_lock = threading.Lock()
+
+
+def _compile_catalog(strings: dict[str, str]) -> list[str | Template]:
+    base = TRANSLATIONS['en']
+    return [compile_template(strings.get(key) or base.get(key) or key) for key in _KEYS]
+
+
+def _load_catalog(lang: str) -> list[str | Template]:
+    with _load_lock:
+        catalog = _catalogs.get(lang)
+        if catalog is not None:
+            return catalog
+        if not (lang.isalpha() and len(lang) <= 8):
+            return _catalogs['en']
+        path = LOCALE_DIR / f'{lang}.json'
+        if path.is_file():
+            strings = json.loads(path.read_text(encoding='utf-8'))
+            TRANSLATIONS[lang] = strings
+            catalog = _compile_catalog(strings)
+        else:
+            catalog = _catalogs['en']
+        _catalogs[lang] = catalog
+        return catalog
+
+
+for _lang, _strings in TRANSLATIONS.items():
+    _catalogs[_lang] = _compile_catalog(_strings)
+
+
+def t(key: str, lang: str = 'en', **kwargs: Any) -> str:
+    if not isinstance(lang, str):
+        lang = 'en'
+    catalog = _catalogs.get(lang) or _load_catalog(lang)
+    index = _KEYS.get(key)
+    if index is None:
+        return key
+    template = catalog[index]
+    if template.__class__ is str:
         return template
+    return template.render(kwargs)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from config import load_config
+from services.lease_service import LeaseService
+
+logger = logging.getLogger('jobs')
+
+JobFunc = Callable[[], Awaitable[None]]
+
+_fence: ContextVar[tuple[LeaseService, str, str, int] | None] = ContextVar('job_fence', default=None)
+
+
+async def still_leader() -> bool:
+    fence = _fence.get()
+    if fence is None:
+        return True
+    leases, name, owner, token = fence
+    try:
+        return await leases.check(name, owner, token)
+    except Exception:
+        logger.warning("Fencing check failed job=%s", name)
+        return False
+
+
+@dataclass
+class JobRun:
+    started_at: float
+    duration: float
+    status: str
+    error: str | None = None
+
+
+@dataclass
+class Job:
+    name: str
+    func: JobFunc
+    interval: float
+    first: float = 0.0
+    jitter: float = 0.1
+    timeout: float | None = None
+    lease: bool = True
+    history: deque[JobRun] = field(default_factory=lambda: deque(maxlen=50))
+    counters: dict[str, int] = field(default_factory=lambda: {'ok': 0, 'error': 0, 'timeout': 0, 'not_leader': 0, 'fenced': 0})
+    running: bool = False
+    next_run: float = 0.0
+    token: int | None = None
+    lease_until: float = 0.0
+    current: asyncio.Task | None = None
+    fenced: bool = False
+
+
+class JobRunner:
+    def __init__(self, owner: str | None = None, leases: LeaseService | None = None, lease_ttl: float | None = None) -> None:
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.leases = leases or LeaseService()
+        self.lease_ttl = lease_ttl or load_config().job_lease_ttl
+        self.jobs: dict[str, Job] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._heartbeat: asyncio.Task | None = None
+
+    def add(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: float,
+        first: float = 0.0,
+        jitter: float = 0.1,
+        timeout: float | None = None,
+        lease: bool = True,
+    ) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job already registered: {name}")
+        job = Job(name=name, func=func, interval=float(interval), first=float(first), jitter=jitter, timeout=timeout, lease=lease)
+        self.jobs[name] = job
+        if self._tasks:
+            self._tasks[name] = asyncio.create_task(self._loop(job), name=f'job-{name}')
+        return job
+
+    def start(self) -> None:
+        for name, job in self.jobs.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._loop(job), name=f'job-{name}')
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._elect(), name='job-leases')
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        if self._heartbeat is not None:
+            tasks.append(self._heartbeat)
+            self._heartbeat = None
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            if job.lease and job.token is not None:
+                job.token = None
+                try:
+                    await self.leases.release(job.name, self.owner)
+                except Exception:
+                    logger.warning("Failed to release lease job=%s", job.name)
+
+    def stats(self) -> dict[str, dict[str, object]]:
+        now = time.monotonic()
+        result: dict[str, dict[str, object]] = {}
+        for name, job in self.jobs.items():
+            durations = [run.duration for run in job.history if run.status in ('ok', 'error', 'timeout', 'fenced')]
+            last = job.history[-1] if job.history else None
+            result[name] = {
+                **job.counters,
+                'running': job.running,
+                'leader': self._leader(job, now),
+                'token': job.token,
+                'next_in': round(max(0.0, job.next_run - now), 1),
+                'last_status': last.status if last else None,
+                'last_ms': round(last.duration * 1000) if last else None,
+                'avg_ms': round(sum(durations) / len(durations) * 1000) if durations else None,
+                'max_ms': round(max(durations) * 1000) if durations else None,
+            }
+        return result
+
+    async def _loop(self, job: Job) -> None:
+        scheduled = time.monotonic() + job.first
+        while True:
+            job.next_run = scheduled + self._jitter(job)
+            delay = job.next_run - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._run(job)
+            now = time.monotonic()
+            scheduled += job.interval
+            if scheduled <= now:
+                missed = int((now - scheduled) // job.interval) + 1
+                scheduled += missed * job.interval
+                logger.warning("Job %s overran its interval, skipping %s run(s)", job.name, missed)
+
+    async def _elect(self) -> None:
+        while True:
+            for job in list(self.jobs.values()):
+                if job.lease:
+                    await self._heartbeat_lease(job)
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    async def _heartbeat_lease(self, job: Job) -> None:
+        started = time.monotonic()
+        try:
+            if job.token is not None and await self.leases.renew(job.name, self.owner, job.token, self.lease_ttl):
+                job.lease_until = started + self.lease_ttl
+                return
+            token = await self.leases.acquire(job.name, self.owner, self.lease_ttl)
+        except Exception:
+            logger.exception("Lease heartbeat failed job=%s", job.name)
+            if self._leader(job, time.monotonic()):
+                return
+            token = None
+        if token is not None:
+            if token != job.token:
+                logger.info("Became leader job=%s token=%s", job.name, token)
+            job.token = token
+            job.lease_until = started + self.lease_ttl
+            return
+        if job.token is not None:
+            logger.warning("Lost leadership job=%s token=%s", job.name, job.token)
+            job.token = None
+            if job.current is not None and not job.current.done():
+                job.fenced = True
+                job.current.cancel()
+
+    @staticmethod
+    def _leader(job: Job, now: float) -> bool:
+        return job.token is not None and job.lease_until > now
+
+    async def _run(self, job: Job) -> None:
+        started = time.monotonic()
+        wall = time.time()
+        fence = None
+        if job.lease:
+            if not self._leader(job, started):
+                job.counters['not_leader'] += 1
+                job.history.append(JobRun(wall, time.monotonic() - started, 'not_leader'))
+                return
+            fence = _fence.set((self.leases, job.name, self.owner, job.token))
+        job.running = True
+        job.fenced = False
+        job.current = asyncio.create_task(asyncio.wait_for(job.func(), timeout=job.timeout), name=f'job-{job.name}-run')
+        if fence is not None:
+            _fence.reset(fence)
+        status, error = 'ok', None
+        try:
+            await job.current
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            logger.warning("Job %s timed out after %ss", job.name, job.timeout)
+        except asyncio.CancelledError:
+            if not job.fenced:
+                raise
+            status = 'fenced'
+            logger.warning("Job %s cancelled after losing its lease", job.name)
+        except Exception as exc:
+            status, error = 'error', str(exc)
+            logger.exception("Job %s failed", job.name)
+        finally:
+            job.running = False
+            job.current = None
+        duration = time.monotonic() - started
+        job.counters[status] += 1
+        job.history.append(JobRun(wall, duration, status, error))
+        logger.debug("Job %s finished status=%s duration=%.3fs", job.name, status, duration)
+
+    @staticmethod
+    def _jitter(job: Job) -> float:
+        if job.jitter <= 0:
+            return 0.0
+        spread = job.interval * job.jitter
+        return random.uniform(-spread, spread)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config import load_config
+
+REDACT_FIELDS = frozenset({'text', 'query', 'token', 'secret', 'password', 'init_data'})
+_RESERVED = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RedactFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key in REDACT_FIELDS.intersection(vars(record)):
+            value = getattr(record, key)
+            if value is None:
+                continue
+            raw = str(value)
+            setattr(record, key, f"<redacted len={len(raw)} sha={hashlib.sha256(raw.encode()).hexdigest()[:10]}>")
+        return True
+
+
+class SampleFilter(logging.Filter):
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self.dropped: dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, 'event', None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(event, 1.0)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.dropped[event] = self.dropped.get(event, 0) + 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SizeTimeRotatingFileHandler(RotatingFileHandler):
+    def __init__(self, filename: str, max_bytes: int, interval: float, backups: int) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval > 0 else 0.0
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.interval > 0:
+            self.rollover_at = time.time() + self.interval
+
+
+def parse_sample_rates(raw: str) -> dict[str, float]:
+    rates: dict[str, float] = {}
+    for part in raw.split(','):
+        name, _, value = part.partition('=')
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def setup_logging(path: str | None = None) -> QueueListener:
+    global _listener
+    if _listener is not None:
+        return _listener
+    cfg = load_config()
+    path = path or cfg.log_file
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    file_handler = SizeTimeRotatingFileHandler(path, cfg.log_max_bytes, cfg.log_rotate_seconds, cfg.log_backups)
+    file_handler.setFormatter(JsonFormatter())
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s'))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=10000))
+    handler.addFilter(SampleFilter(parse_sample_rates(cfg.log_sample)))
+    handler.addFilter(RedactFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(cfg.log_level)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    _listener = QueueListener(handler.queue, file_handler, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+from core.price_windows import DEFAULT_WINDOWS, parse_windows
+
+OPEN = 'open'
+EXTENDED = 'extended'
+CLOSED = 'closed'
+
+
+@dataclass(frozen=True)
+class Exchange:
+    code: str
+    tz: str
+    open: dtime
+    close: dtime
+    pre_open: dtime | None = None
+    post_close: dtime | None = None
+    us_holidays: bool = False
+
+
+EXCHANGES = {
+    'US': Exchange('US', 'America/New_York', dtime(9, 30), dtime(16, 0), dtime(4, 0), dtime(20, 0), us_holidays=True),
+    'L': Exchange('L', 'Europe/London', dtime(8, 0), dtime(16, 30)),
+    'DE': Exchange('DE', 'Europe/Berlin', dtime(9, 0), dtime(17, 30)),
+    'PA': Exchange('PA', 'Europe/Paris', dtime(9, 0), dtime(17, 30)),
+    'AS': Exchange('AS', 'Europe/Amsterdam', dtime(9, 0), dtime(17, 30)),
+    'TO': Exchange('TO', 'America/Toronto', dtime(9, 30), dtime(16, 0)),
+    'T': Exchange('T', 'Asia/Tokyo', dtime(9, 0), dtime(15, 0)),
+    'HK': Exchange('HK', 'Asia/Hong_Kong', dtime(9, 30), dtime(16, 0)),
+}
+
+_FOREX_TZ = 'America/New_York'
+_FOREX_ROLLOVER = dtime(17, 0)
+
+
+def exchange_for(symbol: str) -> Exchange:
+    _, _, suffix = symbol.upper().rpartition('.')
+    if suffix and '.' in symbol:
+        return EXCHANGES.get(suffix, EXCHANGES['US'])
+    return EXCHANGES['US']
+
+
+def market_status(kind: str, symbol: str, now: datetime | None = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    if kind == 'crypto':
+        return OPEN
+    if kind == 'forex':
+        return _forex_status(now)
+    return _equity_status(exchange_for(symbol), now)
+
+
+def _forex_status(now: datetime) -> str:
+    local = now.astimezone(ZoneInfo(_FOREX_TZ))
+    weekday = local.weekday()
+    if weekday == 5:
+        return CLOSED
+    if weekday == 4 and local.time() >= _FOREX_ROLLOVER:
+        return CLOSED
+    if weekday == 6 and local.time() < _FOREX_ROLLOVER:
+        return CLOSED
+    return OPEN
+
+
+def _equity_status(exchange: Exchange, now: datetime) -> str:
+    local = now.astimezone(ZoneInfo(exchange.tz))
+    day = local.date()
+    if day.weekday() >= 5:
+        return CLOSED
+    if exchange.us_holidays and day in us_holidays(day.year):
+        return CLOSED
+    clock = local.time()
+    if exchange.open <= clock < exchange.close:
+        return OPEN
+    if exchange.pre_open and exchange.pre_open <= clock < exchange.open:
+        return EXTENDED
+    if exchange.post_close and exchange.close <= clock < exchange.post_close:
+        return EXTENDED
+    return CLOSED
+
+
+@lru_cache(maxsize=8)
+def us_holidays(year: int) -> frozenset[date]:
+    days = {
+        _observed(date(year, 1, 1), allow_friday=False),
+        _nth_weekday(year, 1, 0, 3),
+        _nth_weekday(year, 2, 0, 3),
+        _easter(year) - timedelta(days=2),
+        _last_weekday(year, 5, 0),
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),
+        _nth_weekday(year, 11, 3, 4),
+        _observed(date(year, 12, 25)),
+    }
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))
+    days.discard(None)
+    return frozenset(days)
+
+
+def _observed(day: date, allow_friday: bool = True) -> date | None:
+    if day.weekday() == 5:
+        return day - timedelta(days=1) if allow_friday else None
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    nxt = date(year + month // 12, month % 12 + 1, 1)
+    last = nxt - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+class PollScheduler:
+    def __init__(
+        self,
+        base_interval: float = 300.0,
+        hot_interval: float = 30.0,
+        threshold: float = 1.0,
+        popular_watchers: int = 10,
+        windows: dict[str, float] | None = None,
+    ) -> None:
+        spans = windows or parse_windows(DEFAULT_WINDOWS)
+        # Longer windows span most symbols' daily range, so only the shortest
+        # one says whether a symbol is moving right now.
+        self.heat_window = min(spans, key=spans.__getitem__)
+        self.base_interval = float(base_interval)
+        self.hot_interval = float(min(hot_interval, base_interval))
+        self.threshold = float(threshold) if threshold > 0 else 1.0
+        self.popular_watchers = max(1, popular_watchers)
+        self._polled: dict[tuple[str, str], float] = {}
+        self._last_seen: dict[tuple[str, str], float] = {}
+        self.counters = {
+            'ticks': 0,
+            'polled': 0,
+            'skipped_closed': 0,
+            'skipped_not_due': 0,
+            'fixed_equivalent': 0.0,
+        }
+        self._status_counts: dict[str, int] = {OPEN: 0, EXTENDED: 0, CLOSED: 0}
+
+    def interval(self, status: str, watchers: int, moves: dict[str, float]) -> float | None:
+        if status == CLOSED:
+            return None
+        interval = self.base_interval
+        if status == EXTENDED:
+            interval *= 2
+        heat = abs(moves.get(self.heat_window, 0.0)) / self.threshold
+        if heat >= 1.0:
+            interval = self.hot_interval
+        elif heat >= 0.5:
+            interval /= 4
+        elif heat >= 0.25:
+            interval /= 2
+        if watchers >= self.popular_watchers:
+            interval /= 1 + math.log10(watchers / self.popular_watchers + 1)
+        return max(self.hot_interval, min(interval, self.base_interval * 2))
+
+    def due(
+        self,
+        keys: dict[tuple[str, str], int],
+        moves_for: Callable[[str, str], dict[str, float]],
+        now: float,
+    ) -> list[tuple[str, str]]:
+        self.counters['ticks'] += 1
+        wall = datetime.fromtimestamp(now, timezone.utc)
+        status_counts = {OPEN: 0, EXTENDED: 0, CLOSED: 0}
+        due: list[tuple[str, str]] = []
+        for key, watchers in keys.items():
+            kind, symbol = key
+            last = self._last_seen.get(key)
+            self.counters['fixed_equivalent'] += (now - last) / self.base_interval if last is not None else 1.0
+            self._last_seen[key] = now
+            status = market_status(kind, symbol, wall)
+            status_counts[status] += 1
+            interval = self.interval(status, watchers, moves_for(kind, symbol))
+            if interval is None:
+                self.counters['skipped_closed'] += 1
+                continue
+            polled = self._polled.get(key)
+            if polled is not None and now - polled < interval:
+                self.counters['skipped_not_due'] += 1
+                continue
+            due.append(key)
+            self._polled[key] = now
+            self.counters['polled'] += 1
+        for key in [k for k in self._last_seen if k not in keys]:
+            del self._last_seen[key]
+            self._polled.pop(key, None)
+        self._status_counts = status_counts
+        return due
+
+    def stats(self) -> dict[str, object]:
+        fixed = self.counters['fixed_equivalent']
+        polled = self.counters['polled']
+        return {
+            **self.counters,
+            'fixed_equivalent': round(fixed, 1),
+            'saved': round(fixed - polled, 1),
+            'saved_pct': round((fixed - polled) / fixed * 100.0, 1) if fixed else 0.0,
+            'tracked': len(self._last_seen),
+            'markets': dict(self._status_counts),
+        }
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import functools
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('slow_actions')
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000)
+PHASES = ('total', 'provider', 'db', 'render')
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            if seen + bucket >= rank and bucket:
+                low = BUCKETS_MS[index - 1] if index else 0.0
+                high = BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+                return min(self.max, low + (high - low) * (rank - seen) / bucket)
+            seen += bucket
+        return self.max
+
+
+class Trace:
+    __slots__ = ('name', 'parent', 'started', 'busy', '_active', '_since', 'calls')
+
+    def __init__(self, name: str, parent: Trace | None) -> None:
+        self.name = name
+        self.parent = parent
+        self.started = time.perf_counter()
+        self.busy = {'provider': 0.0, 'db': 0.0}
+        self._active = {'provider': 0, 'db': 0}
+        self._since = {'provider': 0.0, 'db': 0.0}
+        self.calls: list[tuple[str, str, float, str]] = []
+
+    def enter(self, kind: str, now: float) -> None:
+        if self._active[kind] == 0:
+            self._since[kind] = now
+        self._active[kind] += 1
+
+    def leave(self, kind: str, now: float) -> None:
+        self._active[kind] -= 1
+        if self._active[kind] == 0:
+            self.busy[kind] += now - self._since[kind]
+
+
+_trace: ContextVar[Trace | None] = ContextVar('metrics_trace', default=None)
+
+
+class Metrics:
+    def __init__(self, slow_ms: float = 1000.0, slow_sample: float = 0.2, recent: int = 50) -> None:
+        self.slow_ms = slow_ms
+        self.slow_sample = slow_sample
+        self.histograms: dict[str, dict[str, Histogram]] = {}
+        self.slow: deque[dict[str, Any]] = deque(maxlen=recent)
+        self.counters = {'slow': 0, 'slow_logged': 0}
+        self.events: dict[str, int] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        self.gauges[name] = read
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + amount
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            series = self.histograms.get(name)
+            if series is None:
+                series = self.histograms[name] = {phase: Histogram() for phase in PHASES}
+            series['total'].observe(ms)
+
+    def quantile(self, name: str, q: float, min_count: int = 1) -> float | None:
+        with self._lock:
+            series = self.histograms.get(name)
+            if series is None or series['total'].count < min_count:
+                return None
+            return series['total'].quantile(q)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[Trace]:
+        trace = Trace(name, _trace.get())
+        token = _trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _trace.reset(token)
+            self._record(trace, time.perf_counter())
+
+    @contextmanager
+    def wait(self, kind: str, target: str = '') -> Iterator[None]:
+        trace = _trace.get()
+        if trace is None:
+            yield
+            return
+        started = time.perf_counter()
+        node = trace
+        while node is not None:
+            node.enter(kind, started)
+            node = node.parent
+        status = 'ok'
+        try:
+            yield
+        except BaseException as exc:
+            status = type(exc).__name__
+            raise
+        finally:
+            now = time.perf_counter()
+            node = trace
+            while node is not None:
+                node.leave(kind, now)
+                node = node.parent
+            if kind == 'provider':
+                trace.calls.append((kind, target, (now - started) * 1000, status))
+
+    def _record(self, trace: Trace, now: float) -> None:
+        total = (now - trace.started) * 1000
+        provider = trace.busy['provider'] * 1000
+        db = trace.busy['db'] * 1000
+        values = (total, provider, db, max(0.0, total - provider - db))
+        with self._lock:
+            series = self.histograms.get(trace.name)
+            if series is None:
+                series = self.histograms[trace.name] = {phase: Histogram() for phase in PHASES}
+            for phase, value in zip(PHASES, values):
+                series[phase].observe(value)
+            if total < self.slow_ms:
+                return
+            self.counters['slow'] += 1
+            if random.random() >= self.slow_sample:
+                return
+            self.counters['slow_logged'] += 1
+            entry = {
+                'name': trace.name,
+                'at': time.time(),
+                'total_ms': round(total),
+                'provider_ms': round(provider),
+                'db_ms': round(db),
+                'render_ms': round(values[3]),
+                'calls': [f"{target} {ms:.0f}ms {status}" for _, target, ms, status in trace.calls],
+            }
+            self.slow.append(entry)
+        logger.warning(
+            "Slow %s total=%dms provider=%dms db=%dms render=%dms calls=%s",
+            entry['name'], entry['total_ms'], entry['provider_ms'], entry['db_ms'], entry['render_ms'], entry['calls'],
+        )
+
+    def summary(self, prefix: str = '') -> list[dict[str, Any]]:
+        with self._lock:
+            items = [(name, series) for name, series in self.histograms.items() if name.startswith(prefix)]
+            rows = []
+            for name, series in items:
+                row: dict[str, Any] = {'name': name, 'count': series['total'].count}
+                for phase, hist in series.items():
+                    row[phase] = {q: round(hist.quantile(q / 100)) for q in (50, 95, 99)}
+                rows.append(row)
+        rows.sort(key=lambda row: row['total'][95], reverse=True)
+        return rows
+
+    def prometheus(self) -> str:
+        lines = [
+            '# HELP bot_action_ms Action latency in milliseconds by phase',
+            '# TYPE bot_action_ms histogram',
+        ]
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                for phase, hist in series.items():
+                    labels = f'action="{name}",phase="{phase}"'
+                    cumulative = 0
+                    for bound, bucket in zip(BUCKETS_MS, hist.counts):
+                        cumulative += bucket
+                        lines.append(f'bot_action_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'bot_action_ms_bucket{{{labels},le="+Inf"}} {hist.count}')
+                    lines.append(f'bot_action_ms_sum{{{labels}}} {hist.sum:.3f}')
+                    lines.append(f'bot_action_ms_count{{{labels}}} {hist.count}')
+            lines.append(f'bot_slow_actions_total {self.counters["slow"]}')
+            for name, count in sorted(self.events.items()):
+                lines.append(f'bot_events_total{{name="{name}"}} {count}')
+        for name, read in sorted(self.gauges.items()):
+            lines.append(f'{name} {read()}')
+        return '\n'.join(lines) + '\n'
+
+
+def timed(name: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with metrics.track(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def provider_target(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.hostname or ''}{parts.path}"
+
+
+def _build() -> Metrics:
+    from config import load_config
+
+    cfg = load_config()
+    return Metrics(slow_ms=cfg.slow_action_ms, slow_sample=cfg.slow_log_sample)
+
+
+metrics = _build()
+
+
+async def start_metrics_server(port: int, host: str = '0.0.0.0') -> Any:
+    from aiohttp import web
+
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text=metrics.prometheus(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
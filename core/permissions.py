@@ -31,6 +31,7 @@ class UserContext:
     language: str
     is_admin: bool
     badge: str = 'none'
+    platform_user_id: str = ''
 
 
 BADGES = ['none', 'major', 'hodl', 'verified']
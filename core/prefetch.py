@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING
+
+from config import load_config
+from core.permissions import UserContext
+from core.shared_limits import QuotaExceeded, speculative
+
+if TYPE_CHECKING:
+    from core.router import Router
+
+logger = logging.getLogger('prefetch')
+
+
+def parse_callback(data: str) -> tuple[str, str | None] | None:
+    if data.startswith('action:'):
+        action, _, payload = data[7:].partition(':')
+        return action, payload or None
+    if data.startswith('page:'):
+        parts = data.split(':', 2)
+        if len(parts) == 3:
+            return parts[1], parts[2]
+    return None
+
+
+class TransitionStats:
+    def __init__(self, max_sources: int = 2000, max_targets: int = 8, decay_at: int = 1000) -> None:
+        self.max_sources = max_sources
+        self.max_targets = max_targets
+        self.decay_at = decay_at
+        self._edges: OrderedDict[str, Counter[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, source: str, target: str) -> None:
+        with self._lock:
+            targets = self._edges.get(source)
+            if targets is None:
+                targets = self._edges[source] = Counter()
+                if len(self._edges) > self.max_sources:
+                    self._edges.popitem(last=False)
+            self._edges.move_to_end(source)
+            targets[target] += 1
+            if len(targets) > self.max_targets:
+                rare, _ = targets.most_common()[-1]
+                del targets[rare]
+            if sum(targets.values()) > self.decay_at:
+                for key in list(targets):
+                    targets[key] //= 2
+                    if not targets[key]:
+                        del targets[key]
+
+    def predict(self, source: str, min_samples: int = 5, min_share: float = 0.35) -> str | None:
+        with self._lock:
+            targets = self._edges.get(source)
+            if not targets:
+                return None
+            total = sum(targets.values())
+            target, count = targets.most_common(1)[0]
+        if total < min_samples or count / total < min_share:
+            return None
+        return target
+
+
+class Prefetcher:
+    def __init__(
+        self,
+        max_inflight: int = 8,
+        per_user: int = 1,
+        min_samples: int = 5,
+        min_share: float = 0.35,
+        max_users: int = 10000,
+    ) -> None:
+        self.transitions = TransitionStats()
+        self.max_inflight = max_inflight
+        self.per_user = per_user
+        self.min_samples = min_samples
+        self.min_share = min_share
+        self.max_users = max_users
+        self._last: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, int] = {}
+        self._total = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.counters = {'observed': 0, 'scheduled': 0, 'warmed': 0, 'skipped': 0, 'capped': 0, 'quota': 0, 'errors': 0}
+
+    def observe(self, router: Router, user: UserContext, data: str) -> None:
+        if not self.max_inflight or not data:
+            return
+        uid = f"{user.platform}:{user.user_id}"
+        with self._lock:
+            previous = self._last.get(uid)
+            self._last[uid] = data
+            self._last.move_to_end(uid)
+            if len(self._last) > self.max_users:
+                self._last.popitem(last=False)
+            self.counters['observed'] += 1
+        if previous is not None and previous != data:
+            self.transitions.record(previous, data)
+        target = self.transitions.predict(data, self.min_samples, self.min_share)
+        parsed = parse_callback(target) if target else None
+        if parsed is None:
+            return
+        with self._lock:
+            if self._total >= self.max_inflight or self._inflight.get(uid, 0) >= self.per_user:
+                self.counters['capped'] += 1
+                return
+            self._total += 1
+            self._inflight[uid] = self._inflight.get(uid, 0) + 1
+            self.counters['scheduled'] += 1
+        task = asyncio.get_running_loop().create_task(self._warm(router, user, uid, *parsed))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _warm(self, router: Router, user: UserContext, uid: str, action: str, payload: str | None) -> None:
+        token = speculative.set(True)
+        try:
+            warmed = await router.prefetch(action, user, payload)
+            self.counters['warmed' if warmed else 'skipped'] += 1
+        except QuotaExceeded:
+            self.counters['quota'] += 1
+        except Exception:
+            self.counters['errors'] += 1
+            logger.debug("Prefetch failed action=%s", action, exc_info=True)
+        finally:
+            speculative.reset(token)
+            with self._lock:
+                self._total -= 1
+                remaining = self._inflight.get(uid, 1) - 1
+                if remaining:
+                    self._inflight[uid] = remaining
+                else:
+                    self._inflight.pop(uid, None)
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'inflight': self._total, 'users': len(self._last)}
+
+
+def _build() -> Prefetcher:
+    cfg = load_config()
+    return Prefetcher(max_inflight=cfg.prefetch_max_inflight, per_user=cfg.prefetch_per_user, min_share=cfg.prefetch_min_share)
+
+
+prefetcher = _build()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+
+DEFAULT_WINDOWS = '5m,1h,24h'
+DEFAULT_SLOTS = 288
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_windows(raw: str) -> dict[str, float]:
+    windows: dict[str, float] = {}
+    for part in (raw or '').split(','):
+        label = part.strip().lower()
+        if not label:
+            continue
+        unit = _UNITS.get(label[-1])
+        try:
+            seconds = float(label[:-1]) * unit if unit else float(label)
+        except ValueError:
+            continue
+        if seconds > 0:
+            windows[label] = seconds
+    return windows or parse_windows(DEFAULT_WINDOWS)
+
+
+class RingWindow:
+    __slots__ = ('span', 'capacity', 'resolution', '_ts', '_px', '_lo', '_hi', '_written', '_start', '_min', '_max', 'last_ts', 'last_price')
+
+    def __init__(self, span: float, slots: int = DEFAULT_SLOTS) -> None:
+        self.span = float(span)
+        self.capacity = max(2, int(slots))
+        self.resolution = self.span / (self.capacity - 1)
+        self._ts = array('d', [0.0]) * self.capacity
+        self._px = array('d', [0.0]) * self.capacity
+        self._lo = array('d', [0.0]) * self.capacity
+        self._hi = array('d', [0.0]) * self.capacity
+        self._written = 0
+        self._start = 0
+        self._min: deque[int] = deque()
+        self._max: deque[int] = deque()
+        self.last_ts: float | None = None
+        self.last_price: float | None = None
+
+    def __len__(self) -> int:
+        return self._written - self._start
+
+    def push(self, ts: float, price: float) -> None:
+        self.last_ts = ts
+        self.last_price = price
+        cap = self.capacity
+        if self._written and ts - self._ts[(self._written - 1) % cap] < self.resolution:
+            # Closer than one slot apart: the slot keeps the newest price and
+            # its low/high, which only ever extend the tail of each deque.
+            last = self._written - 1
+            slot = last % cap
+            self._px[slot] = price
+            if price < self._lo[slot]:
+                self._lo[slot] = price
+                self._min.pop()
+                self._push_min(last)
+            if price > self._hi[slot]:
+                self._hi[slot] = price
+                self._max.pop()
+                self._push_max(last)
+            return
+        idx = self._written
+        self._ts[idx % cap] = ts
+        self._px[idx % cap] = price
+        self._lo[idx % cap] = price
+        self._hi[idx % cap] = price
+        self._written += 1
+        start = max(self._start, self._written - cap)
+        # The newest sample at least a span old stays as the window baseline.
+        while start < idx and ts - self._ts[(start + 1) % cap] >= self.span:
+            start += 1
+        self._start = start
+        while self._min and self._min[0] < start:
+            self._min.popleft()
+        while self._max and self._max[0] < start:
+            self._max.popleft()
+        self._push_min(idx)
+        self._push_max(idx)
+
+    def _push_min(self, idx: int) -> None:
+        cap = self.capacity
+        lo = self._lo
+        price = lo[idx % cap]
+        while self._min and lo[self._min[-1] % cap] >= price:
+            self._min.pop()
+        self._min.append(idx)
+
+    def _push_max(self, idx: int) -> None:
+        cap = self.capacity
+        hi = self._hi
+        price = hi[idx % cap]
+        while self._max and hi[self._max[-1] % cap] <= price:
+            self._max.pop()
+        self._max.append(idx)
+
+    def first(self) -> float | None:
+        if not len(self):
+            return None
+        return self._px[self._start % self.capacity]
+
+    def low(self) -> float | None:
+        if not self._min:
+            return None
+        return min(self._lo[self._min[0] % self.capacity], self.last_price)
+
+    def high(self) -> float | None:
+        if not self._max:
+            return None
+        return max(self._hi[self._max[0] % self.capacity], self.last_price)
+
+    def move_pct(self) -> float | None:
+        if len(self) < 2 or self.last_price is None:
+            return None
+        last = self.last_price
+        best: float | None = None
+        for base in (self.first(), self.low(), self.high()):
+            if not base:
+                continue
+            pct = (last - base) / base * 100.0
+            if best is None or abs(pct) > abs(best):
+                best = pct
+        return best
+
+
+@dataclass
+class WindowMove:
+    window: str
+    pct: float
+    price: float
+
+
+class PriceWindowBook:
+    def __init__(self, windows: dict[str, float], slots: int = DEFAULT_SLOTS) -> None:
+        self.windows = dict(windows)
+        self.slots = slots
+        self._rings: dict[tuple[str, str], dict[str, RingWindow]] = {}
+        self._fired: dict[tuple[int, str], float] = {}
+
+    def update(self, asset_type: str, symbol: str, ts: float, price: float) -> None:
+        key = (asset_type, symbol)
+        rings = self._rings.get(key)
+        if rings is None:
+            rings = {label: RingWindow(span, self.slots) for label, span in self.windows.items()}
+            self._rings[key] = rings
+        for ring in rings.values():
+            ring.push(ts, price)
+
+    def moves(self, asset_type: str, symbol: str) -> dict[str, float]:
+        rings = self._rings.get((asset_type, symbol)) or {}
+        result: dict[str, float] = {}
+        for label, ring in rings.items():
+            pct = ring.move_pct()
+            if pct is not None:
+                result[label] = pct
+        return result
+
+    def check(self, alert_id: int, asset_type: str, symbol: str, threshold: float, now: float) -> WindowMove | None:
+        rings = self._rings.get((asset_type, symbol))
+        if not rings or threshold <= 0:
+            return None
+        for label, ring in rings.items():
+            pct = ring.move_pct()
+            if pct is None or abs(pct) < threshold:
+                continue
+            fired_at = self._fired.get((alert_id, label))
+            if fired_at is not None and now - fired_at < ring.span:
+                continue
+            self._fired[(alert_id, label)] = now
+            return WindowMove(window=label, pct=pct, price=float(ring.last_price or 0.0))
+        return None
+
+    def prune(self, active: set[tuple[str, str]], alert_ids: set[int]) -> None:
+        for key in [k for k in self._rings if k not in active]:
+            del self._rings[key]
+        for key in [k for k in self._fired if k[0] not in alert_ids]:
+            del self._fired[key]
@@ -1,24 +1,87 @@
 from __future__ import annotations
 
+import threading
 import time
-import asyncio
-from collections import defaultdict, deque
+from collections import OrderedDict
+
+from core.permissions import TIERS
+
+TIER_MULTIPLIERS = {'free': 1, 'pro': 2, 'elite': 4}
+
+
+class _Shard:
+    __slots__ = ('lock', 'tats')
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tats: OrderedDict[str, float] = OrderedDict()
 
 
 class RateLimiter:
-    def __init__(self, max_requests: int = 12, window_seconds: int = 10) -> None:
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = asyncio.Lock()
-
-    async def allow(self, key: str) -> bool:
-        now = time.time()
-        async with self._lock:
-            dq = self._events[key]
-            while dq and now - dq[0] > self.window_seconds:
-                dq.popleft()
-            if len(dq) >= self.max_requests:
+    def __init__(
+        self,
+        max_requests: int = 12,
+        window_seconds: float = 10,
+        tier_multipliers: dict[str, int] | None = None,
+        shards: int = 16,
+        max_keys: int = 100_000,
+    ) -> None:
+        multipliers = tier_multipliers or TIER_MULTIPLIERS
+        self._limits: dict[str, tuple[float, float]] = {}
+        for tier in TIERS:
+            count = max(1, int(max_requests * multipliers.get(tier, 1)))
+            interval = window_seconds / count
+            self._limits[tier] = (interval, interval * (count - 1))
+        self._default = self._limits[TIERS[0]]
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._shard_capacity = max(1, max_keys // len(self._shards))
+        self.counters = {'allowed': 0, 'rejected': 0, 'evicted': 0}
+        self.rejected_by_tier: dict[str, int] = {tier: 0 for tier in self._limits}
+        # Counters are shared by every shard, so they get their own lock.
+        self._counters_lock = threading.Lock()
+
+    async def allow(self, key: str, tier: str = 'free') -> bool:
+        return self.check(key, tier)
+
+    def check(self, key: str, tier: str = 'free') -> bool:
+        interval, tolerance = self._limits.get(tier, self._default)
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            tats = shard.tats
+            tat = max(tats.get(key, now), now)
+            if tat - now > tolerance:
+                tats.move_to_end(key)
+                self._count('rejected', tier)
                 return False
-            dq.append(now)
-            return True
+            tats[key] = tat + interval
+            tats.move_to_end(key)
+            self._evict(tats, now)
+            self._count('allowed')
+        return True
+
+    def _count(self, name: str, tier: str | None = None) -> None:
+        with self._counters_lock:
+            self.counters[name] += 1
+            if tier is not None:
+                self.rejected_by_tier[tier] = self.rejected_by_tier.get(tier, 0) + 1
+
+    def _evict(self, tats: OrderedDict[str, float], now: float) -> None:
+        for _ in range(2):
+            if not tats:
+                return
+            oldest, tat = next(iter(tats.items()))
+            if tat > now and len(tats) <= self._shard_capacity:
+                return
+            del tats[oldest]
+            self._count('evicted')
+
+    def stats(self) -> dict[str, object]:
+        with self._counters_lock:
+            counters = dict(self.counters)
+            rejected_by_tier = dict(self.rejected_by_tier)
+        return {
+            **counters,
+            'keys': sum(len(shard.tats) for shard in self._shards),
+            'rejected_by_tier': rejected_by_tier,
+        }
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Awaitable
+from dataclasses import dataclass, field, replace
 from html import escape
 from datetime import datetime
 
+from core.actions import ActionSpec, action, collect_actions
 from core.permissions import UserContext, has_access, missing_access_message, is_admin_allowed
 from core.i18n import t
-from core.ui import UIMessage, ButtonSpec, format_section, format_kv, paginate
+from core.metrics import metrics
+from core.prefetch import prefetcher
+from core.shared_cache import cache_store
+from core.ui import UIMessage, ButtonSpec, RenderCache, ScreenCache, format_section, format_kv, paginate
 from services.stocks_service import StocksService
 from services.crypto_service import CryptoService
 from services.ton_service import TonService
@@ -24,6 +27,20 @@ from services.link_service import LinkService
 from services.exchange_service import ExchangeService
 from services.favorites_service import FavoritesService
 from services.profile_service import ProfileService
+from services.watch_engine import current_engine
+from services.broadcast_engine import parse_broadcast
+from services.broadcast_service import BroadcastService
+
+STATIC_MENUS = frozenset({
+    'markets', 'onboarding', 'stocks', 'etfs', 'forex', 'crypto', 'ton', 'nft', 'portfolio', 'favorites',
+    'portfolio_sync', 'alerts', 'education', 'news', 'settings', 'admin', 'language', 'profile_edit',
+})
+_USERNAME_SLOT = '\x00username\x00'
+FAST_ACTION_MS = 250.0
+FAST_ACTION_SAMPLES = 20
+
+menu_cache = RenderCache(maxsize=512)
+screen_cache = ScreenCache(store=cache_store())
 
 
 @dataclass
@@ -46,6 +63,7 @@ class Router:
     webapp_url: str
     discord_url: str
     translator: TranslationService
+    broadcasts: BroadcastService = field(default_factory=BroadcastService)
 
     def _t(self, user: UserContext, key: str, **kwargs: str) -> str:
         return t(key, user.language, **kwargs)
@@ -54,6 +72,17 @@ class Router:
         return ButtonSpec(self._t(user, key), action)
 
     def main_menu(self, user: UserContext, display_name: str | None = None) -> UIMessage:
+        with metrics.track('menu:main'):
+            key = ('main', user.language, user.tier, user.is_admin)
+            cached = menu_cache.get(key)
+            if cached is None:
+                cached = self._build_main_menu(user)
+                cached.cache_key = key
+                menu_cache.put(key, cached)
+            text = cached.text.replace(_USERNAME_SLOT, display_name or user.username or 'Investor')
+            return replace(cached, text=text)
+
+    def _build_main_menu(self, user: UserContext) -> UIMessage:
         buttons = [
             [self._btn(user, 'btn.start_here', 'menu:onboarding'), self._btn(user, 'btn.quick_prices', 'action:crypto_prices')],
             [self._btn(user, 'btn.markets', 'menu:markets'), self._btn(user, 'btn.crypto', 'menu:crypto')],
@@ -70,14 +99,31 @@ class Router:
         intro = self._t(
             user,
             'main.intro',
-            username=display_name or user.username or 'Investor',
+            username=_USERNAME_SLOT,
             tier=self._t(user, f'tier.{user.tier}'),
         )
         text = format_section(self._t(user, 'main.title'), intro)
         return UIMessage(text=text, buttons=buttons)
 
     def menu(self, menu_id: str, user: UserContext) -> UIMessage:
-        menus: dict[str, UIMessage] = {
+        if menu_id == 'profile':
+            with metrics.track('menu:profile'):
+                return self._profile_menu(user)
+        if menu_id not in STATIC_MENUS:
+            return self.main_menu(user)
+        with metrics.track(f'menu:{menu_id}'):
+            key = (menu_id, user.language, user.tier, user.is_admin)
+            cached = menu_cache.get(key)
+            if cached is None:
+                built = self._build_menus(user)
+                for name, message in built.items():
+                    message.cache_key = (name, *key[1:])
+                    menu_cache.put(message.cache_key, message)
+                cached = built[menu_id]
+            return replace(cached)
+
+    def _build_menus(self, user: UserContext) -> dict[str, UIMessage]:
+        return {
             'markets': UIMessage(
                 text=format_section(self._t(user, 'menu.markets.title'), self._t(user, 'menu.markets.body')),
                 buttons=[
@@ -195,10 +241,8 @@ class Router:
             'settings': self._settings_menu(user),
             'admin': self._admin_menu(user),
             'language': self._language_menu(user),
-            'profile': self._profile_menu(user),
             'profile_edit': self._profile_edit_menu(user),
         }
-        return menus.get(menu_id, self.main_menu(user))
 
     def _portfolio_buttons(self, user: UserContext) -> list[list[ButtonSpec]]:
         return [
@@ -249,7 +293,7 @@ class Router:
             return UIMessage(text=self._t(user, 'msg.admin_required'), buttons=[[self._btn(user, 'btn.back', 'menu:settings')]])
         buttons = [
             [self._btn(user, 'btn.broadcast', 'action:admin_broadcast')],
-            [self._btn(user, 'btn.user_stats', 'action:admin_stats')],
+            [self._btn(user, 'btn.user_stats', 'action:admin_stats'), self._btn(user, 'btn.latency', 'action:admin_latency')],
             [self._btn(user, 'btn.feature_toggle', 'action:admin_toggle')],
             [self._btn(user, 'btn.verify', 'action:admin_verify')],
             [self._btn(user, 'btn.back', 'menu:settings')],
@@ -292,108 +336,60 @@ class Router:
         return UIMessage(text=text, buttons=buttons)
 
     async def handle_action(self, action: str, user: UserContext, payload: str | None = None) -> UIMessage:
-        action_map: dict[str, Callable[[], Awaitable[UIMessage]]] = {
-            'stocks_price': lambda: self._stocks_price(user),
-            'stocks_fundamentals': lambda: self._stocks_fundamentals(user),
-            'stocks_fundamentals_input': lambda: self._stocks_fundamentals_input(user),
-            'stocks_fundamentals_portfolio': lambda: self._stocks_fundamentals_portfolio(user, payload),
-            'stocks_fundamentals_symbol': lambda: self._stocks_fundamentals_symbol(user, payload),
-            'stocks_ratios': lambda: self._stocks_ratios(user),
-            'stocks_ratios_input': lambda: self._stocks_ratios_input(user),
-            'stocks_ratios_portfolio': lambda: self._stocks_ratios_portfolio(user, payload),
-            'stocks_ratios_symbol': lambda: self._stocks_ratios_symbol(user, payload),
-            'stocks_earnings': lambda: self._stocks_earnings(user),
-            'stocks_earnings_input': lambda: self._stocks_earnings_input(user),
-            'stocks_earnings_portfolio': lambda: self._stocks_earnings_portfolio(user, payload),
-            'stocks_earnings_symbol': lambda: self._stocks_earnings_symbol(user, payload),
-            'stocks_dividends': lambda: self._stocks_dividends(user),
-            'stocks_dividends_input': lambda: self._stocks_dividends_input(user),
-            'stocks_dividends_portfolio': lambda: self._stocks_dividends_portfolio(user, payload),
-            'stocks_dividends_symbol': lambda: self._stocks_dividends_symbol(user, payload),
-            'stocks_find': lambda: self._stocks_find(user),
-            'stocks_find_input': lambda: self._stocks_find_input(user),
-            'stocks_profile': lambda: self._stocks_profile(user, payload),
-            'stocks_top': lambda: self._stocks_top(user, payload),
-            'stocks_valuation': lambda: self._stocks_valuation(user),
-            'etfs': lambda: self._etfs(user),
-            'etf_top': lambda: self._etf_top(user, payload),
-            'etf_profile': lambda: self._stocks_profile(user, payload),
-            'forex_rates': lambda: self._forex_rates(user),
-            'forex_top': lambda: self._forex_top(user, payload),
-            'forex_find_input': lambda: self._forex_find_input(user),
-            'forex_profile': lambda: self._forex_profile(user, payload),
-            'crypto_prices': lambda: self._crypto_prices(user),
-            'crypto_dominance': lambda: self._crypto_dominance(user),
-            'crypto_onchain': lambda: self._crypto_onchain(user),
-            'crypto_find': lambda: self._crypto_find(user),
-            'crypto_profile': lambda: self._crypto_profile(user, payload),
-            'crypto_top': lambda: self._crypto_top(user, payload),
-            'alerts_crypto': lambda: self._alerts_crypto(user),
-            'alerts_price_add': lambda: self._alerts_price_add(user),
-            'alerts_percent_add': lambda: self._alerts_percent_add(user),
-            'alerts_list': lambda: self._alerts_list(user),
-            'ton_price': lambda: self._ton_price(user),
-            'ton_nfts': lambda: self._ton_nfts(user),
-            'ton_wallet': lambda: self._ton_wallet(user),
-            'ton_usernames': lambda: self._ton_usernames(user),
-            'ton_gifts': lambda: self._ton_gifts(user),
-            'ton_projects': lambda: self._ton_projects(user, payload),
-            'nft_floor': lambda: self._nft_floor(user),
-            'nft_collections': lambda: self._nft_collections(user),
-            'nft_search': lambda: self._nft_search(user),
-            'portfolio_add': lambda: self._portfolio_add(user),
-            'portfolio_add_type': lambda: self._portfolio_add_type(user, payload),
-            'portfolio_add_custom': lambda: self._portfolio_add_custom(user),
-            'portfolio_remove': lambda: self._portfolio_remove_menu(user, payload),
-            'portfolio_remove_symbol': lambda: self._portfolio_remove_symbol(user, payload),
-            'portfolio_list': lambda: self._portfolio_list(user),
-            'portfolio_pnl': lambda: self._portfolio_pnl(user),
-            'portfolio_allocation': lambda: self._portfolio_allocation(user),
-            'portfolio_link_exchange': lambda: self._portfolio_link_exchange(user),
-            'portfolio_link_wallet': lambda: self._portfolio_link_wallet(user),
-            'portfolio_sync_run': lambda: self._portfolio_sync_run(user),
-            'portfolio_links': lambda: self._portfolio_links(user),
-            'portfolio_link_remove': lambda: self._portfolio_link_remove(user, payload),
-            'portfolio_import_csv': lambda: self._portfolio_import_csv(user),
-            'portfolio_export_csv': lambda: self._portfolio_export_csv(user),
-            'favorites_add': lambda: self._favorites_add(user),
-            'favorites_add_type': lambda: self._favorites_add_type(user, payload),
-            'favorites_add_symbol': lambda: self._favorites_add_symbol(user, payload),
-            'favorites_list': lambda: self._favorites_list(user),
-            'favorites_remove': lambda: self._favorites_remove_menu(user, payload),
-            'favorites_remove_symbol': lambda: self._favorites_remove_symbol(user, payload),
-            'education_lessons': lambda: self._education_lessons(user, payload),
-            'education_lesson': lambda: self._education_lesson(user, payload),
-            'education_glossary': lambda: self._education_glossary(user),
-            'education_quiz': lambda: self._education_quiz(user),
-            'news_headlines': lambda: self._news_headlines(user, payload),
-            'news_project': lambda: self._news_project(user, payload),
-            'subscription_status': lambda: self._subscription_status(user),
-            'subscription_manage': lambda: self._subscription_manage(user),
-            'subscription_upgrade_pro': lambda: self._subscription_upgrade(user, 'pro'),
-            'subscription_upgrade_elite': lambda: self._subscription_upgrade(user, 'elite'),
-            'language_set_ru': lambda: self._set_language(user, 'ru'),
-            'language_set_en': lambda: self._set_language(user, 'en'),
-            'admin_broadcast': lambda: self._admin_broadcast(user),
-            'admin_stats': lambda: self._admin_stats(user),
-            'admin_toggle': lambda: self._admin_toggle(user),
-            'admin_verify': lambda: self._admin_verify(user),
-            'profile_card': lambda: self._profile_card(user),
-            'profile_share': lambda: self._profile_share(user),
-            'profile_edit_field': lambda: self._profile_edit_field(user, payload),
-        }
-        handler = action_map.get(action)
-        if not handler:
+        spec = ACTIONS.get(action)
+        if spec is None:
             return UIMessage(text=self._t(user, 'msg.unknown_action'))
-        message = await handler()
+        with metrics.track(f'action:{action}'):
+            return await self._handle_action(spec, action, user, payload)
+
+    async def _handle_action(self, spec: ActionSpec, action: str, user: UserContext, payload: str | None) -> UIMessage:
+        if spec.admin and not is_admin_allowed(user):
+            message = UIMessage(text=self._t(user, 'msg.admin_required'))
+        elif spec.gate and not has_access(user, spec.gate):
+            message = UIMessage(text=missing_access_message(spec.gate, user.language))
+        elif spec.ttl:
+            key = _screen_key(action, payload, user)
+            message = await screen_cache.get_or_render(key, spec.ttl, lambda: self._dispatch(spec, user, payload))
+        else:
+            message = await self._dispatch(spec, user, payload)
         if message.buttons is None:
-            back_menu = ACTION_BACK_MENU.get(action, 'main')
             message.buttons = [
-                [self._btn(user, 'btn.back', f'menu:{back_menu}')],
+                [self._btn(user, 'btn.back', f'menu:{spec.back}')],
                 [self._btn(user, 'btn.main_menu', 'menu:main')],
             ]
         return message
 
+    async def prefetch(self, action: str, user: UserContext, payload: str | None = None) -> bool:
+        spec = ACTIONS.get(action)
+        if spec is None or not spec.ttl or spec.admin or (spec.gate and not has_access(user, spec.gate)):
+            return False
+        key = _screen_key(action, payload, user)
+        if screen_cache.fresh(key):
+            return False
+        await screen_cache.get_or_render(key, spec.ttl, lambda: self._dispatch(spec, user, payload), speculative=True)
+        return True
+
+    def is_idempotent(self, action: str) -> bool:
+        spec = ACTIONS.get(action)
+        return spec is None or bool(spec.ttl)
+
+    def is_fast(self, action: str, user: UserContext, payload: str | None = None) -> bool:
+        spec = ACTIONS.get(action)
+        if spec is None or (spec.admin and not is_admin_allowed(user)) or (spec.gate and not has_access(user, spec.gate)):
+            return True
+        if spec.ttl:
+            return screen_cache.fresh(_screen_key(action, payload, user))
+        p95 = metrics.quantile(f'action:{action}', 0.95, min_count=FAST_ACTION_SAMPLES)
+        return p95 is not None and p95 < FAST_ACTION_MS
+
+    async def _dispatch(self, spec: ActionSpec, user: UserContext, payload: str | None) -> UIMessage:
+        if spec.payload:
+            return await spec.handler(self, user, payload)
+        if spec.arg is not None:
+            return await spec.handler(self, user, spec.arg)
+        return await spec.handler(self, user)
+
+    @action('stocks_price', back='stocks')
     async def _stocks_price(self, user: UserContext) -> UIMessage:
         quote = await self.stocks.get_price('AAPL')
         text = format_section(self._t(user, 'menu.stocks.title'), format_kv([
@@ -403,6 +399,7 @@ class Router:
         ]))
         return UIMessage(text=text)
 
+    @action('stocks_find', back='stocks')
     async def _stocks_find(self, user: UserContext) -> UIMessage:
         popular = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOGL', 'META', 'TSLA', 'JPM']
         rows: list[list[ButtonSpec]] = []
@@ -418,9 +415,11 @@ class Router:
         rows.append([self._btn(user, 'btn.back', 'menu:stocks')])
         return UIMessage(text=self._t(user, 'msg.stocks_find_menu'), buttons=rows)
 
+    @action('stocks_find_input', back='stocks')
     async def _stocks_find_input(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.stocks_find'), expect_input='stocks_find', input_hint='AAPL / TSLA / NVDA')
 
+    @action('stocks_valuation', back='stocks')
     async def _stocks_valuation(self, user: UserContext) -> UIMessage:
         return UIMessage(
             text=self._t(user, 'msg.stocks_valuation_hint'),
@@ -428,90 +427,92 @@ class Router:
             input_hint='AAPL / TSLA / NVDA',
         )
 
+    @action('stocks_fundamentals', back='stocks', gate='stocks_fundamentals')
     async def _stocks_fundamentals(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_fundamentals'):
-            return UIMessage(text=missing_access_message('stocks_fundamentals', user.language))
         return self._stock_metric_menu(user, 'btn.fundamentals', 'stocks_fundamentals')
 
+    @action('stocks_fundamentals_input', back='stocks', gate='stocks_fundamentals')
     async def _stocks_fundamentals_input(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_fundamentals'):
-            return UIMessage(text=missing_access_message('stocks_fundamentals', user.language))
         return UIMessage(
             text=self._t(user, 'msg.stocks_find'),
             expect_input='stocks_fundamentals_symbol',
             input_hint='AAPL / TSLA / SPY',
         )
 
+    @action('stocks_fundamentals_portfolio', back='stocks', gate='stocks_fundamentals', payload=True)
     async def _stocks_fundamentals_portfolio(self, user: UserContext, payload: str | None) -> UIMessage:
         return await self._stock_metric_portfolio(user, payload, 'stocks_fundamentals', 'btn.fundamentals')
 
+    @action('stocks_fundamentals_symbol', back='stocks', gate='stocks_fundamentals', payload=True)
     async def _stocks_fundamentals_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'AAPL').upper()
         return await self.build_stock_fundamentals(user, symbol)
 
+    @action('stocks_ratios', back='stocks', gate='stocks_ratios')
     async def _stocks_ratios(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_ratios'):
-            return UIMessage(text=missing_access_message('stocks_ratios', user.language))
         return self._stock_metric_menu(user, 'btn.ratios', 'stocks_ratios')
 
+    @action('stocks_ratios_input', back='stocks', gate='stocks_ratios')
     async def _stocks_ratios_input(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_ratios'):
-            return UIMessage(text=missing_access_message('stocks_ratios', user.language))
         return UIMessage(
             text=self._t(user, 'msg.stocks_find'),
             expect_input='stocks_ratios_symbol',
             input_hint='AAPL / TSLA / SPY',
         )
 
+    @action('stocks_ratios_portfolio', back='stocks', gate='stocks_ratios', payload=True)
     async def _stocks_ratios_portfolio(self, user: UserContext, payload: str | None) -> UIMessage:
         return await self._stock_metric_portfolio(user, payload, 'stocks_ratios', 'btn.ratios')
 
+    @action('stocks_ratios_symbol', back='stocks', gate='stocks_ratios', payload=True)
     async def _stocks_ratios_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'AAPL').upper()
         return await self.build_stock_ratios(user, symbol)
 
+    @action('stocks_earnings', back='stocks', gate='stocks_earnings')
     async def _stocks_earnings(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_earnings'):
-            return UIMessage(text=missing_access_message('stocks_earnings', user.language))
         return self._stock_metric_menu(user, 'btn.earnings', 'stocks_earnings')
 
+    @action('stocks_earnings_input', back='stocks', gate='stocks_earnings')
     async def _stocks_earnings_input(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_earnings'):
-            return UIMessage(text=missing_access_message('stocks_earnings', user.language))
         return UIMessage(
             text=self._t(user, 'msg.stocks_find'),
             expect_input='stocks_earnings_symbol',
             input_hint='AAPL / TSLA / SPY',
         )
 
+    @action('stocks_earnings_portfolio', back='stocks', gate='stocks_earnings', payload=True)
     async def _stocks_earnings_portfolio(self, user: UserContext, payload: str | None) -> UIMessage:
         return await self._stock_metric_portfolio(user, payload, 'stocks_earnings', 'btn.earnings')
 
+    @action('stocks_earnings_symbol', back='stocks', gate='stocks_earnings', payload=True)
     async def _stocks_earnings_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'AAPL').upper()
         return await self.build_stock_earnings(user, symbol)
 
+    @action('stocks_dividends', back='stocks', gate='stocks_dividends')
     async def _stocks_dividends(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_dividends'):
-            return UIMessage(text=missing_access_message('stocks_dividends', user.language))
         return self._stock_metric_menu(user, 'btn.dividends', 'stocks_dividends')
 
+    @action('stocks_dividends_input', back='stocks', gate='stocks_dividends')
     async def _stocks_dividends_input(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'stocks_dividends'):
-            return UIMessage(text=missing_access_message('stocks_dividends', user.language))
         return UIMessage(
             text=self._t(user, 'msg.stocks_find'),
             expect_input='stocks_dividends_symbol',
             input_hint='AAPL / TSLA / SPY',
         )
 
+    @action('stocks_dividends_portfolio', back='stocks', gate='stocks_dividends', payload=True)
     async def _stocks_dividends_portfolio(self, user: UserContext, payload: str | None) -> UIMessage:
         return await self._stock_metric_portfolio(user, payload, 'stocks_dividends', 'btn.dividends')
 
+    @action('stocks_dividends_symbol', back='stocks', gate='stocks_dividends', payload=True)
     async def _stocks_dividends_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'AAPL').upper()
         return await self.build_stock_dividends(user, symbol)
 
+    @action('stocks_profile', back='stocks', payload=True)
+    @action('etf_profile', back='etfs', payload=True)
     async def _stocks_profile(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'AAPL').upper()
         return await self.build_stock_profile(user, symbol)
@@ -585,6 +586,7 @@ class Router:
         text = format_section(self._t(user, title_key), self._t(user, 'msg.choose_stock', count=str(len(order))))
         return UIMessage(text=text, buttons=buttons)
 
+    @action('stocks_top', back='stocks', payload=True, ttl=60)
     async def _stocks_top(self, user: UserContext, payload: str | None) -> UIMessage:
         sort, page = _parse_sort_page(payload, default_sort='popular')
         symbols = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOGL', 'META', 'TSLA', 'JPM', 'V', 'UNH', 'BRK.B', 'XOM', 'AVGO', 'COST', 'LLY']
@@ -655,6 +657,7 @@ class Router:
             lines.append(self._t(user, 'msg.earnings_empty'))
         return UIMessage(text=format_section(self._t(user, 'btn.earnings'), "\n".join(lines)))
 
+    @action('etf_top', back='etfs', payload=True, ttl=60)
     async def _etf_top(self, user: UserContext, payload: str | None) -> UIMessage:
         sort, page = _parse_sort_page(payload, default_sort='gainers')
         symbols = ['SPY', 'QQQ', 'VTI', 'IWM', 'DIA', 'XLK', 'XLF', 'XLV']
@@ -669,6 +672,7 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:etfs')])
         return UIMessage(text=text, buttons=buttons)
 
+    @action('forex_top', back='forex', payload=True, ttl=120)
     async def _forex_top(self, user: UserContext, payload: str | None) -> UIMessage:
         sort, page = _parse_sort_page(payload, default_sort='gainers')
         pairs = ['EUR/USD', 'GBP/USD', 'USD/JPY', 'USD/CHF', 'AUD/USD']
@@ -686,9 +690,11 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:forex')])
         return UIMessage(text=text, buttons=buttons)
 
+    @action('forex_find_input', back='forex')
     async def _forex_find_input(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.forex_find'), expect_input='forex_find', input_hint='EUR/USD')
 
+    @action('forex_profile', back='forex', payload=True)
     async def _forex_profile(self, user: UserContext, payload: str | None) -> UIMessage:
         pair = (payload or 'EUR/USD').upper()
         return await self.build_forex_profile(user, pair)
@@ -841,6 +847,7 @@ class Router:
             lines.append(self._t(user, 'msg.news_empty'))
         return UIMessage(text="\n".join(lines))
 
+    @action('crypto_profile', back='crypto', payload=True)
     async def _crypto_profile(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or 'BTC').upper()
         return await self.build_crypto_profile(user, symbol)
@@ -1018,15 +1025,18 @@ class Router:
             lines.extend(contacts)
         return "\n".join(lines)
 
+    @action('etfs', back='etfs')
     async def _etfs(self, user: UserContext) -> UIMessage:
         items = await self.stocks.get_top_etfs()
         return UIMessage(text=format_section(self._t(user, 'btn.etfs'), "\n".join(items)))
 
+    @action('forex_rates', back='forex')
     async def _forex_rates(self, user: UserContext) -> UIMessage:
         data = await self.forex.get_rates('USD', ['EUR', 'JPY', 'GBP'])
         lines = [f"USD/{k}: {v}" for k, v in data.items()]
         return UIMessage(text=format_section(self._t(user, 'btn.rates'), "\n".join(lines)))
 
+    @action('crypto_prices', back='crypto')
     async def _crypto_prices(self, user: UserContext, payload: str | None = None) -> UIMessage:
         crypto_assets = await self.crypto.get_top_assets(10)
         crypto_lines = [self._format_asset_row(user, a) for a in crypto_assets]
@@ -1065,19 +1075,21 @@ class Router:
         ]
         return UIMessage(text=f"{crypto_text}\n\n{stocks_text}\n\n{funds_text}", buttons=buttons)
 
+    @action('crypto_dominance', back='crypto')
     async def _crypto_dominance(self, user: UserContext) -> UIMessage:
         data = await self.crypto.get_dominance()
         return UIMessage(text=format_section(self._t(user, 'btn.dominance'), format_kv(list(data.items()))))
 
+    @action('crypto_onchain', back='crypto', gate='crypto_onchain')
     async def _crypto_onchain(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'crypto_onchain'):
-            return UIMessage(text=missing_access_message('crypto_onchain', user.language))
         data = await self.crypto.get_onchain_summary('bitcoin')
         return UIMessage(text=format_section(self._t(user, 'btn.onchain'), format_kv(list(data.items()))))
 
+    @action('crypto_find', back='crypto')
     async def _crypto_find(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.crypto_find'), expect_input='crypto_find', input_hint='BTC / ETH / SOL')
 
+    @action('crypto_top', back='crypto', payload=True, ttl=60)
     async def _crypto_top(self, user: UserContext, payload: str | None = None) -> UIMessage:
         page = int(payload or '1')
         assets = await self.crypto.get_top_assets(100)
@@ -1093,17 +1105,19 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:crypto')])
         return UIMessage(text=text, buttons=buttons)
 
+    @action('alerts_crypto', back='crypto')
     async def _alerts_crypto(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.alerts_hint'))
 
+    @action('alerts_price_add', back='alerts')
     async def _alerts_price_add(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.send_alert_price'), expect_input='alert_price', input_hint='Example: crypto BTC 65000')
 
+    @action('alerts_percent_add', back='alerts', gate='alerts_advanced')
     async def _alerts_percent_add(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'alerts_advanced'):
-            return UIMessage(text=missing_access_message('alerts_advanced', user.language))
         return UIMessage(text=self._t(user, 'msg.send_alert_percent'), expect_input='alert_percent', input_hint='Example: stock TSLA 5')
 
+    @action('alerts_list', back='alerts')
     async def _alerts_list(self, user: UserContext) -> UIMessage:
         items = await self.alerts.list_alerts(user)
         if not items:
@@ -1242,23 +1256,29 @@ class Router:
             return f"${value/1_000_000:.2f}M"
         return f"${value:,.0f}"
 
+    @action('ton_price', back='ton')
     async def _ton_price(self, user: UserContext) -> UIMessage:
         data = await self.ton.get_price()
         return UIMessage(text=format_section(self._t(user, 'menu.ton.title'), format_kv(list(data.items()))))
 
+    @action('ton_nfts', back='ton')
     async def _ton_nfts(self, user: UserContext) -> UIMessage:
         items = await self.ton.get_nft_collections()
         return UIMessage(text=format_section(self._t(user, 'btn.nfts'), "\n".join(items)))
 
+    @action('ton_wallet', back='ton')
     async def _ton_wallet(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.send_ton_wallet'), expect_input='ton_wallet', input_hint='Example: EQB...')
 
+    @action('ton_usernames', back='ton')
     async def _ton_usernames(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.ton_username_hint'), expect_input='ton_usernames', input_hint='alice.ton / alice.t.me / EQB...')
 
+    @action('ton_gifts', back='ton')
     async def _ton_gifts(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.ton_gifts_hint'), expect_input='ton_gifts', input_hint='alice.ton / EQB...')
 
+    @action('ton_projects', back='ton', payload=True, ttl=300)
     async def _ton_projects(self, user: UserContext, payload: str | None = None) -> UIMessage:
         page = int(payload or '1')
         page = max(1, page)
@@ -1276,18 +1296,22 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:ton')])
         return UIMessage(text=text, buttons=buttons)
 
+    @action('nft_floor', back='nft')
     async def _nft_floor(self, user: UserContext) -> UIMessage:
         data = await self.nft.get_floor_prices(['azuki', 'bored-ape-yacht-club'])
         lines = [f"{k}: {v}" for k, v in data.items()]
         return UIMessage(text=format_section(self._t(user, 'btn.floor_prices'), "\n".join(lines)))
 
+    @action('nft_collections', back='nft')
     async def _nft_collections(self, user: UserContext) -> UIMessage:
         items = await self.nft.get_top_collections()
         return UIMessage(text=format_section(self._t(user, 'btn.collections'), "\n".join(items)))
 
+    @action('nft_search', back='nft')
     async def _nft_search(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.send_nft_search'), expect_input='nft_search', input_hint='Example: Pudgy Penguins')
 
+    @action('portfolio_add', back='portfolio')
     async def _portfolio_add(self, user: UserContext) -> UIMessage:
         return UIMessage(
             text=self._t(user, 'msg.portfolio_add_choose_type'),
@@ -1298,6 +1322,7 @@ class Router:
             ],
         )
 
+    @action('portfolio_add_custom', back='portfolio')
     async def _portfolio_add_custom(self, user: UserContext) -> UIMessage:
         return UIMessage(
             text=self._t(user, 'msg.send_portfolio_add'),
@@ -1305,6 +1330,7 @@ class Router:
             input_hint='TYPE SYMBOL AMOUNT COST',
         )
 
+    @action('portfolio_add_type', back='portfolio', payload=True)
     async def _portfolio_add_type(self, user: UserContext, payload: str | None) -> UIMessage:
         asset_type = (payload or 'stock').lower()
         return UIMessage(
@@ -1316,6 +1342,7 @@ class Router:
     async def _portfolio_remove(self, user: UserContext) -> UIMessage:
         return await self._portfolio_remove_menu(user, '1')
 
+    @action('portfolio_remove', back='portfolio', payload=True)
     async def _portfolio_remove_menu(self, user: UserContext, payload: str | None) -> UIMessage:
         items = await self.portfolio.list_assets(user)
         if not items:
@@ -1359,6 +1386,7 @@ class Router:
         )
         return UIMessage(text=text, buttons=buttons)
 
+    @action('portfolio_remove_symbol', back='portfolio', payload=True)
     async def _portfolio_remove_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         symbol = (payload or '').upper().strip()
         if not symbol:
@@ -1369,6 +1397,7 @@ class Router:
         menu.text = f"{prefix}\n\n{menu.text}"
         return menu
 
+    @action('portfolio_list', back='portfolio')
     async def _portfolio_list(self, user: UserContext) -> UIMessage:
         items = await self.portfolio.list_assets(user)
         if not items:
@@ -1386,30 +1415,35 @@ class Router:
             )
         return UIMessage(text="\n".join(lines))
 
+    @action('portfolio_pnl', back='portfolio', gate='portfolio_pnl')
     async def _portfolio_pnl(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'portfolio_pnl'):
-            return UIMessage(text=missing_access_message('portfolio_pnl', user.language))
         data = await self.portfolio.get_pnl(user)
         return UIMessage(text=format_section(self._t(user, 'btn.pnl'), format_kv(list(data.items()))))
 
+    @action('portfolio_allocation', back='portfolio')
     async def _portfolio_allocation(self, user: UserContext) -> UIMessage:
         data = await self.portfolio.get_allocation(user)
         return UIMessage(text=format_section(self._t(user, 'btn.allocation'), format_kv(list(data.items()))))
 
+    @action('portfolio_link_exchange', back='portfolio_sync')
     async def _portfolio_link_exchange(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.sync_exchange_hint'), expect_input='portfolio_link_exchange', input_hint='binance KEY SECRET')
 
+    @action('portfolio_link_wallet', back='portfolio_sync')
     async def _portfolio_link_wallet(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.sync_wallet_hint'), expect_input='portfolio_link_wallet', input_hint='ton EQB... MyWallet')
 
+    @action('portfolio_import_csv', back='portfolio_sync')
     async def _portfolio_import_csv(self, user: UserContext) -> UIMessage:
         return UIMessage(text=self._t(user, 'msg.import_csv_hint'), expect_input='portfolio_import_csv', input_hint='asset_type,symbol,amount,cost_basis')
 
+    @action('portfolio_export_csv', back='portfolio_sync')
     async def _portfolio_export_csv(self, user: UserContext) -> UIMessage:
         csv_text = await self.portfolio.export_csv(user)
         text = f"{self._t(user, 'msg.export_csv')}\n```\n{csv_text.strip()}\n```"
         return UIMessage(text=text)
 
+    @action('portfolio_links', back='portfolio_sync')
     async def _portfolio_links(self, user: UserContext) -> UIMessage:
         links = await self.links.list_links(user)
         if not links:
@@ -1426,6 +1460,7 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:portfolio_sync')])
         return UIMessage(text="\n".join(lines), buttons=buttons)
 
+    @action('favorites_add', back='favorites')
     async def _favorites_add(self, user: UserContext) -> UIMessage:
         return UIMessage(
             text=self._t(user, 'msg.favorites_choose_type'),
@@ -1436,6 +1471,7 @@ class Router:
             ],
         )
 
+    @action('favorites_add_type', back='favorites', payload=True)
     async def _favorites_add_type(self, user: UserContext, payload: str | None) -> UIMessage:
         asset_type = (payload or 'stock').lower()
         return UIMessage(
@@ -1444,6 +1480,7 @@ class Router:
             input_hint='AAPL / SPY / BTC / EUR/USD',
         )
 
+    @action('favorites_add_symbol', back='favorites', payload=True)
     async def _favorites_add_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         raw = (payload or '').strip()
         if ':' in raw:
@@ -1458,6 +1495,7 @@ class Router:
         msg = 'msg.favorite_added' if added else 'msg.favorite_exists'
         return UIMessage(text=self._t(user, msg, symbol=symbol))
 
+    @action('favorites_list', back='favorites')
     async def _favorites_list(self, user: UserContext) -> UIMessage:
         items = await self.favorites.list_favorites(user)
         if not items:
@@ -1469,6 +1507,7 @@ class Router:
         ]
         return UIMessage(text=format_section(self._t(user, 'btn.list_favorites'), "\n".join(lines)))
 
+    @action('favorites_remove', back='favorites', payload=True)
     async def _favorites_remove_menu(self, user: UserContext, payload: str | None) -> UIMessage:
         items = await self.favorites.list_favorites(user)
         if not items:
@@ -1498,6 +1537,7 @@ class Router:
         text = format_section(self._t(user, 'btn.remove_favorite'), self._t(user, 'msg.favorites_choose_remove', count=str(len(order))))
         return UIMessage(text=text, buttons=buttons)
 
+    @action('favorites_remove_symbol', back='favorites', payload=True)
     async def _favorites_remove_symbol(self, user: UserContext, payload: str | None) -> UIMessage:
         if not payload or ':' not in payload:
             return await self._favorites_remove_menu(user, '1')
@@ -1508,6 +1548,7 @@ class Router:
         menu.text = f"{prefix}\n\n{menu.text}"
         return menu
 
+    @action('portfolio_link_remove', back='portfolio_sync', payload=True)
     async def _portfolio_link_remove(self, user: UserContext, payload: str | None) -> UIMessage:
         try:
             link_id = int(payload or '0')
@@ -1519,6 +1560,7 @@ class Router:
         message.text = f"{self._t(user, 'msg.sync_removed')}\n\n{message.text}"
         return message
 
+    @action('portfolio_sync_run', back='portfolio_sync')
     async def _portfolio_sync_run(self, user: UserContext) -> UIMessage:
         links = await self.links.list_links(user)
         if not links:
@@ -1636,6 +1678,7 @@ class Router:
             return UIMessage(text=self._t(user, 'msg.invalid_csv'))
         return UIMessage(text=self._t(user, 'msg.import_csv_done', count=str(count)))
 
+    @action('education_lessons', back='education', payload=True)
     async def _education_lessons(self, user: UserContext, payload: str | None = None) -> UIMessage:
         page = int(payload or '1')
         lessons = await self.education.get_lessons(user.language)
@@ -1664,10 +1707,12 @@ class Router:
         text = format_section(self._t(user, 'btn.mini_lessons'), "\n".join(lines))
         return UIMessage(text=text, buttons=buttons)
 
+    @action('education_glossary', back='education')
     async def _education_glossary(self, user: UserContext) -> UIMessage:
         items = await self.education.get_glossary(user.language)
         return UIMessage(text=format_section(self._t(user, 'btn.glossary'), "\n".join(items)))
 
+    @action('education_lesson', back='education', payload=True)
     async def _education_lesson(self, user: UserContext, payload: str | None) -> UIMessage:
         lesson_id = ''
         page = 1
@@ -1704,12 +1749,12 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:education')])
         return UIMessage(text="\n".join(lines), buttons=buttons)
 
+    @action('education_quiz', back='education', gate='education_quiz')
     async def _education_quiz(self, user: UserContext) -> UIMessage:
-        if not has_access(user, 'education_quiz'):
-            return UIMessage(text=missing_access_message('education_quiz', user.language))
         item = await self.education.get_quiz()
         return UIMessage(text=format_section(self._t(user, 'btn.quizzes'), item))
 
+    @action('news_headlines', back='news', payload=True, ttl=300)
     async def _news_headlines(self, user: UserContext, payload: str | None = None) -> UIMessage:
         page, mode = self._parse_page_mode(payload)
         items = await self.news.get_headlines()
@@ -1724,9 +1769,8 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:news')])
         return UIMessage(text=text, buttons=buttons, parse_mode='HTML')
 
+    @action('news_project', back='news', gate='news_project', payload=True)
     async def _news_project(self, user: UserContext, payload: str | None = None) -> UIMessage:
-        if not has_access(user, 'news_project'):
-            return UIMessage(text=missing_access_message('news_project', user.language))
         page, mode = self._parse_page_mode(payload)
         items = await self.news.get_project_news('ton')
         page_items, page, total = paginate(items, page)
@@ -1822,50 +1866,114 @@ class Router:
                 return ''
         return ''
 
+    @action('subscription_status', back='settings')
     async def _subscription_status(self, user: UserContext) -> UIMessage:
         status = await self.payments.get_subscription_status(user)
         return UIMessage(text=format_section(self._t(user, 'btn.subscription'), status))
 
+    @action('subscription_manage', back='settings')
     async def _subscription_manage(self, user: UserContext) -> UIMessage:
         link = await self.payments.get_manage_link(user)
         return UIMessage(text=self._t(user, 'msg.subscription_manage', link=link))
 
+    @action('subscription_upgrade_pro', back='settings', arg='pro')
+    @action('subscription_upgrade_elite', back='settings', arg='elite')
     async def _subscription_upgrade(self, user: UserContext, tier: str) -> UIMessage:
         link = await self.payments.create_checkout_link(user, tier)
         return UIMessage(text=self._t(user, 'msg.subscription_upgrade', tier=tier.upper(), link=link))
 
+    @action('language_set_ru', back='language', arg='ru')
+    @action('language_set_en', back='language', arg='en')
     async def _set_language(self, user: UserContext, language: str) -> UIMessage:
         await self.users.update_language(user.user_id, language)
         user.language = language
         label = self._t(user, 'btn.lang_ru') if language == 'ru' else self._t(user, 'btn.lang_en')
         return UIMessage(text=self._t(user, 'msg.language_set', language=label))
 
+    @action('admin_broadcast', back='admin', admin=True)
     async def _admin_broadcast(self, user: UserContext) -> UIMessage:
-        if not is_admin_allowed(user):
-            return UIMessage(text=self._t(user, 'msg.admin_required'))
-        return UIMessage(text=self._t(user, 'btn.broadcast'), expect_input='admin_broadcast', input_hint='Type your message')
+        text = self._t(user, 'btn.broadcast')
+        recent = await self.broadcasts.list_recent()
+        if recent:
+            lines = [
+                f"#{row['id']} {row['platform']} {row['status']}: ✅ {row['delivered']}/{row['total']} ❌ {row['failed']} 🚫 {row['blocked']}"
+                for row in recent
+            ]
+            text += "\n\n" + format_section(self._t(user, 'msg.broadcast_recent'), "\n".join(lines))
+        return UIMessage(
+            text=text,
+            expect_input='admin_broadcast',
+            input_hint='Type your message. Optional first line: lang=ru tier=pro platform=telegram',
+        )
 
-    async def _admin_stats(self, user: UserContext) -> UIMessage:
+    async def queue_broadcast(self, user: UserContext, raw: str) -> UIMessage:
         if not is_admin_allowed(user):
             return UIMessage(text=self._t(user, 'msg.admin_required'))
+        filters, text = parse_broadcast(raw)
+        platforms = [filters['platform']] if filters.get('platform') else ['telegram', 'discord']
+        ids = []
+        for platform in platforms:
+            broadcast_id = await self.broadcasts.create(platform, text, user.user_id, filters.get('language'), filters.get('tier'))
+            ids.append(f"#{broadcast_id}")
+        return UIMessage(text=self._t(user, 'msg.broadcast_queued', ids=', '.join(ids)))
+
+    @action('admin_stats', back='admin', admin=True)
+    async def _admin_stats(self, user: UserContext) -> UIMessage:
         stats = await self.users.get_user_stats()
-        return UIMessage(text=format_section(self._t(user, 'btn.user_stats'), format_kv(list(stats.items()))))
+        text = format_section(self._t(user, 'btn.user_stats'), format_kv(list(stats.items())))
+        engine = current_engine()
+        if engine is not None:
+            watch = engine.scheduler.stats()
+            markets = watch.pop('markets')
+            pairs = [(k, str(v)) for k, v in watch.items()] + [(f'market_{k}', str(v)) for k, v in markets.items()]
+            text += "\n\n" + format_section(self._t(user, 'msg.watch_stats'), format_kv(pairs))
+        if engine is not None and engine.jobs is not None:
+            lines = [
+                (name, f"ok={job['ok']} err={job['error']} timeout={job['timeout']} avg={job['avg_ms']}ms max={job['max_ms']}ms")
+                for name, job in engine.jobs.stats().items()
+            ]
+            text += "\n\n" + format_section(self._t(user, 'msg.job_stats'), format_kv(lines))
+        caches = [
+            (name, ' '.join(f"{k}={v}" for k, v in cache.stats().items()))
+            for name, cache in (('menus', menu_cache), ('screens', screen_cache), ('prefetch', prefetcher))
+        ]
+        text += "\n\n" + format_section(self._t(user, 'msg.cache_stats'), format_kv(caches))
+        return UIMessage(text=text)
+
+    @action('admin_latency', back='admin', admin=True)
+    async def _admin_latency(self, user: UserContext) -> UIMessage:
+        rows = metrics.summary()[:15]
+        if not rows:
+            return UIMessage(text=self._t(user, 'msg.latency_empty'))
+        lines = []
+        for row in rows:
+            total, provider, db, render = (row[phase] for phase in ('total', 'provider', 'db', 'render'))
+            lines.append(
+                f"`{row['name']}` n={row['count']}\n"
+                f"  {total[50]}/{total[95]}/{total[99]} | api {provider[95]} | db {db[95]} | cpu {render[95]}"
+            )
+        text = format_section(self._t(user, 'msg.latency_title'), "\n".join(lines))
+        slow = list(metrics.slow)[-5:]
+        if slow:
+            recent = [f"`{entry['name']}` {entry['total_ms']}ms " + ', '.join(entry['calls'][:3]) for entry in reversed(slow)]
+            text += "\n\n" + format_section(self._t(user, 'msg.slow_recent'), "\n".join(recent))
+        return UIMessage(text=text)
 
+    @action('admin_toggle', back='admin', admin=True)
     async def _admin_toggle(self, user: UserContext) -> UIMessage:
-        if not is_admin_allowed(user):
-            return UIMessage(text=self._t(user, 'msg.admin_required'))
         return UIMessage(text=self._t(user, 'btn.feature_toggle'), expect_input='admin_toggle', input_hint='Example: education_quiz')
 
+    @action('admin_verify', back='admin', admin=True)
     async def _admin_verify(self, user: UserContext) -> UIMessage:
-        if not is_admin_allowed(user):
-            return UIMessage(text=self._t(user, 'msg.admin_required'))
         return UIMessage(text=self._t(user, 'msg.verify_hint'), expect_input='admin_verify', input_hint='123456789 major')
 
+    @action('profile_card')
     async def _profile_card(self, user: UserContext) -> UIMessage:
         profile = await self.profiles.get_profile(user)
         text = self._build_profile_card(user, profile)
         return UIMessage(text=text, buttons=[[self._btn(user, 'btn.back', 'menu:profile')]])
 
+    @action('profile_share')
     async def _profile_share(self, user: UserContext) -> UIMessage:
         link = self._profile_share_link(user)
         if not link:
@@ -1879,6 +1987,7 @@ class Router:
         buttons.append([self._btn(user, 'btn.back', 'menu:profile')])
         return UIMessage(text=text, buttons=buttons)
 
+    @action('profile_edit_field', payload=True)
     async def _profile_edit_field(self, user: UserContext, payload: str | None) -> UIMessage:
         field = (payload or '').strip()
         if not field:
@@ -1897,93 +2006,12 @@ class Router:
         return UIMessage(text=text, buttons=[[self._btn(viewer, 'btn.back', 'menu:main')]])
 
 
-ACTION_BACK_MENU = {
-    'stocks_price': 'stocks',
-    'stocks_fundamentals': 'stocks',
-    'stocks_fundamentals_input': 'stocks',
-    'stocks_fundamentals_portfolio': 'stocks',
-    'stocks_fundamentals_symbol': 'stocks',
-    'stocks_ratios': 'stocks',
-    'stocks_ratios_input': 'stocks',
-    'stocks_ratios_portfolio': 'stocks',
-    'stocks_ratios_symbol': 'stocks',
-    'stocks_earnings': 'stocks',
-    'stocks_earnings_input': 'stocks',
-    'stocks_earnings_portfolio': 'stocks',
-    'stocks_earnings_symbol': 'stocks',
-    'stocks_dividends': 'stocks',
-    'stocks_dividends_input': 'stocks',
-    'stocks_dividends_portfolio': 'stocks',
-    'stocks_dividends_symbol': 'stocks',
-    'stocks_find': 'stocks',
-    'stocks_find_input': 'stocks',
-    'stocks_profile': 'stocks',
-    'stocks_top': 'stocks',
-    'stocks_valuation': 'stocks',
-    'etfs': 'etfs',
-    'etf_top': 'etfs',
-    'etf_profile': 'etfs',
-    'forex_rates': 'forex',
-    'forex_top': 'forex',
-    'forex_find_input': 'forex',
-    'forex_profile': 'forex',
-    'crypto_prices': 'crypto',
-    'crypto_dominance': 'crypto',
-    'crypto_onchain': 'crypto',
-    'crypto_top': 'crypto',
-    'crypto_find': 'crypto',
-    'crypto_profile': 'crypto',
-    'alerts_crypto': 'crypto',
-    'ton_price': 'ton',
-    'ton_nfts': 'ton',
-    'ton_wallet': 'ton',
-    'ton_usernames': 'ton',
-    'ton_gifts': 'ton',
-    'ton_projects': 'ton',
-    'nft_floor': 'nft',
-    'nft_collections': 'nft',
-    'nft_search': 'nft',
-    'portfolio_add': 'portfolio',
-    'portfolio_add_type': 'portfolio',
-    'portfolio_add_custom': 'portfolio',
-    'portfolio_remove': 'portfolio',
-    'portfolio_remove_symbol': 'portfolio',
-    'portfolio_list': 'portfolio',
-    'portfolio_pnl': 'portfolio',
-    'portfolio_allocation': 'portfolio',
-    'portfolio_link_exchange': 'portfolio_sync',
-    'portfolio_link_wallet': 'portfolio_sync',
-    'portfolio_sync_run': 'portfolio_sync',
-    'portfolio_links': 'portfolio_sync',
-    'portfolio_link_remove': 'portfolio_sync',
-    'portfolio_import_csv': 'portfolio_sync',
-    'portfolio_export_csv': 'portfolio_sync',
-    'favorites_add': 'favorites',
-    'favorites_add_type': 'favorites',
-    'favorites_add_symbol': 'favorites',
-    'favorites_list': 'favorites',
-    'favorites_remove': 'favorites',
-    'favorites_remove_symbol': 'favorites',
-    'alerts_price_add': 'alerts',
-    'alerts_percent_add': 'alerts',
-    'alerts_list': 'alerts',
-    'education_lessons': 'education',
-    'education_lesson': 'education',
-    'education_glossary': 'education',
-    'education_quiz': 'education',
-    'news_headlines': 'news',
-    'news_project': 'news',
-    'subscription_status': 'settings',
-    'subscription_manage': 'settings',
-    'subscription_upgrade_pro': 'settings',
-    'subscription_upgrade_elite': 'settings',
-    'admin_broadcast': 'admin',
-    'admin_stats': 'admin',
-    'admin_toggle': 'admin',
-    'admin_verify': 'admin',
-    'language_set_ru': 'language',
-    'language_set_en': 'language',
-}
+ACTIONS = collect_actions(Router)
+ACTION_BACK_MENU = {name: spec.back for name, spec in ACTIONS.items()}
+
+
+def _screen_key(action: str, payload: str | None, user: UserContext) -> tuple[str, str, str, str]:
+    return (action, payload or '', user.language, user.tier)
 
 
 def _num(value: object) -> float | None:
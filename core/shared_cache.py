@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from typing import Any, Callable
+
+from config import load_config
+
+
+def off_loop(func: Callable[..., Any], *args: Any) -> asyncio.Future | None:
+    # Store calls are blocking sqlite; inside the event loop they go to the default executor.
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args)
+        return None
+    return loop.run_in_executor(None, func, *args)
+
+
+class SqliteCacheStore:
+    def __init__(self, path: str) -> None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        self.counters = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=0.5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS invalidations ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, key TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        try:
+            row = self._conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+            return None
+        if row is None or row[1] <= time.time():
+            self.counters['misses'] += 1
+            return None
+        self.counters['hits'] += 1
+        return row[0], row[1] - time.time()
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                'INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at',
+                (key, value, now + ttl),
+            )
+            if random.random() < 0.01:
+                conn.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+            return
+        self.counters['writes'] += 1
+
+    def publish(self, scope: str, key: str) -> None:
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute('INSERT INTO invalidations (scope, key, created_at) VALUES (?, ?, ?)', (scope, key, now))
+            if random.random() < 0.01:
+                conn.execute('DELETE FROM invalidations WHERE created_at < ?', (now - 3600,))
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+
+    def changes(self, scope: str, since: int) -> tuple[int, list[str]]:
+        try:
+            rows = self._conn().execute('SELECT id, scope, key FROM invalidations WHERE id > ? ORDER BY id', (since,)).fetchall()
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+            return since, []
+        if not rows:
+            return since, []
+        return rows[-1][0], [key for _, kind, key in rows if kind == scope]
+
+    def stats(self) -> dict[str, int]:
+        return dict(self.counters)
+
+
+_store: SqliteCacheStore | None = None
+_init_lock = threading.Lock()
+
+
+def cache_store() -> SqliteCacheStore | None:
+    global _store
+    cfg = load_config()
+    if cfg.cache_backend != 'sqlite':
+        return None
+    with _init_lock:
+        if _store is None:
+            _store = SqliteCacheStore(cfg.cache_db)
+        return _store
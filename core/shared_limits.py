@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from config import load_config
+from core.ratelimit import RateLimiter
+
+logger = logging.getLogger('shared_limits')
+
+PROVIDER_LIMITS: dict[str, tuple[int, float]] = {
+    'finnhub.io': (60, 60.0),
+    'www.alphavantage.co': (5, 60.0),
+    'pro-api.coinmarketcap.com': (30, 60.0),
+    'api.coingecko.com': (30, 60.0),
+    'newsapi.org': (50, 3600.0),
+    'tonapi.io': (60, 60.0),
+    'api.opensea.io': (60, 60.0),
+}
+
+speculative: ContextVar[bool] = ContextVar('speculative_quota', default=False)
+# Hosts that ran out of quota during the current render. The list is shared
+# with tasks spawned by the render, so misses inside gather() are seen too.
+_exceeded: ContextVar[list[str] | None] = ContextVar('quota_exceeded', default=None)
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+@contextmanager
+def track_quota() -> Iterator[list[str]]:
+    hosts: list[str] = []
+    token = _exceeded.set(hosts)
+    try:
+        yield hosts
+    finally:
+        _exceeded.reset(token)
+
+
+class MemoryLimitStore:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tats: dict[str, float] = {}
+
+    def lease(self, key: str, interval: float, tolerance: float, want: int) -> tuple[int, float]:
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tats.get(key, now), now)
+            room = tolerance - (tat - now)
+            if room < 0:
+                return 0, -room
+            granted = min(want, int(room // interval) + 1)
+            self._tats[key] = tat + granted * interval
+            if len(self._tats) > 100_000:
+                self._tats = {k: v for k, v in self._tats.items() if v > now}
+        return granted, 0.0
+
+
+class SqliteLimitStore:
+    def __init__(self, path: str) -> None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=0.5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)')
+            self._local.conn = conn
+        return conn
+
+    def lease(self, key: str, interval: float, tolerance: float, want: int) -> tuple[int, float]:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tat FROM rate_limits WHERE key = ?', (key,)).fetchone()
+            tat = max(row[0] if row else now, now)
+            room = tolerance - (tat - now)
+            if room < 0:
+                conn.execute('COMMIT')
+                return 0, -room
+            granted = min(want, int(room // interval) + 1)
+            conn.execute(
+                'INSERT INTO rate_limits (key, tat) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET tat = excluded.tat',
+                (key, tat + granted * interval),
+            )
+            if random.random() < 0.001:
+                conn.execute('DELETE FROM rate_limits WHERE tat < ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return granted, 0.0
+
+
+async def _lease(store: MemoryLimitStore | SqliteLimitStore, key: str, interval: float, tolerance: float, want: int) -> tuple[int, float]:
+    # SQLite leases take a write lock with a busy timeout; keep that off the event loop.
+    if isinstance(store, SqliteLimitStore):
+        return await asyncio.to_thread(store.lease, key, interval, tolerance, want)
+    return store.lease(key, interval, tolerance, want)
+
+
+class _Lease:
+    __slots__ = ('tokens', 'expires', 'blocked_until')
+
+    def __init__(self) -> None:
+        self.tokens = 0
+        self.expires = 0.0
+        self.blocked_until = 0.0
+
+
+class SharedRateLimiter(RateLimiter):
+    def __init__(self, store: MemoryLimitStore | SqliteLimitStore, batch: int = 3, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.store = store
+        self.batch = max(1, batch)
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        self._lease_lock = threading.Lock()
+        self.counters.update({'leases': 0, 'store_errors': 0})
+
+    async def allow(self, key: str, tier: str = 'free') -> bool:
+        local = self._from_lease(key, tier)
+        if local is not None:
+            return local
+        try:
+            granted, retry = await _lease(self.store, *self._request(key, tier))
+        except sqlite3.Error:
+            return self._store_failed(key, tier)
+        return self._settle(key, tier, granted, retry)
+
+    def check(self, key: str, tier: str = 'free') -> bool:
+        local = self._from_lease(key, tier)
+        if local is not None:
+            return local
+        try:
+            granted, retry = self.store.lease(*self._request(key, tier))
+        except sqlite3.Error:
+            return self._store_failed(key, tier)
+        return self._settle(key, tier, granted, retry)
+
+    def _from_lease(self, key: str, tier: str) -> bool | None:
+        now = time.monotonic()
+        with self._lease_lock:
+            lease = self._lease_for(key)
+            if lease.blocked_until > now:
+                return self._reject(tier)
+            if lease.tokens > 0 and lease.expires > now:
+                lease.tokens -= 1
+                self._count('allowed')
+                return True
+        return None
+
+    def _request(self, key: str, tier: str) -> tuple[str, float, float, int]:
+        interval, tolerance = self._limits.get(tier, self._default)
+        burst = int(tolerance / interval) + 1
+        return f'user:{key}', interval, tolerance, max(1, min(self.batch, burst // 4))
+
+    def _settle(self, key: str, tier: str, granted: int, retry: float) -> bool:
+        interval, _ = self._limits.get(tier, self._default)
+        now = time.monotonic()
+        with self._lease_lock:
+            self._count('leases')
+            lease = self._lease_for(key)
+            if granted == 0:
+                lease.blocked_until = now + retry
+                return self._reject(tier)
+            lease.tokens = granted - 1
+            lease.expires = now + max(1.0, interval * granted)
+            self._count('allowed')
+        return True
+
+    def _store_failed(self, key: str, tier: str) -> bool:
+        self._count('store_errors')
+        logger.warning("Shared limiter store unavailable, falling back to local limits")
+        return super().check(key, tier)
+
+    def _lease_for(self, key: str) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = _Lease()
+            self._leases[key] = lease
+            if len(self._leases) > self._shard_capacity * len(self._shards):
+                self._leases.popitem(last=False)
+        self._leases.move_to_end(key)
+        return lease
+
+    def stats(self) -> dict[str, object]:
+        return {**super().stats(), 'keys': len(self._leases)}
+
+    def _reject(self, tier: str) -> bool:
+        self._count('rejected', tier)
+        return False
+
+
+class ProviderQuota:
+    def __init__(
+        self,
+        store: MemoryLimitStore | SqliteLimitStore,
+        limits: dict[str, tuple[int, float]] | None = None,
+        max_wait: float = 15.0,
+    ) -> None:
+        self.store = store
+        self.max_wait = max_wait
+        self._limits = {
+            host: (window / count, window / count * (count - 1), max(1, min(5, count // 10)))
+            for host, (count, window) in (PROVIDER_LIMITS if limits is None else limits).items()
+        }
+        self._tokens: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.counters: dict[str, dict[str, int]] = {}
+
+    async def acquire(self, url: str) -> None:
+        host = urlsplit(url).hostname or ''
+        limit = self._limits.get(host)
+        if limit is None:
+            return
+        interval, tolerance, batch = limit
+        counters = self.counters.setdefault(host, {'calls': 0, 'leases': 0, 'waits': 0, 'exceeded': 0})
+        counters['calls'] += 1
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                tokens, expires = self._tokens.get(host, (0, 0.0))
+                if tokens > 0 and expires > now:
+                    self._tokens[host] = (tokens - 1, expires)
+                    return
+            try:
+                granted, retry = await _lease(self.store, f'provider:{host}', interval, tolerance, batch)
+            except sqlite3.Error:
+                logger.warning("Provider quota store unavailable host=%s", host)
+                return
+            counters['leases'] += 1
+            if granted:
+                with self._lock:
+                    self._tokens[host] = (granted - 1, now + max(1.0, interval * granted))
+                return
+            if speculative.get() or waited + retry > self.max_wait:
+                counters['exceeded'] += 1
+                hosts = _exceeded.get()
+                if hosts is not None:
+                    hosts.append(host)
+                raise QuotaExceeded(host)
+            counters['waits'] += 1
+            waited += retry
+            await asyncio.sleep(retry)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {host: dict(values) for host, values in self.counters.items()}
+
+
+_store: MemoryLimitStore | SqliteLimitStore | None = None
+_quota: ProviderQuota | None = None
+_init_lock = threading.Lock()
+
+
+def limit_store() -> MemoryLimitStore | SqliteLimitStore:
+    global _store
+    with _init_lock:
+        if _store is None:
+            cfg = load_config()
+            if cfg.rate_limit_backend == 'sqlite':
+                _store = SqliteLimitStore(cfg.rate_limit_db)
+            else:
+                _store = MemoryLimitStore()
+        return _store
+
+
+def provider_quota() -> ProviderQuota:
+    global _quota
+    store = limit_store()
+    with _init_lock:
+        if _quota is None:
+            _quota = ProviderQuota(store, max_wait=load_config().provider_quota_wait)
+        return _quota
+
+
+def build_rate_limiter(**kwargs) -> RateLimiter:
+    store = limit_store()
+    if isinstance(store, SqliteLimitStore):
+        return SharedRateLimiter(store, **kwargs)
+    return RateLimiter(**kwargs)
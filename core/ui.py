@@ -1,7 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from core.shared_limits import QuotaExceeded, track_quota
 
 
 @dataclass
@@ -18,6 +25,173 @@ class UIMessage:
     parse_mode: str = 'Markdown'
     expect_input: str | None = None
     input_hint: str | None = None
+    cache_key: tuple | None = None
+
+
+def dump_message(message: UIMessage) -> str:
+    data = asdict(message)
+    data.pop('cache_key', None)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def load_message(raw: str) -> UIMessage:
+    data = json.loads(raw)
+    if data.get('buttons') is not None:
+        data['buttons'] = [[ButtonSpec(**button) for button in row] for row in data['buttons']]
+    return UIMessage(**data)
+
+
+class RenderCache:
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.counters['evicted'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'size': len(self._entries)}
+
+
+class ScreenCache:
+    def __init__(self, maxsize: int = 2048, store: Any = None) -> None:
+        self.maxsize = maxsize
+        self.store = store
+        self._entries: OrderedDict[Hashable, tuple[float, UIMessage]] = OrderedDict()
+        self._inflight: dict[tuple[Hashable, int], asyncio.Future] = {}
+        self._speculative: set[tuple[Hashable, int]] = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.counters = {'hits': 0, 'misses': 0, 'joined': 0, 'evicted': 0, 'errors': 0, 'shared_hits': 0, 'uncached': 0}
+
+    async def get_or_render(
+        self,
+        key: Hashable,
+        ttl: float,
+        render: Callable[[], Awaitable[UIMessage]],
+        speculative: bool = False,
+    ) -> UIMessage:
+        now = time.monotonic()
+        loop = asyncio.get_running_loop()
+        flight = (key, id(loop))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return replace(entry[1])
+            pending = self._inflight.get(flight)
+            if pending is None:
+                self.counters['misses'] += 1
+                pending = loop.create_future()
+                self._inflight[flight] = pending
+                if speculative:
+                    self._speculative.add(flight)
+                owner = True
+            else:
+                self.counters['joined'] += 1
+                owner = False
+                borrowed = flight in self._speculative
+        if not owner:
+            try:
+                return replace(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if pending.cancelled():
+                    return await self.get_or_render(key, ttl, render)
+                raise
+            except Exception:
+                if borrowed:
+                    return await self.get_or_render(key, ttl, render)
+                raise
+        try:
+            shared = await self._load_shared(key) if self.store is not None else None
+            exceeded: list[str] = []
+            if shared is not None:
+                message, ttl = shared
+            else:
+                with track_quota() as exceeded:
+                    message = await render()
+                # Providers fall back to placeholders when out of quota; a
+                # prefetch has no reader waiting, so it reports the miss.
+                if exceeded and speculative:
+                    raise QuotaExceeded(exceeded[0])
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(flight, None)
+                self._speculative.discard(flight)
+            if isinstance(exc, asyncio.CancelledError):
+                pending.cancel()
+            else:
+                self.counters['uncached' if isinstance(exc, QuotaExceeded) else 'errors'] += 1
+                pending.set_exception(exc)
+                pending.exception()
+            raise
+        if exceeded:
+            # Not cached, so the next reader retries the providers.
+            with self._lock:
+                self.counters['uncached'] += 1
+                self._inflight.pop(flight, None)
+                self._speculative.discard(flight)
+            pending.set_result(message)
+            return replace(message)
+        with self._lock:
+            self._generation += 1
+            message.cache_key = (key, self._generation)
+            self._entries[key] = (time.monotonic() + ttl, message)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.counters['evicted'] += 1
+            self._inflight.pop(flight, None)
+            self._speculative.discard(flight)
+        if self.store is not None and shared is None:
+            loop.run_in_executor(None, self.store.set, _store_key(key), dump_message(message), ttl)
+        pending.set_result(message)
+        return replace(message)
+
+    async def _load_shared(self, key: Hashable) -> tuple[UIMessage, float] | None:
+        found = await asyncio.to_thread(self.store.get, _store_key(key))
+        if found is None:
+            return None
+        raw, ttl = found
+        self.counters['shared_hits'] += 1
+        return load_message(raw), ttl
+
+    def fresh(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'size': len(self._entries)}
+
+
+def _store_key(key: Hashable) -> str:
+    return 'screen:' + json.dumps(key, ensure_ascii=False, default=str)
 
 
 def format_section(title: str, body: str) -> str:
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from core.permissions import UserContext
+from core.shared_cache import SqliteCacheStore, cache_store, off_loop
+
+
+class UserCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, store: SqliteCacheStore | None = None, sync_every: float = 1.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self.sync_every = sync_every
+        self._seen = 0
+        self._synced_at = 0.0
+        self._syncing = False
+        self._entries: OrderedDict[tuple[str, str], tuple[UserContext, float]] = OrderedDict()
+        self._by_id: dict[str, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'invalidated': 0, 'evicted': 0}
+
+    def get(self, platform: str, platform_user_id: str) -> UserContext | None:
+        key = (platform, str(platform_user_id))
+        now = time.monotonic()
+        if self.store is not None and now - self._synced_at >= self.sync_every:
+            self._sync(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            user, expires = entry
+            if expires <= now:
+                self._drop(key)
+                self.counters['expired'] += 1
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return user
+
+    def put(self, user: UserContext) -> None:
+        key = (user.platform, str(user.platform_user_id))
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._by_id[str(user.user_id)] = key
+            while len(self._entries) > self.maxsize:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._by_id.pop(str(evicted.user_id), None)
+                self.counters['evicted'] += 1
+
+    def invalidate(self, user_id: str | int) -> None:
+        if self.store is not None:
+            off_loop(self.store.publish, 'user', str(user_id))
+        self._invalidate_local(user_id)
+
+    def _invalidate_local(self, user_id: str | int) -> None:
+        with self._lock:
+            key = self._by_id.get(str(user_id))
+            if key is not None:
+                self._drop(key)
+                self.counters['invalidated'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_id.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'size': len(self._entries)}
+
+    def _sync(self, now: float) -> None:
+        self._synced_at = now
+        if self._syncing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._apply(*self.store.changes('user', self._seen))
+            return
+        self._syncing = True
+        loop.run_in_executor(None, self.store.changes, 'user', self._seen).add_done_callback(self._synced)
+
+    def _synced(self, future: asyncio.Future) -> None:
+        self._syncing = False
+        if not future.cancelled() and future.exception() is None:
+            self._apply(*future.result())
+
+    def _apply(self, seen: int, user_ids: list[str]) -> None:
+        self._seen = max(self._seen, seen)
+        for user_id in user_ids:
+            self._invalidate_local(user_id)
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._by_id.pop(str(entry[0].user_id), None)
+
+
+user_cache = UserCache(store=cache_store())
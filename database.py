@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import os
 import aiosqlite
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, cast
 from contextlib import asynccontextmanager
 from config import load_config
+from core.metrics import metrics
 
 SCHEMA_SQL = """
 PRAGMA journal_mode=WAL;
@@ -145,6 +146,40 @@ CREATE TABLE IF NOT EXISTS audit_log (
     metadata TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
+
+CREATE TABLE IF NOT EXISTS job_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    token INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS broadcasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform TEXT NOT NULL,
+    language TEXT,
+    tier TEXT,
+    text TEXT NOT NULL,
+    created_by INTEGER,
+    status TEXT NOT NULL DEFAULT 'queued',
+    total INTEGER NOT NULL DEFAULT 0,
+    last_user_id INTEGER NOT NULL DEFAULT 0,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    blocked INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS conversation_state (
+    platform TEXT NOT NULL,
+    platform_user_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY(platform, platform_user_id)
+);
 """
 
 
@@ -162,16 +197,44 @@ def _ensure_db_dir(db_path: str) -> None:
         os.makedirs(folder, exist_ok=True)
 
 
+# Counts only the awaited SQLite calls as db time, not the caller's work
+# between them while the connection is open.
+class _TimedConnection:
+    def __init__(self, conn: aiosqlite.Connection) -> None:
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    async def execute(self, *args: Any) -> aiosqlite.Cursor:
+        with metrics.wait('db'):
+            return await self._conn.execute(*args)
+
+    async def executemany(self, *args: Any) -> aiosqlite.Cursor:
+        with metrics.wait('db'):
+            return await self._conn.executemany(*args)
+
+    async def executescript(self, *args: Any) -> aiosqlite.Cursor:
+        with metrics.wait('db'):
+            return await self._conn.executescript(*args)
+
+    async def commit(self) -> None:
+        with metrics.wait('db'):
+            await self._conn.commit()
+
+
 @asynccontextmanager
 async def get_db() -> AsyncIterator[aiosqlite.Connection]:
     cfg = load_config()
     db_path = _sqlite_path_from_url(cfg.database_url)
     _ensure_db_dir(db_path)
-    conn = await aiosqlite.connect(db_path)
-    conn.row_factory = aiosqlite.Row
+    with metrics.wait('db'):
+        conn = await aiosqlite.connect(db_path)
+        conn.row_factory = aiosqlite.Row
     try:
-        await conn.execute('PRAGMA foreign_keys=ON;')
-        yield conn
+        db = _TimedConnection(conn)
+        await db.execute('PRAGMA foreign_keys=ON;')
+        yield cast(aiosqlite.Connection, db)
     finally:
         await conn.close()
 
@@ -187,19 +250,22 @@ async def init_db() -> None:
         await _ensure_column(conn, 'users', 'profile_badge', "ALTER TABLE users ADD COLUMN profile_badge TEXT DEFAULT 'none'")
         await _ensure_column(conn, 'portfolio_items', 'source', "ALTER TABLE portfolio_items ADD COLUMN source TEXT NOT NULL DEFAULT 'manual'")
         await _ensure_column(conn, 'portfolio_items', 'external_id', 'ALTER TABLE portfolio_items ADD COLUMN external_id TEXT')
+        await _ensure_column(conn, 'job_leases', 'token', 'ALTER TABLE job_leases ADD COLUMN token INTEGER NOT NULL DEFAULT 0')
         await conn.commit()
 
 
 async def fetchone(db: aiosqlite.Connection, query: str, params: tuple = ()) -> aiosqlite.Row | None:
     cur = await db.execute(query, params)
-    row = await cur.fetchone()
+    with metrics.wait('db'):
+        row = await cur.fetchone()
     await cur.close()
     return row
 
 
 async def fetchall(db: aiosqlite.Connection, query: str, params: tuple = ()) -> list[aiosqlite.Row]:
     cur = await db.execute(query, params)
-    rows = await cur.fetchall()
+    with metrics.wait('db'):
+        rows = await cur.fetchall()
     await cur.close()
     return rows
 
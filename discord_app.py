@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import re
+import time
+from dataclasses import replace
+from functools import lru_cache
+from typing import Awaitable
 
 import discord
 from discord import app_commands
 
 from config import load_config
 from database import init_db
-from core.router import Router
-from core.ui import UIMessage
-from core.permissions import UserContext, has_access, missing_access_message
+from core.router import ACTIONS, Router
+from core.ui import UIMessage, RenderCache
+from core.permissions import UserContext, has_access, is_admin_allowed, missing_access_message
 from core.i18n import t
-from core.ratelimit import RateLimiter
+from core.user_cache import user_cache
+from core.shared_limits import build_rate_limiter
+from core.jobs import JobRunner
+from core.metrics import metrics, timed
+from core.prefetch import prefetcher
 from services.stocks_service import StocksService
 from services.crypto_service import CryptoService
 from services.ton_service import TonService
@@ -28,8 +38,110 @@ from services.link_service import LinkService
 from services.exchange_service import ExchangeService
 from services.favorites_service import FavoritesService
 from services.profile_service import ProfileService
+from services.watch_engine import DeliveryAdapter, WatchEngine, shared_engine
 
-rate_limiter = RateLimiter()
+logger = logging.getLogger('discord_app')
+
+rate_limiter = build_rate_limiter()
+view_cache = RenderCache(maxsize=512)
+
+PROGRESSIVE_AFTER = 0.5
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    if isinstance(exc, discord.RateLimited):
+        return float(exc.retry_after)
+    return None
+
+
+def delivery_adapter(client: discord.Client) -> DeliveryAdapter:
+    cfg = load_config()
+
+    async def _send_dm(user_id: object, text: str) -> None:
+        target = client.get_user(int(user_id)) or await client.fetch_user(int(user_id))
+        await target.send(text)
+
+    return DeliveryAdapter(
+        'discord',
+        _send_dm,
+        retry_after=_retry_after,
+        global_rate=cfg.discord_notify_global_rate,
+        chat_rate=cfg.discord_notify_chat_rate,
+        senders=cfg.notify_senders,
+        is_blocked=lambda exc: isinstance(exc, discord.Forbidden),
+    )
+
+
+def parse_shard_ids(raw: str) -> list[int] | None:
+    ids: set[int] = set()
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        low, sep, high = part.partition('-')
+        ids.update(range(int(low), int(high) + 1) if sep else (int(low),))
+    return sorted(ids) or None
+
+
+def shard_config(count: int, raw_ids: str) -> tuple[int | None, list[int] | None]:
+    ids = parse_shard_ids(raw_ids)
+    if ids is None:
+        return count or None, None
+    if not count:
+        raise ValueError('DISCORD_SHARD_IDS requires DISCORD_SHARD_COUNT to be set')
+    if ids[-1] >= count:
+        raise ValueError(f'DISCORD_SHARD_IDS must be below DISCORD_SHARD_COUNT={count}')
+    return count, ids
+
+
+class ShardMonitor:
+    def __init__(self, client: discord.AutoShardedClient, every: float = 10.0) -> None:
+        self.client = client
+        self.every = every
+        self.rates: dict[int, float] = {}
+        self._sequences: dict[int, int] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='discord-shard-monitor')
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def sample(self) -> None:
+        for shard_id, shard in self.client.shards.items():
+            if shard_id not in self.rates:
+                self._register(shard_id)
+            # discord.py has no per-shard event hook; the gateway sequence number
+            # counts dispatched events per session, and restarts from 1 on re-identify.
+            ws = getattr(shard._parent, 'ws', None)
+            sequence = (ws.sequence or 0) if ws is not None else 0
+            previous = self._sequences.get(shard_id, sequence)
+            events = sequence - previous if sequence >= previous else sequence
+            self._sequences[shard_id] = sequence
+            self.rates[shard_id] = events / self.every
+            if events:
+                metrics.incr(f'discord:shard_events:{shard_id}', events)
+
+    def latency_ms(self, shard_id: int) -> float:
+        shard = self.client.get_shard(shard_id)
+        if shard is None or shard.is_closed() or shard.latency == float('inf'):
+            return -1.0
+        return round(shard.latency * 1000, 1)
+
+    def _register(self, shard_id: int) -> None:
+        self.rates[shard_id] = 0.0
+        metrics.gauge(f'discord_shard_latency_ms{{shard="{shard_id}"}}', lambda: self.latency_ms(shard_id))
+        metrics.gauge(f'discord_shard_events_per_second{{shard="{shard_id}"}}', lambda: self.rates.get(shard_id, 0.0))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.every)
+            self.sample()
 
 
 def _build_router() -> Router:
@@ -55,24 +167,31 @@ def _build_router() -> Router:
     )
 
 
-class MenuView(discord.ui.View):
-    def __init__(self, message: UIMessage, router: Router, user: UserContext):
-        super().__init__(timeout=180)
-        self.router = router
-        self.user = user
-        if message.buttons:
-            for row in message.buttons:
-                for btn in row:
-                    if btn.action.startswith('webapp:'):
-                        url = btn.action.replace('webapp:', '')
-                        self.add_item(discord.ui.Button(label=btn.label, url=url))
-                    elif btn.action.startswith('url:'):
-                        url = btn.action.replace('url:', '')
-                        self.add_item(discord.ui.Button(label=btn.label, url=url))
-                    else:
-                        self.add_item(MenuButton(label=btn.label, action=btn.action))
+def _menu_view(message: UIMessage) -> discord.ui.View:
+    if message.cache_key is not None:
+        view = view_cache.get(message.cache_key)
+        if view is not None:
+            return view
+    # Buttons are DynamicItems dispatched by custom_id, so the view itself is only a
+    # component template: stopping it keeps discord.py from tracking it per message.
+    view = discord.ui.View(timeout=None)
+    seen: dict[str, int] = {}
+    for row in message.buttons or []:
+        for btn in row:
+            if btn.action.startswith('webapp:'):
+                view.add_item(discord.ui.Button(label=btn.label, url=btn.action.replace('webapp:', '')))
+            elif btn.action.startswith('url:'):
+                view.add_item(discord.ui.Button(label=btn.label, url=btn.action.replace('url:', '')))
+            else:
+                seen[btn.action] = seen.get(btn.action, 0) + 1
+                view.add_item(MenuButton(btn.label, btn.action, seen[btn.action]))
+    view.stop()
+    if message.cache_key is not None:
+        view_cache.put(message.cache_key, view)
+    return view
 
 
+@lru_cache(maxsize=4096)
 def _button_style(label: str, action: str) -> discord.ButtonStyle:
     l = label.lower()
     if 'back' in l or 'назад' in l:
@@ -86,59 +205,110 @@ def _button_style(label: str, action: str) -> discord.ButtonStyle:
     return discord.ButtonStyle.primary
 
 
-class MenuButton(discord.ui.Button):
-    def __init__(self, label: str, action: str):
-        super().__init__(label=label, style=_button_style(label, action))
+class MenuButton(discord.ui.DynamicItem[discord.ui.Button], template=r'a:(?P<action>.+?)(?:#(?P<n>\d+))?'):
+    def __init__(self, label: str, action: str, n: int = 1):
+        custom_id = f'a:{action}' if n == 1 else f'a:{action}#{n}'
+        super().__init__(discord.ui.Button(label=label, style=_button_style(label, action), custom_id=custom_id))
         self.action = action
 
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]) -> MenuButton:
+        return cls(item.label or '', match['action'], int(match['n'] or 1))
+
+    @timed('discord:button')
     async def callback(self, interaction: discord.Interaction) -> None:
+        started = time.perf_counter()
         bot: InvestmentBot = interaction.client  # type: ignore
-        user = bot.user_cache.get(str(interaction.user.id))
-        if not await rate_limiter.allow(f"dc:{interaction.user.id}"):
+        user = user_cache.get('discord', str(interaction.user.id))
+        if not await rate_limiter.allow(f"dc:{interaction.user.id}", user.tier if user else 'free'):
             lang = user.language if user else 'ru'
             await interaction.response.send_message(t('msg.rate_limited', lang), ephemeral=True)
             return
         if not user:
             user = await bot.router.users.get_or_create_user('discord', str(interaction.user.id), interaction.user.name, interaction.user.id in bot.admin_ids, None)
-            bot.user_cache[str(interaction.user.id)] = user
+        spec = ACTIONS.get(self.action.removeprefix('action:')) if self.action in MODAL_ACTIONS else None
+        if spec is not None and spec.admin and not is_admin_allowed(user):
+            await interaction.response.send_message(t('msg.admin_required', user.language), ephemeral=True)
+            return
         if self.action == 'action:alerts_percent_add' and not has_access(user, 'alerts_advanced'):
             await interaction.response.send_message(missing_access_message('alerts_advanced', user.language), ephemeral=True)
             return
         if self.action in MODAL_ACTIONS:
             await interaction.response.send_modal(MODAL_ACTIONS[self.action](bot, user))
             return
-        await bot.render_action(interaction, self.action, user)
+        await bot.render_action(interaction, self.action, user, started)
 
 
-class InvestmentBot(discord.Client):
+class InvestmentBot(discord.AutoShardedClient):
     def __init__(self, router: Router, admin_ids: set[int], **kwargs):
         super().__init__(**kwargs)
         self.tree = app_commands.CommandTree(self)
+        self.shard_monitor = ShardMonitor(self)
         self.router = router
         self.admin_ids = admin_ids
-        self.user_cache: dict[str, UserContext] = {}
+        self.watch_engine: WatchEngine | None = None
+        self.jobs: JobRunner | None = None
+        self.pending_renders: dict[str, asyncio.Future] = {}
 
     async def setup_hook(self) -> None:
-        await self.tree.sync()
+        self.add_dynamic_items(MenuButton)
+        self.shard_monitor.start()
+        if not self.shard_ids or 0 in self.shard_ids:
+            await self.tree.sync()
+        adapter = delivery_adapter(self)
+        adapter.start()
+        self.watch_engine = shared_engine(self.router)
+        self.watch_engine.register(adapter)
+        if load_config().background_jobs:
+            loop = asyncio.get_running_loop()
+            if self.watch_engine.claim_driver('discord', lambda: loop.call_soon_threadsafe(self._start_jobs)):
+                self._start_jobs()
+
+    def _start_jobs(self) -> None:
+        self.jobs = JobRunner()
+        self.watch_engine.schedule(self.jobs)
+        self.jobs.start()
+
+    async def close(self) -> None:
+        await self.shard_monitor.stop()
+        if self.jobs:
+            await self.jobs.stop()
+            self.jobs = None
+        if self.watch_engine:
+            self.watch_engine.release_driver('discord')
+        adapter = self.watch_engine.adapters.get('discord') if self.watch_engine else None
+        if adapter:
+            self.watch_engine.unregister('discord')
+            await adapter.stop()
+        await super().close()
 
     async def on_ready(self) -> None:
-        print(f"Discord bot logged in as {self.user}")
+        shards = sorted(self.shards)
+        logger.info(
+            "Discord bot logged in as %s shards=%s/%s", self.user, shards, self.shard_count,
+            extra={'event': 'ready', 'shards': shards, 'shard_count': self.shard_count},
+        )
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        logger.info("Discord shard %s ready", shard_id, extra={'event': 'shard_ready', 'shard_id': shard_id})
 
     async def render_message(self, interaction: discord.Interaction, message: UIMessage, user: UserContext) -> None:
-        view = MenuView(message, self.router, user)
+        view = _menu_view(message)
         if interaction.response.is_done():
             await interaction.followup.send(message.text, view=view, ephemeral=True)
         else:
             await interaction.response.send_message(message.text, view=view, ephemeral=True)
 
-    async def render_action(self, interaction: discord.Interaction, action: str, user: UserContext) -> None:
+    async def render_action(self, interaction: discord.Interaction, action: str, user: UserContext, started: float | None = None) -> None:
+        started = started or time.perf_counter()
         if action.startswith('menu:'):
             menu_id = action.split(':', 1)[1]
             if menu_id == 'portfolio':
-                message = await self.router.build_portfolio_menu(user)
+                await self.render_progressive(interaction, action, self.router.build_portfolio_menu(user), user, started=started)
             else:
-                message = self.router.menu(menu_id, user)
-            await self.render_message(interaction, message, user)
+                await self.render_message(interaction, self.router.menu(menu_id, user), user)
+                _first_response('menu', started, 'immediate')
+            prefetcher.observe(self.router, user, action)
             return
         if action.startswith('action:'):
             act_payload = action.split(':', 1)[1]
@@ -146,13 +316,94 @@ class InvestmentBot(discord.Client):
                 act, payload = act_payload.split(':', 1)
             else:
                 act, payload = act_payload, None
-            message = await self.router.handle_action(act, user, payload)
-            await self.render_message(interaction, message, user)
+            fast = self.router.is_fast(act, user, payload)
+            await self.render_progressive(
+                interaction, act, self.router.handle_action(act, user, payload), user, fast, started, self.router.is_idempotent(act),
+            )
+            prefetcher.observe(self.router, user, action)
             return
         if action.startswith('page:'):
             _, key, page = action.split(':', 2)
-            message = await self.router.handle_action(key, user, page)
-            await self.render_message(interaction, message, user)
+            fast = self.router.is_fast(key, user, page)
+            await self.render_progressive(
+                interaction, key, self.router.handle_action(key, user, page), user, fast, started, self.router.is_idempotent(key),
+            )
+            prefetcher.observe(self.router, user, action)
+
+    async def render_progressive(
+        self,
+        interaction: discord.Interaction,
+        name: str,
+        render: Awaitable[UIMessage],
+        user: UserContext,
+        fast: bool = True,
+        started: float | None = None,
+        idempotent: bool = True,
+    ) -> None:
+        started = started or time.perf_counter()
+        task = asyncio.ensure_future(render)
+        # A newer interaction only makes this result stale; the render itself is never
+        # cancelled, so writes always complete and report back.
+        self.pending_renders[user.user_id] = task
+        deferred = False
+        try:
+            # Anything not known to be fast is acknowledged right away so the 3s
+            # interaction deadline never depends on provider latency.
+            if not fast:
+                deferred = await self._defer(interaction, name, started, 'deferred')
+            else:
+                done, _ = await asyncio.wait({task}, timeout=PROGRESSIVE_AFTER)
+                if not done:
+                    deferred = await self._defer(interaction, name, started, 'deferred_late')
+            await asyncio.wait({task})
+        except BaseException:
+            if idempotent:
+                task.cancel()
+            raise
+        finally:
+            current = self.pending_renders.get(user.user_id) is task
+            if current:
+                del self.pending_renders[user.user_id]
+        if not current and idempotent:
+            if not task.cancelled():
+                task.exception()
+            await self._acknowledge_stale(interaction)
+            return
+        await self.render_message(interaction, self._render_result(task, user), user)
+        if not deferred:
+            _first_response(name, started, 'immediate')
+
+    def _render_result(self, task: asyncio.Future, user: UserContext) -> UIMessage:
+        try:
+            return task.result()
+        except Exception:
+            logger.exception("Render failed user_id=%s", user.user_id)
+            return UIMessage(text=t('msg.action_failed', user.language))
+
+    async def _acknowledge_stale(self, interaction: discord.Interaction) -> None:
+        try:
+            if interaction.response.is_done():
+                await interaction.delete_original_response()
+            else:
+                await interaction.response.defer()
+        except discord.HTTPException:
+            pass
+
+    async def _defer(self, interaction: discord.Interaction, name: str, started: float, outcome: str) -> bool:
+        if interaction.response.is_done():
+            return False
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        _first_response(name, started, outcome)
+        return True
+
+
+def _first_response(name: str, started: float, outcome: str) -> None:
+    metrics.observe(f'discord:first_response:{name}', (time.perf_counter() - started) * 1000)
+    metrics.incr(f'discord:{outcome}:{name}')
+
+
+async def _text_only(render: Awaitable[UIMessage]) -> UIMessage:
+    return replace(await render, buttons=None)
 
 
 class AddAssetModal(discord.ui.Modal, title='Add Asset'):
@@ -166,6 +417,7 @@ class AddAssetModal(discord.ui.Modal, title='Add Asset'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:AddAssetModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         try:
             await self.bot.router.portfolio.add_asset(
@@ -188,6 +440,7 @@ class RemoveAssetModal(discord.ui.Modal, title='Remove Asset'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:RemoveAssetModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         removed = await self.bot.router.portfolio.remove_asset(self.user, self.symbol.value.upper())
         await interaction.response.send_message(t('msg.asset_removed', self.user.language, count=removed), ephemeral=True)
@@ -201,10 +454,13 @@ class TonWalletModal(discord.ui.Modal, title='TON Wallet'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:TonWalletModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
+        await self.bot.render_progressive(interaction, 'TonWalletModal', self._render(), self.user, fast=False)
+
+    async def _render(self) -> UIMessage:
         data = await self.bot.router.ton.lookup_wallet(self.address.value)
-        lines = '\n'.join([f"**{k}:** {v}" for k, v in data.items()])
-        await interaction.response.send_message(lines, ephemeral=True)
+        return UIMessage(text='\n'.join([f"**{k}:** {v}" for k, v in data.items()]))
 
 
 class TonUsernamesModal(discord.ui.Modal, title='TON Usernames'):
@@ -215,9 +471,9 @@ class TonUsernamesModal(discord.ui.Modal, title='TON Usernames'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:TonUsernamesModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_ton_usernames(self.user, self.query.value)
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'TonUsernamesModal', _text_only(self.bot.router.build_ton_usernames(self.user, self.query.value)), self.user, fast=False)
 
 
 class TonGiftsModal(discord.ui.Modal, title='TON NFT Gifts'):
@@ -228,9 +484,9 @@ class TonGiftsModal(discord.ui.Modal, title='TON NFT Gifts'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:TonGiftsModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_ton_gifts(self.user, self.query.value)
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'TonGiftsModal', _text_only(self.bot.router.build_ton_gifts(self.user, self.query.value)), self.user, fast=False)
 
 
 class NftSearchModal(discord.ui.Modal, title='NFT Search'):
@@ -241,21 +497,26 @@ class NftSearchModal(discord.ui.Modal, title='NFT Search'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:NftSearchModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        items = await self.bot.router.nft.search_collection(self.query.value)
-        await interaction.response.send_message('\n'.join(items), ephemeral=True)
+        await self.bot.render_progressive(interaction, 'NftSearchModal', self._render(), self.user, fast=False)
+
+    async def _render(self) -> UIMessage:
+        return UIMessage(text='\n'.join(await self.bot.router.nft.search_collection(self.query.value)))
 
 
 class AdminBroadcastModal(discord.ui.Modal, title='Admin Broadcast'):
-    message = discord.ui.TextInput(label='Message', max_length=500, style=discord.TextStyle.long)
+    message = discord.ui.TextInput(label='Message', max_length=2000, style=discord.TextStyle.long)
 
     def __init__(self, bot: InvestmentBot, user: UserContext) -> None:
         super().__init__()
         self.bot = bot
         self.user = user
 
+    @timed('discord:AdminBroadcastModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        await interaction.response.send_message(t('msg.broadcast_queued', self.user.language), ephemeral=True)
+        response = await self.bot.router.queue_broadcast(self.user, str(self.message.value))
+        await interaction.response.send_message(response.text, ephemeral=True)
 
 
 class AdminToggleModal(discord.ui.Modal, title='Feature Toggle'):
@@ -266,6 +527,7 @@ class AdminToggleModal(discord.ui.Modal, title='Feature Toggle'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:AdminToggleModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         await interaction.response.send_message(t('msg.feature_toggled', self.user.language, feature=self.feature.value), ephemeral=True)
 
@@ -278,21 +540,23 @@ class CryptoFindModal(discord.ui.Modal, title='Find Crypto'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:CryptoFindModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
+        await self.bot.render_progressive(interaction, 'CryptoFindModal', self._render(), self.user, fast=False)
+
+    async def _render(self) -> UIMessage:
         sym = self.symbol.value.upper()
         quote = await self.bot.router.crypto.get_asset(sym)
         if not quote or all(quote.get(k) is None for k in ('price', 'change_24h', 'market_cap')):
-            await interaction.response.send_message(t('msg.crypto_not_found', self.user.language), ephemeral=True)
-            return
+            return UIMessage(text=t('msg.crypto_not_found', self.user.language))
         price = _fmt_price(quote.get('price'))
         change = _fmt_pct(quote.get('change_24h'))
         cap = _fmt_cap(quote.get('market_cap'))
-        await interaction.response.send_message(
-            f"**{sym}**\n"
+        return UIMessage(
+            text=f"**{sym}**\n"
             f"{t('label.price', self.user.language)}: {price}\n"
             f"{t('label.change_24h', self.user.language)}: {change}\n"
             f"{t('label.market_cap', self.user.language)}: {cap}",
-            ephemeral=True,
         )
 
 
@@ -304,9 +568,9 @@ class StockFindModal(discord.ui.Modal, title='Find Stock'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:StockFindModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_profile(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'StockFindModal', _text_only(self.bot.router.build_stock_profile(self.user, self.symbol.value.upper())), self.user, fast=False)
 
 
 class StockFundamentalsModal(discord.ui.Modal, title='Stock Fundamentals'):
@@ -317,9 +581,9 @@ class StockFundamentalsModal(discord.ui.Modal, title='Stock Fundamentals'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:StockFundamentalsModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_fundamentals(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'StockFundamentalsModal', _text_only(self.bot.router.build_stock_fundamentals(self.user, self.symbol.value.upper())), self.user, fast=False)
 
 
 class StockRatiosModal(discord.ui.Modal, title='Stock Ratios'):
@@ -330,9 +594,9 @@ class StockRatiosModal(discord.ui.Modal, title='Stock Ratios'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:StockRatiosModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_ratios(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'StockRatiosModal', _text_only(self.bot.router.build_stock_ratios(self.user, self.symbol.value.upper())), self.user, fast=False)
 
 
 class StockDividendsModal(discord.ui.Modal, title='Stock Dividends'):
@@ -343,9 +607,9 @@ class StockDividendsModal(discord.ui.Modal, title='Stock Dividends'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:StockDividendsModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_dividends(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'StockDividendsModal', _text_only(self.bot.router.build_stock_dividends(self.user, self.symbol.value.upper())), self.user, fast=False)
 
 
 class StockEarningsModal(discord.ui.Modal, title='Stock Earnings'):
@@ -356,9 +620,9 @@ class StockEarningsModal(discord.ui.Modal, title='Stock Earnings'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:StockEarningsModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_earnings(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'StockEarningsModal', _text_only(self.bot.router.build_stock_earnings(self.user, self.symbol.value.upper())), self.user, fast=False)
 
 class ForexFindModal(discord.ui.Modal, title='Find Forex Pair'):
     pair = discord.ui.TextInput(label='Pair (EUR/USD)', max_length=12)
@@ -368,9 +632,9 @@ class ForexFindModal(discord.ui.Modal, title='Find Forex Pair'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:ForexFindModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_forex_profile(self.user, self.pair.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'ForexFindModal', _text_only(self.bot.router.build_forex_profile(self.user, self.pair.value.upper())), self.user, fast=False)
 
 
 class ExchangeLinkModal(discord.ui.Modal, title='Connect Exchange'):
@@ -384,12 +648,14 @@ class ExchangeLinkModal(discord.ui.Modal, title='Connect Exchange'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:ExchangeLinkModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         parts = [self.provider.value.strip(), self.api_key.value.strip(), self.api_secret.value.strip()]
         if self.passphrase.value:
             parts.append(self.passphrase.value.strip())
-        message = await self.bot.router.link_exchange_from_input(self.user, " ".join(parts))
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(
+            interaction, 'ExchangeLinkModal', _text_only(self.bot.router.link_exchange_from_input(self.user, " ".join(parts))), self.user, fast=False, idempotent=False,
+        )
 
 
 class WalletLinkModal(discord.ui.Modal, title='Connect Wallet'):
@@ -402,12 +668,14 @@ class WalletLinkModal(discord.ui.Modal, title='Connect Wallet'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:WalletLinkModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         parts = [self.provider.value.strip(), self.address.value.strip()]
         if self.label.value:
             parts.append(self.label.value.strip())
-        message = await self.bot.router.link_wallet_from_input(self.user, " ".join(parts))
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(
+            interaction, 'WalletLinkModal', _text_only(self.bot.router.link_wallet_from_input(self.user, " ".join(parts))), self.user, fast=False, idempotent=False,
+        )
 
 
 class CsvImportModal(discord.ui.Modal, title='Import CSV'):
@@ -418,9 +686,11 @@ class CsvImportModal(discord.ui.Modal, title='Import CSV'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:CsvImportModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.import_csv_from_text(self.user, self.csv_text.value)
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(
+            interaction, 'CsvImportModal', _text_only(self.bot.router.import_csv_from_text(self.user, self.csv_text.value)), self.user, fast=False, idempotent=False,
+        )
 
 
 class ValuationModal(discord.ui.Modal, title='Shiller & Graham'):
@@ -431,9 +701,9 @@ class ValuationModal(discord.ui.Modal, title='Shiller & Graham'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:ValuationModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
-        message = await self.bot.router.build_stock_valuation(self.user, self.symbol.value.upper())
-        await interaction.response.send_message(message.text, ephemeral=True)
+        await self.bot.render_progressive(interaction, 'ValuationModal', self.bot.router.build_stock_valuation(self.user, self.symbol.value.upper()), self.user, fast=False)
 
 
 class PriceAlertModal(discord.ui.Modal, title='Price Alert'):
@@ -446,6 +716,7 @@ class PriceAlertModal(discord.ui.Modal, title='Price Alert'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:PriceAlertModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         try:
             await self.bot.router.alerts.add_alert(
@@ -470,6 +741,7 @@ class PercentAlertModal(discord.ui.Modal, title='% Move Alert'):
         self.bot = bot
         self.user = user
 
+    @timed('discord:PercentAlertModal')
     async def on_submit(self, interaction: discord.Interaction) -> None:
         try:
             await self.bot.router.alerts.add_alert(
@@ -536,21 +808,34 @@ def _fmt_cap(value: object) -> str:
 
 async def run_discord() -> None:
     cfg = load_config()
+    shard_count, shard_ids = shard_config(cfg.discord_shard_count, cfg.discord_shard_ids)
     await init_db()
     intents = discord.Intents.default()
-    bot = InvestmentBot(router=_build_router(), admin_ids=cfg.admin_user_ids, intents=intents)
+    bot = InvestmentBot(
+        router=_build_router(),
+        admin_ids=cfg.admin_user_ids,
+        intents=intents,
+        shard_count=shard_count,
+        shard_ids=shard_ids,
+    )
 
     @bot.tree.command(name='start', description='Open the main menu')
     async def start(interaction: discord.Interaction) -> None:
-        if not await rate_limiter.allow(f"dc:{interaction.user.id}"):
-            await interaction.response.send_message(t('msg.rate_limited', 'ru'), ephemeral=True)
-            return
-        user = await bot.router.users.get_or_create_user('discord', str(interaction.user.id), interaction.user.name, interaction.user.id in cfg.admin_user_ids, None)
-        bot.user_cache[str(interaction.user.id)] = user
-        message = bot.router.main_menu(user)
-        await bot.render_message(interaction, message, user)
-
-    await bot.start(cfg.discord_bot_token)
+        with metrics.track('discord:start'):
+            cached = user_cache.get('discord', str(interaction.user.id))
+            if not await rate_limiter.allow(f"dc:{interaction.user.id}", cached.tier if cached else 'free'):
+                await interaction.response.send_message(t('msg.rate_limited', 'ru'), ephemeral=True)
+                return
+            user = await bot.router.users.get_or_create_user('discord', str(interaction.user.id), interaction.user.name, interaction.user.id in cfg.admin_user_ids, None)
+            message = bot.router.main_menu(user)
+            await bot.render_message(interaction, message, user)
+            prefetcher.observe(bot.router, user, 'menu:main')
+
+    try:
+        await bot.start(cfg.discord_bot_token)
+    finally:
+        if not bot.is_closed():
+            await bot.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import discord
+from telegram import Bot
+
+from config import load_config
+from core.jobs import JobRunner
+from database import init_db
+from discord_app import delivery_adapter as discord_adapter
+from services.watch_engine import DeliveryAdapter, shared_engine
+from telegram_app import _build_router, delivery_adapter as telegram_adapter
+
+logger = logging.getLogger('jobs_app')
+
+
+async def run_jobs() -> None:
+    cfg = load_config()
+    await init_db()
+    engine = shared_engine(_build_router())
+    adapters: list[DeliveryAdapter] = []
+    closers = []
+    if cfg.telegram_bot_token:
+        bot = Bot(cfg.telegram_bot_token, base_url=cfg.telegram_api_base_url or 'https://api.telegram.org/bot')
+        await bot.initialize()
+        adapters.append(telegram_adapter(bot))
+        closers.append(bot.shutdown)
+    if cfg.discord_bot_token:
+        client = discord.Client(intents=discord.Intents.none())
+        await client.login(cfg.discord_bot_token)
+        adapters.append(discord_adapter(client))
+        closers.append(client.close)
+
+    for adapter in adapters:
+        adapter.start()
+        engine.register(adapter)
+    jobs = JobRunner()
+    engine.claim_driver('jobs')
+    engine.schedule(jobs)
+    jobs.start()
+    logger.info("Jobs worker started adapters=%s", [adapter.platform for adapter in adapters])
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await jobs.stop()
+        engine.release_driver('jobs')
+        for adapter in adapters:
+            engine.unregister(adapter.platform)
+            await adapter.stop()
+        for close in closers:
+            await close()
+
+
+if __name__ == '__main__':
+    asyncio.run(run_jobs())
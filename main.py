@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import signal
 
-from telegram_app import run_telegram
+from config import load_config
+from core.metrics import start_metrics_server
+from jobs_app import run_jobs
+from supervisor import heartbeat, heartbeat_path
+from telegram_app import run_telegram, stop_telegram
 from discord_app import run_discord
 
 
@@ -11,15 +16,46 @@ async def main() -> None:
     parser = argparse.ArgumentParser(description='Unified Telegram + Discord investment bot')
     parser.add_argument('--telegram', action='store_true', help='Run Telegram bot')
     parser.add_argument('--discord', action='store_true', help='Run Discord bot')
+    parser.add_argument('--jobs', action='store_true', help='Run background jobs only (price watch and alerts)')
+    parser.add_argument('--telegram-mode', choices=['polling', 'webhook'], help='Telegram update source (default: TELEGRAM_MODE)')
+    parser.add_argument('--worker', help='Worker name when started by supervisor.py (enables heartbeats)')
     args = parser.parse_args()
 
+    cfg = load_config()
+    if cfg.metrics_port:
+        await start_metrics_server(cfg.metrics_port)
+
+    both = not args.telegram and not args.discord and not args.jobs
+    telegram = None
     tasks = []
-    if args.telegram or (not args.telegram and not args.discord):
-        tasks.append(asyncio.create_task(asyncio.to_thread(run_telegram)))
-    if args.discord or (not args.telegram and not args.discord):
+    if args.telegram or both:
+        telegram = asyncio.create_task(asyncio.to_thread(run_telegram, args.telegram_mode))
+        tasks.append(telegram)
+    if args.discord or both:
         tasks.append(asyncio.create_task(run_discord()))
-
-    await asyncio.gather(*tasks)
+    if args.jobs:
+        tasks.append(asyncio.create_task(run_jobs()))
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except NotImplementedError:
+            pass
+    watchers = [asyncio.create_task(stopping.wait())]
+    if args.worker:
+        watchers.append(asyncio.create_task(heartbeat(heartbeat_path(cfg.supervisor_run_dir, args.worker))))
+
+    done, _ = await asyncio.wait(tasks + watchers, return_when=asyncio.FIRST_COMPLETED)
+    stop_telegram()
+    for task in tasks + watchers:
+        if task is not telegram:
+            task.cancel()
+    await asyncio.gather(*tasks, *watchers, return_exceptions=True)
+    for task in done:
+        if task not in watchers and not task.cancelled() and task.exception() is not None:
+            raise task.exception()
 
 
 if __name__ == '__main__':
@@ -3,7 +3,8 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
-from urllib.parse import parse_qs
+import time
+from urllib.parse import parse_qsl
 
 from fastapi import FastAPI, HTTPException, Header, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,6 +13,8 @@ from pydantic import BaseModel
 from config import load_config
 from database import init_db
 from core.permissions import UserContext
+from core.shared_limits import build_rate_limiter
+from core.ui import RenderCache
 from services.payment_service import PaymentService
 from services.portfolio_service import PortfolioService
 from services.crypto_service import CryptoService
@@ -36,6 +39,7 @@ payments = PaymentService()
 forex = ForexService()
 news = NewsService()
 users = UserService()
+rate_limiter = build_rate_limiter()
 
 app.add_middleware(
     CORSMiddleware,
@@ -52,29 +56,41 @@ class AuthUser(BaseModel):
     language: str | None = None
 
 
-def _verify_init_data(init_data: str, token: str) -> bool:
-    if not init_data:
-        return False
-    pairs = [kv for kv in init_data.split('&') if kv]
-    data = {}
-    received_hash = ''
-    for kv in pairs:
-        key, value = kv.split('=', 1)
-        if key == 'hash':
-            received_hash = value
-        else:
-            data[key] = value
-    check_string = '\n'.join([f"{k}={data[k]}" for k in sorted(data.keys())])
-    secret_key = hashlib.sha256(token.encode()).digest()
-    computed = hmac.new(secret_key, check_string.encode(), hashlib.sha256).hexdigest()
-    return hmac.compare_digest(computed, received_hash)
+class InitDataVerifier:
+    def __init__(self, token: str, max_age: float = 86400.0, maxsize: int = 10000) -> None:
+        self.secret = hmac.new(b'WebAppData', token.encode(), hashlib.sha256).digest()
+        self.max_age = max_age
+        self.verified = RenderCache(maxsize=maxsize)
+
+    def verify(self, init_data: str) -> AuthUser | None:
+        if not init_data:
+            return None
+        entry = self.verified.get(init_data)
+        if entry is None:
+            entry = self._check(init_data)
+            if entry is None:
+                return None
+            self.verified.put(init_data, entry)
+        expires_at, user = entry
+        if self.max_age and time.time() > expires_at:
+            return None
+        return user
+
+    def _check(self, init_data: str) -> tuple[float, AuthUser] | None:
+        fields = dict(parse_qsl(init_data, keep_blank_values=True))
+        received_hash = fields.pop('hash', '')
+        check_string = '\n'.join(f"{k}={fields[k]}" for k in sorted(fields))
+        computed = hmac.new(self.secret, check_string.encode(), hashlib.sha256).hexdigest()
+        if not received_hash or not hmac.compare_digest(computed, received_hash):
+            return None
+        try:
+            auth_date = float(fields.get('auth_date') or 0)
+        except ValueError:
+            return None
+        return auth_date + self.max_age, _auth_user(fields.get('user'))
 
 
-def telegram_auth(telegram_init_data: str = Header(default='', alias='Telegram-Init-Data')) -> AuthUser:
-    if not _verify_init_data(telegram_init_data, cfg.telegram_bot_token):
-        raise HTTPException(status_code=401, detail='Invalid Telegram auth')
-    params = parse_qs(telegram_init_data, keep_blank_values=True)
-    raw_user = params.get('user', [None])[0]
+def _auth_user(raw_user: str | None) -> AuthUser:
     if raw_user:
         try:
             user_obj = json.loads(raw_user)
@@ -88,6 +104,18 @@ def telegram_auth(telegram_init_data: str = Header(default='', alias='Telegram-I
     return AuthUser(user_id='telegram_user', username=None, language=None)
 
 
+init_data_verifier = InitDataVerifier(cfg.telegram_bot_token, max_age=cfg.mini_app_auth_ttl, maxsize=cfg.mini_app_auth_cache)
+
+
+def telegram_auth(telegram_init_data: str = Header(default='', alias='Telegram-Init-Data')) -> AuthUser:
+    user = init_data_verifier.verify(telegram_init_data)
+    if user is None:
+        raise HTTPException(status_code=401, detail='Invalid Telegram auth')
+    if not rate_limiter.check(f"tg:{user.user_id}"):
+        raise HTTPException(status_code=429, detail='Too many requests')
+    return user
+
+
 async def _get_ctx(user: AuthUser) -> UserContext:
     is_admin = user.user_id in cfg.admin_user_ids
     return await users.get_or_create_user(
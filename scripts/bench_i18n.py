@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.i18n import TRANSLATIONS, t
+
+
+def legacy_t(key: str, lang: str = 'en', **kwargs) -> str:
+    lang = lang if lang in TRANSLATIONS else 'en'
+    template = TRANSLATIONS.get(lang, {}).get(key) or TRANSLATIONS['en'].get(key) or key
+    try:
+        return template.format(**kwargs)
+    except Exception:
+        return template
+
+
+CASES = [
+    ('static', 'btn.back', {}),
+    ('placeholders', 'main.intro', {'username': 'Investor', 'tier': 'Pro'}),
+    ('missing kwargs', 'main.intro', {}),
+    ('unknown key', 'no.such.key', {}),
+]
+
+
+def main() -> None:
+    number = 200_000
+    print(f"{'case':<16}{'lang':<6}{'legacy ns':>12}{'compiled ns':>14}{'speedup':>10}")
+    for name, key, kwargs in CASES:
+        for lang in ('en', 'ru'):
+            assert legacy_t(key, lang, **kwargs) == t(key, lang, **kwargs)
+            old = min(timeit.repeat(lambda: legacy_t(key, lang, **kwargs), number=number, repeat=3)) / number * 1e9
+            new = min(timeit.repeat(lambda: t(key, lang, **kwargs), number=number, repeat=3)) / number * 1e9
+            print(f"{name:<16}{lang:<6}{old:>12.0f}{new:>14.0f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+
+from aiohttp import ClientSession, web
+
+BOT = {'id': 1000, 'is_bot': True, 'first_name': 'FakeBot', 'username': 'fake_bot', 'can_join_groups': True,
+       'can_read_all_group_messages': False, 'supports_inline_queries': False}
+
+
+class FakeBotApi:
+    def __init__(self) -> None:
+        self.message_ids = itertools.count(1)
+        self.update_ids = itertools.count(1)
+        self.webhook: dict[str, str] = {}
+        self.sent: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.calls: dict[str, int] = {}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == 'application/json':
+                params.update(await request.json())
+            else:
+                params.update(dict(await request.post()))
+        result = await self.dispatch(method, params)
+        return web.json_response({'ok': True, 'result': result})
+
+    async def dispatch(self, method: str, params: dict) -> object:
+        if method == 'getMe':
+            return BOT
+        if method == 'setWebhook':
+            self.webhook = {'url': params.get('url', ''), 'secret': params.get('secret_token', '')}
+            return True
+        if method == 'deleteWebhook':
+            self.webhook = {}
+            return True
+        if method == 'getWebhookInfo':
+            return {'url': self.webhook.get('url', ''), 'has_custom_certificate': False, 'pending_update_count': 0}
+        if method == 'getUpdates':
+            await asyncio.sleep(min(float(params.get('timeout') or 0), 1.0))
+            return []
+        if method in ('sendMessage', 'editMessageText'):
+            chat_id = int(params.get('chat_id') or 0)
+            started = self.sent.pop(chat_id, None)
+            if started is not None:
+                self.latencies.append(time.perf_counter() - started)
+            return self.message(chat_id, params.get('text', ''), params.get('message_id'))
+        return True
+
+    def message(self, chat_id: int, text: str, message_id: object = None) -> dict:
+        return {
+            'message_id': int(message_id or next(self.message_ids)),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': BOT,
+            'text': text,
+        }
+
+    def update(self, user_id: int, text: str | None = None, data: str | None = None) -> dict:
+        user = {'id': user_id, 'is_bot': False, 'first_name': f'user{user_id}', 'username': f'user{user_id}'}
+        message = {
+            'message_id': next(self.message_ids),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': user,
+        }
+        if data is None:
+            entities = [{'type': 'bot_command', 'offset': 0, 'length': len(text or '')}] if (text or '').startswith('/') else []
+            return {'update_id': next(self.update_ids), 'message': {**message, 'text': text, 'entities': entities}}
+        return {
+            'update_id': next(self.update_ids),
+            'callback_query': {'id': str(next(self.update_ids)), 'from': user, 'chat_instance': str(user_id),
+                               'data': data, 'message': {**message, 'from': BOT, 'text': 'menu'}},
+        }
+
+
+async def drive(api: FakeBotApi, users: int, rounds: int, script: list[str]) -> None:
+    while not api.webhook.get('url'):
+        await asyncio.sleep(0.2)
+    headers = {'X-Telegram-Bot-Api-Secret-Token': api.webhook['secret']} if api.webhook.get('secret') else {}
+    async with ClientSession() as session:
+        async def user_flow(user_id: int) -> None:
+            for _ in range(rounds):
+                for step in script:
+                    body = api.update(user_id, text=step) if step.startswith('/') else api.update(user_id, data=step)
+                    api.sent[user_id] = time.perf_counter()
+                    async with session.post(api.webhook['url'], data=json.dumps(body), headers={**headers, 'Content-Type': 'application/json'}):
+                        pass
+                    deadline = time.perf_counter() + 10
+                    while user_id in api.sent and time.perf_counter() < deadline:
+                        await asyncio.sleep(0.01)
+                    api.sent.pop(user_id, None)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user_flow(100 + i) for i in range(users)))
+        elapsed = time.perf_counter() - started
+    lat = sorted(api.latencies)
+    if lat:
+        p95 = lat[int(len(lat) * 0.95) - 1] if len(lat) > 1 else lat[0]
+        print(f"updates={len(lat)} elapsed={elapsed:.2f}s median={statistics.median(lat) * 1000:.0f}ms p95={p95 * 1000:.0f}ms")
+    print(f"calls={api.calls}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description='Minimal fake Telegram Bot API for local webhook runs')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--users', type=int, default=0, help='Simulated users to drive through the webhook')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--script', default='/start,menu:markets,menu:stocks,action:stocks_top:popular:1,menu:main')
+    args = parser.parse_args()
+
+    api = FakeBotApi()
+    server = web.Application()
+    server.router.add_route('*', '/bot{token}/{method}', api.handle)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+    print(f"Fake Bot API on http://127.0.0.1:{args.port}/bot (set TELEGRAM_API_BASE_URL to this)")
+    if args.users:
+        await drive(api, args.users, args.rounds, args.script.split(','))
+    else:
+        await asyncio.Event().wait()
+    await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
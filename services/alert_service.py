@@ -17,3 +17,23 @@ class AlertService:
         async with get_db() as db:
             rows = await fetchall(db, 'SELECT * FROM alerts WHERE user_id = ? AND is_active = 1', (user.user_id,))
         return [dict(row) for row in rows]
+
+    async def list_active_by_condition(self, condition: str, platform: str | None = None) -> list[dict[str, object]]:
+        platform_filter = 'AND u.platform = ?' if platform else ''
+        params = (condition, platform) if platform else (condition,)
+        async with get_db() as db:
+            rows = await fetchall(
+                db,
+                f"""
+                SELECT a.id, a.user_id, a.asset_type, a.symbol, a.target_value, u.platform, u.platform_user_id, u.language
+                FROM alerts a
+                JOIN users u ON u.id = a.user_id
+                WHERE a.condition = ? AND a.is_active = 1 {platform_filter}
+                """,
+                params,
+            )
+        items = [dict(row) for row in rows]
+        for item in items:
+            item['asset_type'] = str(item['asset_type']).lower()
+            item['symbol'] = str(item['symbol']).upper()
+        return items
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Callable
+
+from config import load_config
+from core.dispatcher import TokenBucket
+from core.jobs import JobRunner, still_leader
+from services.broadcast_service import BroadcastService
+
+if TYPE_CHECKING:
+    from services.watch_engine import DeliveryAdapter
+
+logger = logging.getLogger('broadcast')
+
+# Share of an adapter's global send rate that broadcasts leave to alerts.
+ALERT_RESERVE = 0.2
+
+FILTER_KEYS = {'lang': 'language', 'language': 'language', 'tier': 'tier', 'platform': 'platform'}
+
+
+def parse_broadcast(raw: str) -> tuple[dict[str, str], str]:
+    first, _, rest = raw.strip().partition('\n')
+    pairs = [token.partition('=') for token in first.split()]
+    if rest.strip() and pairs and all(sep and key.lower() in FILTER_KEYS and value for key, sep, value in pairs):
+        return {FILTER_KEYS[key.lower()]: value.lower() for key, _, value in pairs}, rest.strip()
+    return {}, raw.strip()
+
+
+# Totals only include recipients at or below the persisted watermark, so a
+# resume from it neither re-sends nor re-counts anyone finished above it.
+class _Progress:
+    def __init__(self, broadcast: dict[str, object]) -> None:
+        self.last_user_id = int(broadcast['last_user_id'] or 0)
+        self.delivered = int(broadcast['delivered'] or 0)
+        self.failed = int(broadcast['failed'] or 0)
+        self.blocked = int(broadcast['blocked'] or 0)
+        self.inflight: set[int] = set()
+        self.finished: dict[int, str] = {}
+
+    def issue(self, user_id: int) -> None:
+        self.inflight.add(user_id)
+        self.last_user_id = user_id
+
+    def finish(self, user_id: int, status: str) -> None:
+        self.inflight.discard(user_id)
+        self.finished[user_id] = status
+
+    def watermark(self) -> int:
+        return min(self.inflight) - 1 if self.inflight else self.last_user_id
+
+    def commit(self) -> int:
+        mark = self.watermark()
+        for user_id in [user_id for user_id in self.finished if user_id <= mark]:
+            status = self.finished.pop(user_id)
+            setattr(self, status, getattr(self, status) + 1)
+        return mark
+
+
+class BroadcastEngine:
+    def __init__(
+        self,
+        adapters: Callable[[], dict[str, DeliveryAdapter]],
+        service: BroadcastService | None = None,
+        rate: float = 25.0,
+        senders: int = 32,
+        batch: int = 1000,
+        checkpoint_every: float = 2.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.adapters = adapters
+        self.service = service or BroadcastService()
+        self.rate = rate
+        self.senders = max(1, senders)
+        self.batch = batch
+        self.checkpoint_every = checkpoint_every
+        self.max_attempts = max_attempts
+        self._paused_until = 0.0
+        self.counters = {'runs': 0, 'sent': 0, 'failed': 0, 'blocked': 0, 'retried': 0}
+
+    def schedule(self, jobs: JobRunner) -> None:
+        jobs.add('broadcast', self.tick, interval=5.0, first=5.0, jitter=0.0)
+
+    async def tick(self) -> None:
+        adapters = self.adapters()
+        broadcast = await self.service.next_pending(sorted(adapters))
+        if broadcast is not None:
+            await self.run(broadcast, adapters[str(broadcast['platform'])])
+
+    async def run(self, broadcast: dict[str, object], adapter: DeliveryAdapter) -> None:
+        broadcast_id = int(broadcast['id'])
+        progress = _Progress(broadcast)
+        bucket = TokenBucket(min(self.rate, adapter.global_bucket.rate * (1 - ALERT_RESERVE)))
+        queue: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue(maxsize=self.senders * 4)
+        text = str(broadcast['text'])
+        self.counters['runs'] += 1
+        logger.info("Broadcast %s started platform=%s from user_id>%s", broadcast_id, broadcast['platform'], progress.last_user_id)
+        await self._checkpoint(broadcast_id, progress)
+
+        async def produce() -> None:
+            after = progress.last_user_id
+            while True:
+                page = await self.service.recipients(
+                    str(broadcast['platform']), after, self.batch,
+                    language=broadcast.get('language') or None, tier=broadcast.get('tier') or None,
+                )
+                for user_id, chat_id in page:
+                    progress.issue(user_id)
+                    await queue.put((user_id, chat_id))
+                if len(page) < self.batch:
+                    break
+                after = page[-1][0]
+            for _ in range(self.senders):
+                await queue.put(None)
+
+        async def send() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                user_id, chat_id = item
+                status = await self._deliver(adapter, bucket, _chat_id(chat_id), text)
+                progress.finish(user_id, status)
+
+        workers = [asyncio.create_task(produce())] + [asyncio.create_task(send()) for _ in range(self.senders)]
+        try:
+            pending = set(workers)
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self.checkpoint_every, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()
+                if not await still_leader():
+                    logger.warning("Broadcast %s paused, lease lost", broadcast_id)
+                    return
+                await self._checkpoint(broadcast_id, progress)
+        except asyncio.CancelledError:
+            if await still_leader():
+                await self._checkpoint(broadcast_id, progress)
+            raise
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        await self._checkpoint(broadcast_id, progress, 'done')
+        logger.info(
+            "Broadcast %s done delivered=%s failed=%s blocked=%s",
+            broadcast_id, progress.delivered, progress.failed, progress.blocked,
+        )
+
+    async def _deliver(self, adapter: DeliveryAdapter, bucket: TokenBucket, chat_id: object, text: str) -> str:
+        attempt = 1
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await adapter.call(chat_id, text)
+                self.counters['sent'] += 1
+                return 'delivered'
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if adapter.is_blocked is not None and adapter.is_blocked(exc):
+                    self.counters['blocked'] += 1
+                    return 'blocked'
+                retry = adapter.retry_after(exc) if adapter.retry_after else None
+                if retry is None or attempt >= self.max_attempts:
+                    self.counters['failed'] += 1
+                    logger.debug("Broadcast send failed chat_id=%s error=%s", chat_id, exc)
+                    return 'failed'
+                self.counters['retried'] += 1
+                attempt += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + retry)
+
+    async def _checkpoint(self, broadcast_id: int, progress: _Progress, status: str = 'running') -> None:
+        mark = progress.commit()
+        await self.service.checkpoint(
+            broadcast_id, mark, progress.delivered, progress.failed, progress.blocked, status,
+        )
+
+    def stats(self) -> dict[str, int]:
+        return dict(self.counters)
+
+
+def _chat_id(raw: str) -> object:
+    return int(raw) if raw.lstrip('-').isdigit() else raw
+
+
+def build_broadcast_engine(adapters: Callable[[], dict[str, DeliveryAdapter]]) -> BroadcastEngine:
+    cfg = load_config()
+    return BroadcastEngine(adapters, rate=cfg.broadcast_rate, senders=cfg.broadcast_senders, batch=cfg.broadcast_batch)
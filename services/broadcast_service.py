@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from database import get_db, fetchall, fetchone
+
+
+class BroadcastService:
+    async def create(self, platform: str, text: str, created_by: int, language: str | None = None, tier: str | None = None) -> int:
+        async with get_db() as db:
+            where, params = _recipient_filter(platform, language, tier)
+            total = await fetchone(db, f'SELECT COUNT(*) AS c FROM users WHERE {where}', params)
+            cur = await db.execute(
+                """
+                INSERT INTO broadcasts (platform, language, tier, text, created_by, total)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (platform, language, tier, text, created_by, int(total['c']) if total else 0),
+            )
+            broadcast_id = cur.lastrowid
+            await cur.close()
+            await db.commit()
+        return int(broadcast_id)
+
+    async def get(self, broadcast_id: int) -> dict[str, object] | None:
+        async with get_db() as db:
+            row = await fetchone(db, 'SELECT * FROM broadcasts WHERE id = ?', (broadcast_id,))
+        return dict(row) if row else None
+
+    async def list_recent(self, limit: int = 5) -> list[dict[str, object]]:
+        async with get_db() as db:
+            rows = await fetchall(db, 'SELECT * FROM broadcasts ORDER BY id DESC LIMIT ?', (limit,))
+        return [dict(row) for row in rows]
+
+    async def next_pending(self, platforms: list[str]) -> dict[str, object] | None:
+        if not platforms:
+            return None
+        marks = ','.join('?' * len(platforms))
+        async with get_db() as db:
+            row = await fetchone(
+                db,
+                f"SELECT * FROM broadcasts WHERE status IN ('queued', 'running') AND platform IN ({marks}) ORDER BY id LIMIT 1",
+                tuple(platforms),
+            )
+        return dict(row) if row else None
+
+    async def recipients(
+        self,
+        platform: str,
+        after_id: int,
+        limit: int,
+        language: str | None = None,
+        tier: str | None = None,
+    ) -> list[tuple[int, str]]:
+        where, params = _recipient_filter(platform, language, tier)
+        async with get_db() as db:
+            rows = await fetchall(
+                db,
+                f'SELECT id, platform_user_id FROM users WHERE id > ? AND {where} ORDER BY id LIMIT ?',
+                (after_id, *params, limit),
+            )
+        return [(int(row['id']), str(row['platform_user_id'])) for row in rows]
+
+    async def checkpoint(self, broadcast_id: int, last_user_id: int, delivered: int, failed: int, blocked: int, status: str = 'running') -> None:
+        async with get_db() as db:
+            await db.execute(
+                """
+                UPDATE broadcasts SET
+                    status = ?, last_user_id = ?, delivered = ?, failed = ?, blocked = ?,
+                    updated_at = datetime('now'),
+                    finished_at = CASE WHEN ? = 'done' THEN datetime('now') ELSE finished_at END
+                WHERE id = ?
+                """,
+                (status, last_user_id, delivered, failed, blocked, status, broadcast_id),
+            )
+            await db.commit()
+
+
+def _recipient_filter(platform: str, language: str | None, tier: str | None) -> tuple[str, tuple]:
+    clauses = ['platform = ?']
+    params: list[object] = [platform]
+    if language:
+        clauses.append('language = ?')
+        params.append(language)
+    if tier:
+        clauses.append('tier = ?')
+        params.append(tier)
+    return ' AND '.join(clauses), tuple(params)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+
+from database import get_db, fetchone
+
+
+class ConversationService:
+    async def load(self, platform: str, user_id: str) -> str | None:
+        async with get_db() as db:
+            row = await fetchone(
+                db,
+                'SELECT data FROM conversation_state WHERE platform = ? AND platform_user_id = ?',
+                (platform, user_id),
+            )
+        return row['data'] if row else None
+
+    async def save_many(self, platform: str, rows: list[tuple[str, str]]) -> None:
+        if not rows:
+            return
+        now = time.time()
+        async with get_db() as db:
+            await db.executemany(
+                """
+                INSERT INTO conversation_state (platform, platform_user_id, data, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(platform, platform_user_id) DO UPDATE SET
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                [(platform, user_id, data, now) for user_id, data in rows],
+            )
+            await db.commit()
@@ -3,6 +3,9 @@ from __future__ import annotations
 import aiohttp
 import asyncio
 
+from core.metrics import metrics, provider_target
+from core.shared_limits import provider_quota
+
 
 class HttpClient:
     def __init__(self, timeout: int = 10) -> None:
@@ -17,16 +20,20 @@ class HttpClient:
             return self._session
 
     async def get_json(self, url: str, params: dict | None = None, headers: dict | None = None) -> dict:
-        session = await self._get_session()
-        async with session.get(url, params=params, headers=headers) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+        with metrics.wait('provider', provider_target(url)):
+            await provider_quota().acquire(url)
+            session = await self._get_session()
+            async with session.get(url, params=params, headers=headers) as resp:
+                resp.raise_for_status()
+                return await resp.json()
 
     async def post_json(self, url: str, payload: dict, headers: dict | None = None) -> dict:
-        session = await self._get_session()
-        async with session.post(url, json=payload, headers=headers) as resp:
-            resp.raise_for_status()
-            return await resp.json()
+        with metrics.wait('provider', provider_target(url)):
+            await provider_quota().acquire(url)
+            session = await self._get_session()
+            async with session.post(url, json=payload, headers=headers) as resp:
+                resp.raise_for_status()
+                return await resp.json()
 
     async def close(self) -> None:
         if self._session and not self._session.closed:
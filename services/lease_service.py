@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+
+from database import get_db, fetchone
+
+
+class LeaseService:
+    async def acquire(self, name: str, owner: str, ttl: float) -> int | None:
+        now = time.time()
+        async with get_db() as db:
+            await db.execute(
+                """
+                INSERT INTO job_leases (name, owner, expires_at, token, updated_at)
+                VALUES (?, ?, ?, 1, datetime('now'))
+                ON CONFLICT(name) DO UPDATE SET
+                    token = CASE WHEN job_leases.owner = excluded.owner AND job_leases.expires_at >= ?
+                                 THEN job_leases.token ELSE job_leases.token + 1 END,
+                    owner = excluded.owner,
+                    expires_at = excluded.expires_at,
+                    updated_at = datetime('now')
+                WHERE job_leases.owner = excluded.owner OR job_leases.expires_at < ?
+                """,
+                (name, owner, now + ttl, now, now),
+            )
+            await db.commit()
+            row = await fetchone(db, 'SELECT owner, token FROM job_leases WHERE name = ?', (name,))
+        if row and row['owner'] == owner:
+            return int(row['token'])
+        return None
+
+    async def renew(self, name: str, owner: str, token: int, ttl: float) -> bool:
+        now = time.time()
+        async with get_db() as db:
+            cur = await db.execute(
+                """
+                UPDATE job_leases SET expires_at = ?, updated_at = datetime('now')
+                WHERE name = ? AND owner = ? AND token = ? AND expires_at >= ?
+                """,
+                (now + ttl, name, owner, token, now),
+            )
+            renewed = cur.rowcount == 1
+            await cur.close()
+            await db.commit()
+        return renewed
+
+    async def check(self, name: str, owner: str, token: int) -> bool:
+        async with get_db() as db:
+            row = await fetchone(db, 'SELECT owner, token, expires_at FROM job_leases WHERE name = ?', (name,))
+        return bool(row) and row['owner'] == owner and int(row['token']) == token and row['expires_at'] >= time.time()
+
+    async def release(self, name: str, owner: str) -> None:
+        async with get_db() as db:
+            await db.execute('UPDATE job_leases SET expires_at = 0 WHERE name = ? AND owner = ?', (name, owner))
+            await db.commit()
@@ -7,6 +7,7 @@ import stripe
 
 from config import load_config
 from core.permissions import UserContext, normalize_tier
+from core.user_cache import user_cache
 from database import get_db, fetchone
 
 
@@ -109,6 +110,7 @@ class PaymentService:
             )
             await db.execute('UPDATE users SET tier = ?, stripe_customer_id = ? WHERE id = ?', (tier, customer_id, user_id))
             await db.commit()
+        user_cache.invalidate(user_id)
 
     async def _handle_subscription_update(self, sub: dict[str, Any]) -> None:
         customer_id = sub.get('customer')
@@ -129,3 +131,4 @@ class PaymentService:
             if status in {'canceled', 'unpaid', 'incomplete_expired'}:
                 await db.execute('UPDATE users SET tier = ? WHERE id = ?', ('free', user['id']))
             await db.commit()
+        user_cache.invalidate(user['id'])
@@ -3,6 +3,7 @@ from __future__ import annotations
 from database import get_db, fetchone, fetchall
 from core.permissions import normalize_tier, UserContext
 from core.i18n import normalize_lang
+from core.user_cache import user_cache
 
 
 class UserService:
@@ -14,6 +15,9 @@ class UserService:
         is_admin: bool,
         language_code: str | None = None,
     ) -> UserContext:
+        cached = user_cache.get(platform, platform_user_id)
+        if cached is not None:
+            return cached
         language = normalize_lang(language_code)
         async with get_db() as db:
             row = await fetchone(
@@ -34,26 +38,30 @@ class UserService:
                 )
             tier = normalize_tier(row['tier'])
             language = row['language'] or language
-            return UserContext(
-                platform=platform,
-                user_id=str(row['id']),
-                platform_user_id=str(platform_user_id),
-                username=row['username'],
-                tier=tier,
-                language=language,
-                is_admin=bool(row['is_admin']),
-                badge=row['profile_badge'] or 'none',
-            )
+        user = UserContext(
+            platform=platform,
+            user_id=str(row['id']),
+            platform_user_id=str(platform_user_id),
+            username=row['username'],
+            tier=tier,
+            language=language,
+            is_admin=bool(row['is_admin']),
+            badge=row['profile_badge'] or 'none',
+        )
+        user_cache.put(user)
+        return user
 
     async def update_tier(self, user_id: str, tier: str) -> None:
         async with get_db() as db:
             await db.execute('UPDATE users SET tier = ? WHERE id = ?', (tier, user_id))
             await db.commit()
+        user_cache.invalidate(user_id)
 
     async def update_language(self, user_id: str, language: str) -> None:
         async with get_db() as db:
             await db.execute('UPDATE users SET language = ? WHERE id = ?', (language, user_id))
             await db.commit()
+        user_cache.invalidate(user_id)
 
     async def get_user_stats(self) -> dict[str, str]:
         async with get_db() as db:
@@ -69,3 +77,4 @@ class UserService:
         async with get_db() as db:
             await db.execute('UPDATE users SET profile_badge = ? WHERE id = ?', (badge, user_id))
             await db.commit()
+        user_cache.invalidate(user_id)
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from config import load_config
+from core.dispatcher import NotificationDispatcher, SendFunc, RetryAfterFunc, TokenBucket
+from core.i18n import t
+from core.jobs import JobRunner, still_leader
+from core.market_hours import PollScheduler
+from core.price_windows import PriceWindowBook, parse_windows
+from services.broadcast_engine import build_broadcast_engine
+from services.watch_service import WatchService
+
+if TYPE_CHECKING:
+    from core.router import Router
+
+
+class DeliveryAdapter:
+    def __init__(
+        self,
+        platform: str,
+        send: SendFunc,
+        retry_after: RetryAfterFunc | None = None,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        senders: int = 8,
+        is_blocked: Callable[[BaseException], bool] | None = None,
+    ) -> None:
+        self.platform = platform
+        self.send = send
+        self.retry_after = retry_after
+        self.is_blocked = is_blocked
+        # One platform-wide budget for alerts and broadcasts, only touched on
+        # the adapter's own loop.
+        self.global_bucket = TokenBucket(global_rate)
+        self.dispatcher = NotificationDispatcher(
+            send,
+            retry_after=retry_after,
+            chat_rate=chat_rate,
+            senders=senders,
+            name=f'{platform}-notify',
+            global_bucket=self.global_bucket,
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.dispatcher.start()
+
+    async def stop(self) -> None:
+        await self.dispatcher.stop()
+
+    def submit(self, chat_id: object, text: str) -> bool:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return self.dispatcher.submit(chat_id, text)
+        loop.call_soon_threadsafe(self.dispatcher.submit, chat_id, text)
+        return True
+
+    async def call(self, chat_id: object, text: str) -> None:
+        loop = self._loop
+        if loop is None or loop is asyncio.get_running_loop():
+            await self._call(chat_id, text)
+            return
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._call(chat_id, text), loop))
+
+    async def _call(self, chat_id: object, text: str) -> None:
+        delay = self.global_bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.send(chat_id, text)
+
+
+class WatchEngine:
+    def __init__(self, router: Router, watch: WatchService | None = None) -> None:
+        cfg = load_config()
+        self.router = router
+        self.watch = watch or WatchService()
+        self.threshold = cfg.price_alert_pct
+        self.windows = PriceWindowBook(parse_windows(cfg.price_alert_windows))
+        self.scheduler = PollScheduler(
+            base_interval=cfg.watch_base_interval,
+            hot_interval=cfg.watch_hot_interval,
+            threshold=self.threshold,
+            windows=self.windows.windows,
+        )
+        self.tick_interval = self.scheduler.hot_interval
+        self.roster_ttl = 60.0
+        self._roster_cache: tuple[list[dict[str, object]], list[dict[str, object]]] | None = None
+        self._roster_at = 0.0
+        self._baseline_at: dict[tuple[str, str], float] = {}
+        self.adapters: dict[str, DeliveryAdapter] = {}
+        self.jobs: JobRunner | None = None
+        self.broadcasts = build_broadcast_engine(lambda: dict(self.adapters))
+        self._driver: str | None = None
+        self._standby: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, adapter: DeliveryAdapter) -> None:
+        with self._lock:
+            self.adapters[adapter.platform] = adapter
+
+    def unregister(self, platform: str) -> None:
+        with self._lock:
+            self.adapters.pop(platform, None)
+
+    def claim_driver(self, platform: str, takeover: Callable[[], None] | None = None) -> bool:
+        with self._lock:
+            if self._driver is None:
+                self._driver = platform
+                return True
+            if takeover is not None:
+                self._standby[platform] = takeover
+            return False
+
+    def release_driver(self, platform: str) -> None:
+        takeover = None
+        with self._lock:
+            self._standby.pop(platform, None)
+            if self._driver != platform:
+                return
+            self._driver = None
+            self.jobs = None
+            if self._standby:
+                self._driver, takeover = self._standby.popitem()
+        if takeover is not None:
+            takeover()
+
+    async def tick(self) -> None:
+        adapters = dict(self.adapters)
+        if not adapters:
+            return
+        now = time.time()
+        items, alerts = await self._roster(now)
+        items = [i for i in items if i['platform'] in adapters]
+        alerts = [a for a in alerts if a['platform'] in adapters]
+        watchers: dict[tuple[str, str], int] = {}
+        for row in items + alerts:
+            asset_type = str(row['asset_type'])
+            if is_stock_type(asset_type) or is_crypto_type(asset_type) or is_forex_type(asset_type):
+                key = (asset_kind(asset_type), str(row['symbol']))
+                watchers[key] = watchers.get(key, 0) + 1
+        self.windows.prune(set(watchers), {int(a['id']) for a in alerts})
+        due = self.scheduler.due(watchers, self.windows.moves, now)
+        if not due:
+            return
+
+        prices = await self._fetch_prices(due)
+        if not await still_leader():
+            return
+        for (kind, symbol), value in prices.items():
+            self.windows.update(kind, symbol, now, value)
+
+        for alert in alerts:
+            asset_type = str(alert['asset_type'])
+            symbol = str(alert['symbol'])
+            if (asset_kind(asset_type), symbol) not in prices:
+                continue
+            move = self.windows.check(int(alert['id']), asset_kind(asset_type), symbol, float(alert['target_value'] or 0), now)
+            if move is None:
+                continue
+            lang = str(alert.get('language') or 'ru')
+            text = t(
+                'msg.alert_percent_fired',
+                lang,
+                emoji='📈' if move.pct >= 0 else '📉',
+                symbol=symbol,
+                pct=f"{move.pct:+.2f}%",
+                window=move.window,
+                price=fmt_watch_price(asset_type, move.price),
+                link=self.router._link_for_asset(asset_type, symbol),
+            )
+            adapters[str(alert['platform'])].submit(_chat_id(alert), text)
+
+        baseline = {
+            key for key in prices
+            if now - self._baseline_at.get(key, 0.0) >= self.scheduler.base_interval - self.tick_interval / 2
+        }
+        if not baseline:
+            return
+        for key in baseline:
+            self._baseline_at[key] = now
+        for key in [k for k in self._baseline_at if k not in watchers]:
+            del self._baseline_at[key]
+        states = await self.watch.load_states()
+
+        state_rows: list[tuple[int, str, str, float | None, bool]] = []
+        for item in items:
+            user_id = int(item['user_id'])
+            asset_type = str(item['asset_type']).lower()
+            symbol = str(item['symbol']).upper()
+
+            key = (asset_kind(asset_type), symbol)
+            if key not in baseline:
+                continue
+            price = prices[key]
+
+            last_price = states.get((user_id, asset_type, symbol))
+            pct = None
+            if last_price and last_price != 0:
+                pct = (price - last_price) / last_price * 100.0
+
+            notified = False
+            if pct is not None and abs(pct) >= self.threshold:
+                emoji = '📈' if pct >= 0 else '📉'
+                price_str = fmt_watch_price(asset_type, price)
+                link = self.router._link_for_asset(asset_type, symbol)
+                text = f"{emoji} {symbol}: {price_str} ({pct:+.2f}%)\n{link}"
+                notified = adapters[str(item['platform'])].submit(_chat_id(item), text)
+
+            state_rows.append((user_id, asset_type, symbol, price, notified))
+        await self.watch.upsert_states(state_rows)
+
+    async def _roster(self, now: float) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+        if self._roster_cache is None or now - self._roster_at >= self.roster_ttl:
+            items = await self.watch.list_watch_items()
+            alerts = await self.router.alerts.list_active_by_condition('percent')
+            self._roster_cache = (items, alerts)
+            self._roster_at = now
+        return self._roster_cache
+
+    def stats(self) -> dict[str, object]:
+        return {
+            **self.scheduler.stats(),
+            'adapters': {name: adapter.dispatcher.stats() for name, adapter in self.adapters.items()},
+            'broadcasts': self.broadcasts.stats(),
+        }
+
+    async def _fetch_prices(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], float]:
+        stock_symbols = sorted({symbol for kind, symbol in keys if kind == 'stock'})
+        crypto_symbols = sorted({symbol for kind, symbol in keys if kind == 'crypto'})
+        forex_pairs = sorted({symbol for kind, symbol in keys if kind == 'forex'})
+
+        raw: list[tuple[str, str, object]] = []
+        if stock_symbols:
+            quotes = await self.router.stocks.get_quotes_details(stock_symbols)
+            raw.extend(('stock', str(q.get('symbol') or '').upper(), q.get('price')) for q in quotes)
+        if crypto_symbols:
+            quotes = await self.router.crypto.get_quotes(crypto_symbols)
+            raw.extend(('crypto', str(sym).upper(), q.get('price')) for sym, q in quotes.items())
+        if forex_pairs:
+            fx = await self.router.forex.get_pairs_changes(forex_pairs)
+            raw.extend(('forex', str(item.get('pair') or '').upper(), item.get('rate')) for item in fx)
+
+        return {
+            (kind, symbol): float(value)
+            for kind, symbol, value in raw
+            if isinstance(value, (int, float)) and value > 0
+        }
+
+    def schedule(self, jobs: JobRunner) -> None:
+        self.jobs = jobs
+        jobs.add('price_watch', self.tick, interval=self.tick_interval, first=20, timeout=max(60.0, self.tick_interval * 4))
+        self.broadcasts.schedule(jobs)
+
+
+_engine: WatchEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def shared_engine(router: Router) -> WatchEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = WatchEngine(router)
+        return _engine
+
+
+def current_engine() -> WatchEngine | None:
+    return _engine
+
+
+def _chat_id(row: dict[str, object]) -> object:
+    raw = str(row['platform_user_id'])
+    return int(raw) if raw.lstrip('-').isdigit() else raw
+
+
+def fmt_watch_price(asset_type: str, value: object) -> str:
+    if is_forex_type(asset_type) and isinstance(value, (int, float)):
+        return f"{float(value):.5f}"
+    return _fmt_price_value(value)
+
+
+def _fmt_price_value(value: object) -> str:
+    try:
+        if isinstance(value, (int, float)):
+            if value >= 1:
+                return f"${value:,.2f}"
+            return f"${value:,.6f}"
+    except Exception:
+        pass
+    return 'N/A'
+
+
+def is_stock_type(value: str) -> bool:
+    return value in {'stock', 'stocks', 'equity', 'etf', 'fund', 'funds'}
+
+
+def is_crypto_type(value: str) -> bool:
+    return value in {'crypto', 'coin', 'token', 'ton', 'jetton'}
+
+
+def is_forex_type(value: str) -> bool:
+    return value in {'forex', 'fx'}
+
+
+def asset_kind(value: str) -> str:
+    if is_crypto_type(value):
+        return 'crypto'
+    if is_forex_type(value):
+        return 'forex'
+    return 'stock'
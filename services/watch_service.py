@@ -4,28 +4,30 @@ from database import get_db, fetchall
 
 
 class WatchService:
-    async def list_watch_items(self, platform: str) -> list[dict[str, object]]:
+    async def list_watch_items(self, platform: str | None = None) -> list[dict[str, object]]:
+        where = 'WHERE u.platform = ?' if platform else ''
+        params = (platform,) if platform else ()
         async with get_db() as db:
             portfolio_rows = await fetchall(
                 db,
-                """
-                SELECT u.id as user_id, u.platform_user_id, u.language, p.asset_type, p.symbol, 'portfolio' as source
+                f"""
+                SELECT u.id as user_id, u.platform, u.platform_user_id, u.language, p.asset_type, p.symbol, 'portfolio' as source
                 FROM users u
                 JOIN portfolios pf ON pf.user_id = u.id
                 JOIN portfolio_items p ON p.portfolio_id = pf.id
-                WHERE u.platform = ?
+                {where}
                 """,
-                (platform,),
+                params,
             )
             favorite_rows = await fetchall(
                 db,
-                """
-                SELECT u.id as user_id, u.platform_user_id, u.language, f.asset_type, f.symbol, 'favorite' as source
+                f"""
+                SELECT u.id as user_id, u.platform, u.platform_user_id, u.language, f.asset_type, f.symbol, 'favorite' as source
                 FROM users u
                 JOIN favorites f ON f.user_id = u.id
-                WHERE u.platform = ?
+                {where}
                 """,
-                (platform,),
+                params,
             )
         items = [dict(row) for row in portfolio_rows] + [dict(row) for row in favorite_rows]
         seen: set[tuple[int, str, str]] = set()
@@ -62,3 +64,23 @@ class WatchService:
                 (user_id, asset_type, symbol, price, 1 if notified else 0, 1 if notified else 0),
             )
             await db.commit()
+
+    async def upsert_states(self, rows: list[tuple[int, str, str, float | None, bool]]) -> None:
+        if not rows:
+            return
+        async with get_db() as db:
+            await db.executemany(
+                """
+                INSERT INTO price_watch (user_id, asset_type, symbol, last_price, last_notified_at, updated_at)
+                VALUES (?, ?, ?, ?, CASE WHEN ? THEN datetime('now') ELSE NULL END, datetime('now'))
+                ON CONFLICT(user_id, asset_type, symbol) DO UPDATE SET
+                    last_price = excluded.last_price,
+                    last_notified_at = CASE WHEN ? THEN datetime('now') ELSE price_watch.last_notified_at END,
+                    updated_at = datetime('now')
+                """,
+                [
+                    (user_id, asset_type, symbol, price, 1 if notified else 0, 1 if notified else 0)
+                    for user_id, asset_type, symbol, price, notified in rows
+                ],
+            )
+            await db.commit()
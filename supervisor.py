@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from urllib.request import urlopen
+
+from config import load_config
+from core.logging_setup import setup_logging
+
+logger = logging.getLogger('supervisor')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEARTBEAT_EVERY = 5.0
+
+
+@dataclass
+class Worker:
+    name: str
+    command: list[str]
+    env: dict[str, str] = field(default_factory=dict)
+    heartbeat: str | None = None
+    health_url: str | None = None
+    process: asyncio.subprocess.Process | None = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    backoff: float = 1.0
+
+
+def _probe(url: str, timeout: float) -> int:
+    with urlopen(url, timeout=timeout) as resp:
+        return resp.status
+
+
+def heartbeat_path(run_dir: str, name: str) -> str:
+    return os.path.join(run_dir, f'{name}.hb')
+
+
+async def heartbeat(path: str, every: float = HEARTBEAT_EVERY) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    while True:
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(f'{os.getpid()} {time.time():.0f}\n')
+        await asyncio.sleep(every)
+
+
+class Supervisor:
+    def __init__(
+        self,
+        workers: list[Worker],
+        check_every: float = HEARTBEAT_EVERY,
+        stale_after: float = 30.0,
+        grace: float = 30.0,
+        max_failures: int = 3,
+        max_backoff: float = 60.0,
+        shutdown_timeout: float = 20.0,
+    ) -> None:
+        self.workers = workers
+        self.check_every = check_every
+        self.stale_after = stale_after
+        self.grace = grace
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self.stopping = asyncio.Event()
+        self._kills: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        tasks = [asyncio.create_task(self._keep_alive(worker), name=f'supervise-{worker.name}') for worker in self.workers]
+        tasks.append(asyncio.create_task(self._check_health(), name='supervise-health'))
+        await self.stopping.wait()
+        await asyncio.gather(*(self._terminate(worker) for worker in self.workers))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        logger.info("Shutting down workers")
+        self.stopping.set()
+
+    async def _keep_alive(self, worker: Worker) -> None:
+        while not self.stopping.is_set():
+            await self._spawn(worker)
+            code = await worker.process.wait()
+            if self.stopping.is_set():
+                return
+            uptime = time.monotonic() - worker.started_at
+            if uptime > self.max_backoff:
+                worker.backoff = 1.0
+            logger.warning("Worker %s exited code=%s after %.0fs, restarting in %.0fs", worker.name, code, uptime, worker.backoff)
+            try:
+                await asyncio.wait_for(self.stopping.wait(), timeout=worker.backoff)
+                return
+            except asyncio.TimeoutError:
+                pass
+            worker.backoff = min(self.max_backoff, worker.backoff * 2)
+            worker.restarts += 1
+
+    async def _spawn(self, worker: Worker) -> None:
+        if worker.heartbeat and os.path.exists(worker.heartbeat):
+            os.remove(worker.heartbeat)
+        worker.process = await asyncio.create_subprocess_exec(*worker.command, cwd=ROOT, env={**os.environ, **worker.env})
+        worker.started_at = time.monotonic()
+        worker.failures = 0
+        logger.info("Worker %s started pid=%s", worker.name, worker.process.pid)
+
+    async def _check_health(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_every)
+            for worker in self.workers:
+                if worker.process is None or worker.process.returncode is not None:
+                    continue
+                if time.monotonic() - worker.started_at < self.grace:
+                    continue
+                if await self._healthy(worker):
+                    worker.failures = 0
+                    continue
+                worker.failures += 1
+                logger.warning("Worker %s failed health check (%s/%s)", worker.name, worker.failures, self.max_failures)
+                if worker.failures >= self.max_failures:
+                    worker.failures = 0
+                    task = asyncio.create_task(self._terminate(worker))
+                    self._kills.add(task)
+                    task.add_done_callback(self._kills.discard)
+
+    async def _healthy(self, worker: Worker) -> bool:
+        if worker.heartbeat:
+            try:
+                if time.time() - os.path.getmtime(worker.heartbeat) > self.stale_after:
+                    return False
+            except OSError:
+                return False
+        if worker.health_url:
+            try:
+                status = await asyncio.to_thread(_probe, worker.health_url, self.check_every)
+            except Exception:
+                return False
+            return status < 500
+        return True
+
+    async def _terminate(self, worker: Worker) -> None:
+        process = worker.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Worker %s did not stop in %ss, killing", worker.name, self.shutdown_timeout)
+            process.kill()
+            await process.wait()
+
+
+def shard_ranges(count: int, processes: int) -> list[str]:
+    processes = max(1, min(processes, count))
+    size, extra = divmod(count, processes)
+    ranges: list[str] = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(f'{start}-{end - 1}')
+        start = end
+    return ranges
+
+
+def build_workers(names: list[str]) -> list[Worker]:
+    cfg = load_config()
+    run_dir = cfg.supervisor_run_dir
+    python = sys.executable
+    entry = os.path.join(ROOT, 'main.py')
+    log_dir = os.path.dirname(cfg.log_file)
+    shared = {'CACHE_BACKEND': 'sqlite', 'RATE_LIMIT_BACKEND': 'sqlite'}
+    bot_jobs = '0' if 'jobs' in names else '1'
+    workers: list[Worker] = []
+    for name in names:
+        env = {**shared, 'LOG_FILE': os.path.join(log_dir, f'{name}.log')}
+        if name == 'telegram':
+            health = None
+            if cfg.telegram_mode == 'webhook':
+                health = f'http://127.0.0.1:{cfg.telegram_webhook_port}/healthz'
+            workers.append(Worker(
+                name,
+                [python, entry, '--telegram', '--worker', name],
+                env={**env, 'BACKGROUND_JOBS': bot_jobs},
+                heartbeat=heartbeat_path(run_dir, name),
+                health_url=health,
+            ))
+        elif name == 'discord':
+            if cfg.discord_shard_processes <= 1:
+                shards = [(name, {})]
+            else:
+                count = cfg.discord_shard_count or cfg.discord_shard_processes
+                shards = [
+                    (f'discord-{index}', {'DISCORD_SHARD_COUNT': str(count), 'DISCORD_SHARD_IDS': ids})
+                    for index, ids in enumerate(shard_ranges(count, cfg.discord_shard_processes))
+                ]
+            for worker_name, shard_env in shards:
+                workers.append(Worker(
+                    worker_name,
+                    [python, entry, '--discord', '--worker', worker_name],
+                    env={**shared, 'LOG_FILE': os.path.join(log_dir, f'{worker_name}.log'), 'BACKGROUND_JOBS': bot_jobs, **shard_env},
+                    heartbeat=heartbeat_path(run_dir, worker_name),
+                ))
+        elif name == 'jobs':
+            workers.append(Worker(name, [python, entry, '--jobs', '--worker', name], env=env, heartbeat=heartbeat_path(run_dir, name)))
+        elif name == 'api':
+            workers.append(Worker(
+                name,
+                [python, '-m', 'uvicorn', 'mini_app.backend.main:app', '--host', cfg.mini_app_host, '--port', str(cfg.mini_app_port)],
+                env=env,
+                health_url=f'http://127.0.0.1:{cfg.mini_app_port}/health',
+            ))
+        else:
+            raise ValueError(f"Unknown worker: {name}")
+    if cfg.metrics_port:
+        # Each process serves its own /metrics, so give them consecutive ports.
+        for offset, worker in enumerate(worker for worker in workers if worker.name != 'api'):
+            worker.env['METRICS_PORT'] = str(cfg.metrics_port + offset)
+    return workers
+
+
+async def main() -> None:
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description='Run bots, background jobs and the mini-app API as separate processes')
+    parser.add_argument('--workers', default=cfg.supervisor_workers, help='Comma-separated workers: telegram,discord,jobs,api')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.workers.split(',') if name.strip()]
+    supervisor = Supervisor(build_workers(names))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, supervisor.stop)
+        except NotImplementedError:
+            pass
+    await supervisor.run()
+
+
+if __name__ == '__main__':
+    setup_logging(os.path.join(os.path.dirname(load_config().log_file), 'supervisor.log'))
+    asyncio.run(main())
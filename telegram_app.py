@@ -2,18 +2,27 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from pathlib import Path
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
 
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
+from telegram import Bot, Update, InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+from telegram.error import Forbidden, RetryAfter
+from telegram.ext import Application, BaseUpdateProcessor, CallbackContext, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
 
-from config import load_config
+from config import Config, load_config
+from core.conversation_state import UserState, telegram_state
+from core.logging_setup import setup_logging
 from database import init_db
 from core.router import Router, ACTION_BACK_MENU
-from core.ui import UIMessage, ButtonSpec
-from core.permissions import UserContext
+from core.ui import UIMessage, ButtonSpec, RenderCache
+from core.permissions import UserContext, is_admin_allowed
 from core.i18n import t
-from core.ratelimit import RateLimiter
+from core.shared_limits import build_rate_limiter
+from core.user_cache import user_cache
+from core.jobs import JobRunner
+from core.metrics import metrics, timed
+from core.prefetch import prefetcher
 from services.stocks_service import StocksService
 from services.crypto_service import CryptoService
 from services.ton_service import TonService
@@ -29,31 +38,23 @@ from services.translation_service import TranslationService
 from services.link_service import LinkService
 from services.exchange_service import ExchangeService
 from services.favorites_service import FavoritesService
-from services.watch_service import WatchService
 from services.profile_service import ProfileService
+from services.watch_engine import DeliveryAdapter, WatchEngine, shared_engine
 
-log_dir = Path('logs')
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / 'telegram.log'
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler(),
-    ],
-)
-logging.getLogger('httpx').setLevel(logging.WARNING)
+setup_logging()
 logger = logging.getLogger('telegram_app')
 
-rate_limiter = RateLimiter()
-watch_service = WatchService()
+keyboard_cache = RenderCache(maxsize=512)
 
+PROGRESSIVE_AFTER = 0.4
 
-def _infer_style(btn: ButtonSpec) -> str | None:
-    text = (btn.label or '').lower()
-    action = (btn.action or '').lower()
+rate_limiter = build_rate_limiter()
+
+
+@lru_cache(maxsize=4096)
+def _infer_style(label: str, action: str) -> str | None:
+    text = (label or '').lower()
+    action = (action or '').lower()
     danger_keys = ['remove', 'delete', 'cancel', 'toggle', 'off', 'stop', 'unsubscribe', 'danger', 'удал', 'отмен', 'стоп']
     success_keys = ['add', 'create', 'start', 'open', 'upgrade', 'buy', 'confirm', 'success', 'добав', 'созд', 'нач', 'откры', 'апгрейд']
 
@@ -73,7 +74,7 @@ def _keyboard_from_buttons(buttons: list[list[ButtonSpec]] | None, webapp_url: s
     for row in buttons:
         btn_row: list[InlineKeyboardButton] = []
         for btn in row:
-            style = btn.style or _infer_style(btn)
+            style = btn.style or _infer_style(btn.label, btn.action)
             if btn.action.startswith('webapp:'):
                 url = btn.action.replace('webapp:', '') or webapp_url
                 btn_row.append(InlineKeyboardButton(btn.label, web_app=WebAppInfo(url=url), api_kwargs={'style': style}))
@@ -86,9 +87,21 @@ def _keyboard_from_buttons(buttons: list[list[ButtonSpec]] | None, webapp_url: s
     return InlineKeyboardMarkup(rows)
 
 
+def _keyboard_for(message: UIMessage, webapp_url: str) -> InlineKeyboardMarkup | None:
+    if message.cache_key is None:
+        return _keyboard_from_buttons(message.buttons, webapp_url)
+    key = (message.cache_key, webapp_url)
+    keyboard = keyboard_cache.get(key)
+    if keyboard is None:
+        keyboard = _keyboard_from_buttons(message.buttons, webapp_url)
+        if keyboard is not None:
+            keyboard_cache.put(key, keyboard)
+    return keyboard
+
+
 async def _send_ui(update: Update, context: ContextTypes.DEFAULT_TYPE, message: UIMessage) -> None:
     cfg = load_config()
-    keyboard = _keyboard_from_buttons(message.buttons, cfg.telegram_webapp_url)
+    keyboard = _keyboard_for(message, cfg.telegram_webapp_url)
     if update.callback_query:
         await update.callback_query.edit_message_text(message.text, reply_markup=keyboard, parse_mode=message.parse_mode)
         if update.callback_query.message:
@@ -100,9 +113,80 @@ async def _send_ui(update: Update, context: ContextTypes.DEFAULT_TYPE, message:
         context.user_data['menu_chat_id'] = sent.chat_id
 
 
+def _cancel_pending_render(context: ContextTypes.DEFAULT_TYPE) -> None:
+    task = context.user_data.pop('pending_render', None)
+    if task is not None and not task.done():
+        task.cancel()
+
+
+async def _send_progressive(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    user: UserContext,
+    render: Awaitable[UIMessage],
+    back_menu: str,
+    finish: Callable[[UIMessage], UIMessage] | None = None,
+    send: Callable[[Update, ContextTypes.DEFAULT_TYPE, UIMessage], Awaitable[None]] = _send_ui,
+    skeleton: str = 'msg.loading',
+    idempotent: bool = True,
+) -> None:
+    task = asyncio.ensure_future(render)
+    done, _ = await asyncio.wait({task}, timeout=PROGRESSIVE_AFTER)
+    if task in done:
+        await send(update, context, _render_result(task, user, back_menu, finish))
+        return
+    placeholder = UIMessage(
+        text=t(skeleton, user.language),
+        buttons=[[ButtonSpec(t('btn.back', user.language), f'menu:{back_menu}')]],
+    )
+    # Only idempotent renders may be superseded; writes always finish and report back.
+    if idempotent:
+        context.user_data['pending_render'] = task
+    await send(update, context, placeholder)
+    context.application.create_task(_finish_render(update, context, user, task, back_menu, finish, send, idempotent), update=update)
+
+
+async def _finish_render(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    user: UserContext,
+    task: asyncio.Future,
+    back_menu: str,
+    finish: Callable[[UIMessage], UIMessage] | None,
+    send: Callable[[Update, ContextTypes.DEFAULT_TYPE, UIMessage], Awaitable[None]],
+    idempotent: bool,
+) -> None:
+    try:
+        await asyncio.wait({task})
+    finally:
+        current = not idempotent or context.user_data.get('pending_render') is task
+        if context.user_data.get('pending_render') is task:
+            context.user_data.pop('pending_render', None)
+    if task.cancelled():
+        return
+    if not current:
+        task.exception()
+        return
+    await send(update, context, _render_result(task, user, back_menu, finish))
+
+
+def _render_result(
+    task: asyncio.Future,
+    user: UserContext,
+    back_menu: str,
+    finish: Callable[[UIMessage], UIMessage] | None,
+) -> UIMessage:
+    try:
+        message = task.result()
+    except Exception:
+        logger.exception("Render failed user_id=%s", user.user_id)
+        return _ensure_buttons(user, UIMessage(text=t('msg.action_failed', user.language)), back_menu)
+    return finish(message) if finish else message
+
+
 async def _edit_menu_message(update: Update, context: ContextTypes.DEFAULT_TYPE, message: UIMessage) -> None:
     cfg = load_config()
-    keyboard = _keyboard_from_buttons(message.buttons, cfg.telegram_webapp_url)
+    keyboard = _keyboard_for(message, cfg.telegram_webapp_url)
     chat_id = context.user_data.get('menu_chat_id') or update.effective_chat.id
     msg_id = context.user_data.get('menu_message_id')
     if msg_id:
@@ -163,6 +247,12 @@ def _build_router() -> Router:
         translator=TranslationService(),
     )
 
+
+def _cached_tier(update: Update) -> str:
+    user = user_cache.get('telegram', str(update.effective_user.id)) if update.effective_user else None
+    return user.tier if user else 'free'
+
+
 async def _ensure_user_context(update: Update, context: ContextTypes.DEFAULT_TYPE) -> UserContext:
     router: Router = context.bot_data['router']
     cfg = load_config()
@@ -176,16 +266,17 @@ async def _ensure_user_context(update: Update, context: ContextTypes.DEFAULT_TYP
         is_admin,
         update.effective_user.language_code,
     )
-    context.user_data['user'] = user
     if update.effective_user and not context.user_data.get('mention'):
         context.user_data['mention'] = update.effective_user.mention_markdown()
     return user
 
 
+@timed('telegram:start')
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    logger.info("Received /start from user_id=%s", update.effective_user.id if update.effective_user else 'unknown')
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    user_id = update.effective_user.id if update.effective_user else 'unknown'
+    logger.info("Received /start from user_id=%s", user_id, extra={'event': 'start', 'user_id': user_id})
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     if context.args:
@@ -199,11 +290,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     mention = context.user_data.get('mention') or (user.username or 'Investor')
     message = router.main_menu(user, mention)
     await _send_ui(update, context, message)
+    prefetcher.observe(router, user, 'menu:main')
 
 
+@timed('telegram:valuation')
 async def valuation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = await router.handle_action('stocks_valuation', user)
@@ -212,88 +305,84 @@ async def valuation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await _send_ui(update, context, message)
 
 
+@timed('telegram:menu')
 async def menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     mention = context.user_data.get('mention') or (user.username or 'Investor')
     message = router.main_menu(user, mention)
     await _send_ui(update, context, message)
+    prefetcher.observe(router, user, 'menu:main')
 
 
+@timed('telegram:dashboard')
 async def dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = await router.handle_action('crypto_prices', user)
     await _send_ui(update, context, message)
 
 
+@timed('telegram:price')
 async def price(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = await router.handle_action('stocks_find', user)
     await _send_ui(update, context, message)
 
 
+@timed('telegram:crypto_menu')
 async def crypto_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = router.menu('crypto', user)
     await _send_ui(update, context, message)
 
 
+@timed('telegram:help_menu')
 async def help_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = router.menu('onboarding', user)
     await _send_ui(update, context, message)
 
 
+@timed('telegram:faq_menu')
 async def faq_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
     user = await _ensure_user_context(update, context)
     message = await router.handle_action('education_glossary', user)
     await _send_ui(update, context, message)
 
 
+@timed('telegram:handle_callback')
 async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    logger.info("Callback from user_id=%s data=%s", update.effective_user.id if update.effective_user else 'unknown', update.callback_query.data if update.callback_query else None)
+    user_id = update.effective_user.id if update.effective_user else 'unknown'
+    data = update.callback_query.data if update.callback_query else None
+    logger.info("Callback from user_id=%s data=%s", user_id, data, extra={'event': 'callback', 'user_id': user_id, 'data': data})
     if update.callback_query:
         data = update.callback_query.data or ''
         try:
             await update.callback_query.answer()
         except Exception:
             pass
-        if _is_translate_request(data):
-            lang = 'ru'
-            user_ctx: UserContext | None = context.user_data.get('user')
-            if user_ctx:
-                lang = user_ctx.language
-            try:
-                await update.callback_query.edit_message_text(
-                    t('msg.translating', lang),
-                    reply_markup=update.callback_query.message.reply_markup if update.callback_query.message else None,
-                )
-            except Exception:
-                pass
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
-        return
-    user: UserContext = context.user_data.get('user')
-    if not user:
-        await start(update, context)
+    _cancel_pending_render(context)
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
+    user = await _ensure_user_context(update, context)
     data = update.callback_query.data or ''
     if data.startswith('menu:'):
         menu_id = data.split(':', 1)[1]
@@ -308,6 +397,7 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         else:
             message = router.menu(menu_id, user)
         await _send_ui(update, context, message)
+        prefetcher.observe(router, user, data)
         return
     if data.startswith('action:'):
         action_payload = data.split(':', 1)[1]
@@ -319,15 +409,28 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             context.user_data['portfolio_add_type'] = payload
         if action == 'favorites_add_type':
             context.user_data['favorites_add_type'] = payload
-        message = await router.handle_action(action, user, payload)
-        context.user_data['awaiting'] = message.expect_input
-        context.user_data['awaiting_action'] = action if message.expect_input else None
-        await _send_ui(update, context, message)
+
+        def _await_input(message: UIMessage) -> UIMessage:
+            context.user_data['awaiting'] = message.expect_input
+            context.user_data['awaiting_action'] = action if message.expect_input else None
+            return message
+
+        back_menu = ACTION_BACK_MENU.get(action, 'main')
+        await _send_progressive(
+            update, context, user, router.handle_action(action, user, payload), back_menu,
+            finish=_await_input, idempotent=router.is_idempotent(action),
+        )
+        prefetcher.observe(router, user, data)
         return
     if data.startswith('page:'):
         _, key, page = data.split(':', 2)
-        message = await router.handle_action(key, user, page)
-        await _send_ui(update, context, message)
+        skeleton = 'msg.translating' if _is_translate_request(data) else 'msg.loading'
+        back_menu = ACTION_BACK_MENU.get(key, 'main')
+        await _send_progressive(
+            update, context, user, router.handle_action(key, user, page), back_menu,
+            skeleton=skeleton, idempotent=router.is_idempotent(key),
+        )
+        prefetcher.observe(router, user, data)
         return
 
 
@@ -338,20 +441,24 @@ def _is_translate_request(data: str) -> bool:
     )
 
 
+@timed('telegram:handle_message')
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     router: Router = context.bot_data['router']
-    logger.info("Message from user_id=%s text=%s awaiting=%s", update.effective_user.id if update.effective_user else 'unknown', update.message.text if update.message else None, context.user_data.get('awaiting'))
-    if not await rate_limiter.allow(f"tg:{update.effective_user.id}"):
-        return
-    user: UserContext = context.user_data.get('user')
-    if not user:
-        await start(update, context)
+    user_id = update.effective_user.id if update.effective_user else 'unknown'
+    awaiting = context.user_data.get('awaiting')
+    logger.info(
+        "Message from user_id=%s awaiting=%s", user_id, awaiting,
+        extra={'event': 'message', 'user_id': user_id, 'awaiting': awaiting, 'text': update.message.text if update.message else None},
+    )
+    if not await rate_limiter.allow(f"tg:{update.effective_user.id}", _cached_tier(update)):
         return
+    user = await _ensure_user_context(update, context)
 
     text = (update.message.text or '').strip()
     awaiting = context.user_data.get('awaiting')
     if not awaiting:
         return
+    _cancel_pending_render(context)
 
     await _delete_user_message(update, context)
 
@@ -466,8 +573,14 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await _edit_menu_message(update, context, response)
         return
 
+    if awaiting.startswith('admin_') and not is_admin_allowed(user):
+        context.user_data['awaiting'] = None
+        response = _ensure_buttons(user, UIMessage(text=t('msg.admin_required', user.language)), back_menu)
+        await _edit_menu_message(update, context, response)
+        return
+
     if awaiting == 'admin_broadcast':
-        response = UIMessage(text=t('msg.broadcast_queued', user.language))
+        response = await router.queue_broadcast(user, text)
         context.user_data['awaiting'] = None
         response = _ensure_buttons(user, response, back_menu)
         await _edit_menu_message(update, context, response)
@@ -600,10 +713,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     if awaiting == 'stocks_valuation':
         symbol = text.split()[0].upper()
-        response = await router.build_stock_valuation(user, symbol)
         context.user_data['awaiting'] = None
-        response = _ensure_buttons(user, response, back_menu)
-        await _edit_menu_message(update, context, response)
+        await _send_progressive(
+            update,
+            context,
+            user,
+            router.build_stock_valuation(user, symbol),
+            back_menu,
+            finish=lambda response: _ensure_buttons(user, response, back_menu),
+            send=_edit_menu_message,
+        )
         return
 
 
@@ -638,14 +757,140 @@ def _fmt_cap(value: object) -> str:
     return f"${value:,.0f}"
 
 
-def run_telegram() -> None:
+class StateContext(CallbackContext):
+    @property
+    def user_data(self) -> UserState | None:
+        if self._user_id is None:
+            return None
+        return telegram_state.get(self._user_id)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_concurrent_updates: int) -> None:
+        super().__init__(max_concurrent_updates)
+        self._tails: dict[int, asyncio.Future] = {}
+        self.inflight = 0
+        self.waiting = 0
+        self.counters = {'processed': 0, 'serialized': 0, 'max_waiting': 0}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            await super().process_update(update, coroutine)
+            return
+        previous = self._tails.get(user.id)
+        tail = asyncio.get_running_loop().create_future()
+        self._tails[user.id] = tail
+        try:
+            if previous is not None and not previous.done():
+                self.counters['serialized'] += 1
+                self.waiting += 1
+                self.counters['max_waiting'] = max(self.counters['max_waiting'], self.waiting)
+                try:
+                    await asyncio.shield(previous)
+                finally:
+                    self.waiting -= 1
+            await telegram_state.load(user.id)
+            await super().process_update(update, coroutine)
+        finally:
+            tail.set_result(None)
+            if self._tails.get(user.id) is tail:
+                del self._tails[user.id]
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        self.inflight += 1
+        try:
+            await coroutine
+        finally:
+            self.inflight -= 1
+            self.counters['processed'] += 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'inflight': self.inflight, 'waiting': self.waiting, 'users': len(self._tails)}
+
+
+async def _serve_webhook(app: Application, processor: PerUserUpdateProcessor, cfg: Config, stopped: asyncio.Event) -> None:
+    from aiohttp import web
+
+    secret = cfg.telegram_webhook_secret
+    path = urlsplit(cfg.telegram_webhook_url).path or '/telegram'
+
+    async def receive(request: web.Request) -> web.Response:
+        if secret and request.headers.get('X-Telegram-Bot-Api-Secret-Token') != secret:
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), app.bot)
+        except Exception:
+            return web.Response(status=400)
+        await app.update_queue.put(update)
+        return web.Response()
+
+    async def health(_: web.Request) -> web.Response:
+        return web.json_response({'ok': app.running, 'queue': app.update_queue.qsize(), **processor.stats()})
+
+    server = web.Application()
+    server.router.add_post(path, receive)
+    server.router.add_get('/healthz', health)
+    runner = web.AppRunner(server)
+    async with app:
+        await _post_init(app)
+        await app.start()
+        await app.bot.set_webhook(
+            url=cfg.telegram_webhook_url,
+            secret_token=secret or None,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True,
+        )
+        await runner.setup()
+        await web.TCPSite(runner, cfg.telegram_webhook_listen, cfg.telegram_webhook_port).start()
+        logger.info("Telegram webhook listening on %s:%s%s", cfg.telegram_webhook_listen, cfg.telegram_webhook_port, path)
+        try:
+            await stopped.wait()
+        finally:
+            await runner.cleanup()
+            await app.stop()
+            await _post_shutdown(app)
+
+
+_stop: tuple[asyncio.AbstractEventLoop, Callable[[], Any]] | None = None
+
+
+def stop_telegram() -> None:
+    if _stop is not None:
+        loop, stop = _stop
+        loop.call_soon_threadsafe(stop)
+
+
+def run_telegram(mode: str | None = None) -> None:
+    global _stop
     cfg = load_config()
+    mode = mode or cfg.telegram_mode
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     loop.run_until_complete(init_db())
-    app = Application.builder().token(cfg.telegram_bot_token).build()
+    processor = PerUserUpdateProcessor(cfg.telegram_concurrency)
+    builder = (
+        Application.builder()
+        .token(cfg.telegram_bot_token)
+        .concurrent_updates(processor)
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .context_types(ContextTypes(context=StateContext))
+    )
+    if cfg.telegram_api_base_url:
+        builder = builder.base_url(cfg.telegram_api_base_url)
+    app = builder.build()
     app.bot_data['router'] = _build_router()
-    app.bot_data['watch_service'] = watch_service
+    metrics.gauge('telegram_update_queue', app.update_queue.qsize)
+    metrics.gauge('telegram_updates_inflight', lambda: processor.inflight)
+    metrics.gauge('telegram_updates_waiting', lambda: processor.waiting)
+    metrics.gauge('telegram_conversation_states', lambda: telegram_state.stats()['size'])
 
     app.add_handler(CommandHandler('start', start))
     app.add_handler(CommandHandler('menu', menu))
@@ -658,117 +903,77 @@ def run_telegram() -> None:
     app.add_handler(CallbackQueryHandler(handle_callback))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     app.add_error_handler(error_handler)
-    if app.job_queue:
-        app.job_queue.run_repeating(price_watch_job, interval=300, first=20)
 
-    app.run_polling(drop_pending_updates=True, close_loop=False)
-
-
-async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-    logger.exception("Unhandled error", exc_info=context.error)
+    if mode == 'webhook':
+        stopped = asyncio.Event()
+        _stop = (loop, stopped.set)
+        loop.run_until_complete(_serve_webhook(app, processor, cfg, stopped))
+    else:
+        _stop = (loop, app.stop_running)
+        app.run_polling(drop_pending_updates=True, close_loop=False, stop_signals=None)
 
 
-async def price_watch_job(context: ContextTypes.DEFAULT_TYPE) -> None:
-    router: Router = context.application.bot_data['router']
-    watch: WatchService = context.application.bot_data['watch_service']
+def delivery_adapter(bot: Bot) -> DeliveryAdapter:
     cfg = load_config()
-    threshold = cfg.price_alert_pct
-    try:
-        items = await watch.list_watch_items('telegram')
-        if not items:
-            return
-        states = await watch.load_states()
-
-        stock_symbols = sorted({i['symbol'] for i in items if _is_stock_type(i['asset_type'])})
-        crypto_symbols = sorted({i['symbol'] for i in items if _is_crypto_type(i['asset_type'])})
-        forex_pairs = sorted({i['symbol'] for i in items if _is_forex_type(i['asset_type'])})
-
-        stock_prices: dict[str, float | None] = {}
-        crypto_prices: dict[str, float | None] = {}
-        forex_prices: dict[str, float | None] = {}
-
-        if stock_symbols:
-            quotes = await router.stocks.get_quotes_details(stock_symbols)
-            for q in quotes:
-                symbol = str(q.get('symbol') or '').upper()
-                stock_prices[symbol] = q.get('price')
-
-        if crypto_symbols:
-            quotes = await router.crypto.get_quotes(crypto_symbols)
-            for sym, q in quotes.items():
-                crypto_prices[str(sym).upper()] = q.get('price')
-
-        if forex_pairs:
-            fx = await router.forex.get_pairs_changes(forex_pairs)
-            for item in fx:
-                pair = str(item.get('pair') or '').upper()
-                forex_prices[pair] = item.get('rate')
-
-        for item in items:
-            user_id = int(item['user_id'])
-            chat_id = int(item['platform_user_id'])
-            lang = str(item.get('language') or 'ru')
-            asset_type = str(item['asset_type']).lower()
-            symbol = str(item['symbol']).upper()
-
-            price = None
-            if _is_stock_type(asset_type):
-                price = stock_prices.get(symbol)
-            elif _is_crypto_type(asset_type):
-                price = crypto_prices.get(symbol)
-            elif _is_forex_type(asset_type):
-                price = forex_prices.get(symbol)
-
-            if price is None:
-                continue
-
-            last_price = states.get((user_id, asset_type, symbol))
-            pct = None
-            if last_price and last_price != 0:
-                pct = (price - last_price) / last_price * 100.0
-
-            notified = False
-            if pct is not None and abs(pct) >= threshold:
-                emoji = '📈' if pct >= 0 else '📉'
-                pct_str = f"{pct:+.2f}%"
-                if _is_forex_type(asset_type):
-                    price_str = f"{float(price):.5f}"
-                else:
-                    price_str = _fmt_price_value(price)
-                link = router._link_for_asset(asset_type, symbol)
-                text = f"{emoji} {symbol}: {price_str} ({pct_str})\n{link}"
-                try:
-                    await context.bot.send_message(chat_id=chat_id, text=text)
-                    notified = True
-                except Exception:
-                    notified = False
-
-            await watch.upsert_state(user_id, asset_type, symbol, float(price), notified)
-    except Exception:
-        logger.exception("Price watch job failed")
 
+    async def _send(chat_id: object, text: str) -> None:
+        await bot.send_message(chat_id=chat_id, text=text)
 
-def _fmt_price_value(value: object) -> str:
-    try:
-        if isinstance(value, (int, float)):
-            if value >= 1:
-                return f"${value:,.2f}"
-            return f"${value:,.6f}"
-    except Exception:
-        pass
-    return 'N/A'
-
-
-def _is_stock_type(value: str) -> bool:
-    return value in {'stock', 'stocks', 'equity', 'etf', 'fund', 'funds'}
+    return DeliveryAdapter(
+        'telegram',
+        _send,
+        retry_after=_retry_after,
+        global_rate=cfg.notify_global_rate,
+        chat_rate=cfg.notify_chat_rate,
+        senders=cfg.notify_senders,
+        is_blocked=lambda exc: isinstance(exc, Forbidden),
+    )
 
 
-def _is_crypto_type(value: str) -> bool:
-    return value in {'crypto', 'coin', 'token', 'ton', 'jetton'}
+async def _post_init(app: Application) -> None:
+    telegram_state.start()
+    adapter = delivery_adapter(app.bot)
+    adapter.start()
+    engine = shared_engine(app.bot_data['router'])
+    engine.register(adapter)
+    app.bot_data['watch_engine'] = engine
+    app.bot_data['notifier'] = adapter.dispatcher
+    if load_config().background_jobs:
+        loop = asyncio.get_running_loop()
+        if engine.claim_driver('telegram', lambda: loop.call_soon_threadsafe(_start_jobs, app)):
+            _start_jobs(app)
+
+
+def _start_jobs(app: Application) -> None:
+    jobs = JobRunner()
+    app.bot_data['watch_engine'].schedule(jobs)
+    jobs.start()
+    app.bot_data['jobs'] = jobs
+
+
+async def _post_shutdown(app: Application) -> None:
+    jobs: JobRunner | None = app.bot_data.pop('jobs', None)
+    if jobs:
+        await jobs.stop()
+    engine: WatchEngine | None = app.bot_data.get('watch_engine')
+    if engine:
+        engine.release_driver('telegram')
+    adapter = engine.adapters.get('telegram') if engine else None
+    if adapter:
+        engine.unregister('telegram')
+        await adapter.stop()
+    await telegram_state.stop()
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    if isinstance(exc, RetryAfter):
+        value = exc.retry_after
+        return float(value.total_seconds()) if hasattr(value, 'total_seconds') else float(value)
+    return None
 
 
-def _is_forex_type(value: str) -> bool:
-    return value in {'forex', 'fx'}
+async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+    logger.exception("Unhandled error", exc_info=context.error)
 
 
 if __name__ == '__main__':
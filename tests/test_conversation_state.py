@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import asyncio
+
+from core.conversation_state import ConversationStore
+
+
+class _Service:
+    def __init__(self) -> None:
+        self.saved: dict[str, str] = {}
+
+    async def load(self, platform: str, user_id: str) -> str | None:
+        return self.saved.get(user_id)
+
+    async def save_many(self, platform: str, rows: list[tuple[str, str]]) -> None:
+        self.saved.update(rows)
+
+
+def test_only_persisted_keys_survive_a_reload():
+    service = _Service()
+    store = ConversationStore('telegram', service=service)
+    state = store.get(1)
+    state['awaiting'] = 'portfolio_add'
+    state['scratch'] = 'not persisted'
+    asyncio.run(store.flush())
+    fresh = ConversationStore('telegram', service=service)
+    restored = asyncio.run(fresh.load(1))
+    assert dict(restored) == {'awaiting': 'portfolio_add'}
+
+
+def test_eviction_keeps_dirty_entries_and_drops_oldest_clean():
+    store = ConversationStore('telegram', service=_Service(), maxsize=3)
+    for user_id in (1, 2, 3):
+        store.get(user_id)
+    store.get(1)['awaiting'] = 'x'
+    store.get(4)
+    store.get(5)
+    assert list(store._entries) == [1, 4, 5]
+    assert store.counters['evicted'] == 2
+    asyncio.run(store.flush())
+    store.get(6)
+    assert list(store._entries) == [4, 5, 6]
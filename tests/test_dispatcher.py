@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+
+from core import dispatcher
+from core.dispatcher import MAX_MESSAGE_LEN, NotificationDispatcher, TokenBucket, _chunks
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(2.0, burst=2.0)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == 0.5
+    assert bucket.reserve(now + 1.0) == 0.0
+    assert bucket.reserve(now + 1.0) == 0.5
+
+
+def test_chunks_join_lines_up_to_the_limit():
+    assert _chunks(['a', 'b']) == ['a\n\nb']
+    half = 'x' * (MAX_MESSAGE_LEN // 2)
+    assert _chunks([half, half, 'y']) == [half, f'{half}\n\ny']
+
+
+def test_chunks_truncate_every_long_line():
+    long = 'z' * (MAX_MESSAGE_LEN + 50)
+    chunks = _chunks([long, 'short', long])
+    assert all(len(chunk) <= MAX_MESSAGE_LEN for chunk in chunks)
+    assert chunks == [long[:MAX_MESSAGE_LEN], 'short', long[:MAX_MESSAGE_LEN]]
+
+
+def test_chat_buckets_are_capped_lru(monkeypatch):
+    monkeypatch.setattr(dispatcher, 'MAX_CHAT_BUCKETS', 3)
+    sent: list[tuple[object, str]] = []
+
+    async def send(chat_id: object, text: str) -> None:
+        sent.append((chat_id, text))
+
+    async def scenario() -> NotificationDispatcher:
+        notify = NotificationDispatcher(send, global_rate=1000, coalesce_delay=0)
+        for chat_id in [1, 2, 3, 1, 4]:
+            notify.submit(chat_id, f'hi {chat_id}')
+            await notify._deliver(notify._queue.get_nowait())
+        return notify
+
+    notify = asyncio.run(scenario())
+    assert len(sent) == 5
+    assert list(notify._chat_buckets) == [3, 1, 4]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from string import Formatter
+
+import pytest
+
+from core import i18n
+from core.i18n import TRANSLATIONS, Template, compile_template, normalize_lang, t
+
+
+def _fields(text: str) -> set[str]:
+    return {field for _, field, _, _ in Formatter().parse(text) if field}
+
+
+def test_catalogs_have_the_same_keys_and_fields():
+    en, ru = TRANSLATIONS['en'], TRANSLATIONS['ru']
+    assert set(en) == set(ru)
+    for key, text in en.items():
+        assert _fields(text) == _fields(ru[key]), key
+
+
+@pytest.mark.parametrize('lang', ['en', 'ru'])
+def test_compiled_templates_match_str_format(lang):
+    for key, text in TRANSLATIONS[lang].items():
+        kwargs = {field: f'<{field}>' for field in _fields(text)}
+        assert t(key, lang, **kwargs) == text.format(**kwargs), key
+
+
+def test_compile_template_shapes():
+    assert compile_template('plain') == 'plain'
+    assert compile_template('{{literal}}') == '{literal}'
+    template = compile_template('Hi {name}, {count} left')
+    assert isinstance(template, Template)
+    assert template.render({'name': 'Ann', 'count': 3}) == 'Hi Ann, 3 left'
+    assert compile_template('{price:.2f}') == '{price:.2f}'
+    assert compile_template('{broken') == '{broken'
+
+
+def test_missing_field_returns_raw_text():
+    template = compile_template('Hi {name}')
+    assert template.render({}) == 'Hi {name}'
+
+
+def test_lookup_fallbacks():
+    assert t('no.such.key') == 'no.such.key'
+    assert t('msg.action_failed', 'xx') == t('msg.action_failed', 'en')
+    assert t('msg.action_failed', '../etc') == t('msg.action_failed', 'en')
+
+
+@pytest.mark.parametrize('lang', [None, 7])
+def test_non_string_lang_falls_back_to_english(lang):
+    assert t('msg.action_failed', lang) == t('msg.action_failed', 'en')
+
+
+def test_locale_file_is_loaded_lazily(tmp_path, monkeypatch):
+    (tmp_path / 'de.json').write_text(
+        json.dumps({'msg.action_failed': 'Etwas ist schiefgelaufen.', 'main.intro': 'Hallo {username}! Stufe: {tier}'}),
+        encoding='utf-8',
+    )
+    monkeypatch.setattr(i18n, 'LOCALE_DIR', tmp_path)
+    monkeypatch.setattr(i18n, 'TRANSLATIONS', dict(TRANSLATIONS))
+    monkeypatch.setattr(i18n, '_catalogs', dict(i18n._catalogs))
+    assert t('msg.action_failed', 'de') == 'Etwas ist schiefgelaufen.'
+    assert t('main.intro', 'de', username='Ann', tier='Pro') == 'Hallo Ann! Stufe: Pro'
+    assert t('msg.admin_required', 'de') == t('msg.admin_required', 'en')
+    assert 'de' in i18n._catalogs
+
+
+@pytest.mark.parametrize(
+    ('code', 'lang'),
+    [(None, 'ru'), ('', 'ru'), ('en-US', 'en'), ('RU', 'ru'), ('de', 'ru')],
+)
+def test_normalize_lang(code, lang):
+    assert normalize_lang(code) == lang
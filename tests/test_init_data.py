@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from mini_app.backend.main import InitDataVerifier
+
+TOKEN = '123456:test-token'
+
+
+def _sign(fields: dict[str, str], token: str = TOKEN) -> str:
+    secret = hmac.new(b'WebAppData', token.encode(), hashlib.sha256).digest()
+    check_string = '\n'.join(f'{k}={fields[k]}' for k in sorted(fields))
+    digest = hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode({**fields, 'hash': digest})
+
+
+def _fields(auth_date: float | None = None) -> dict[str, str]:
+    user = json.dumps({'id': 42, 'username': 'ann', 'language_code': 'en'})
+    return {'auth_date': str(int(auth_date or time.time())), 'query_id': 'q1', 'user': user}
+
+
+def test_valid_init_data():
+    user = InitDataVerifier(TOKEN).verify(_sign(_fields()))
+    assert user is not None
+    assert (user.user_id, user.username, user.language) == ('42', 'ann', 'en')
+
+
+@pytest.mark.parametrize('init_data', ['', 'auth_date=1&user=%7B%7D', 'hash=abc'])
+def test_missing_or_bad_hash(init_data):
+    assert InitDataVerifier(TOKEN).verify(init_data) is None
+
+
+def test_tampered_field_is_rejected():
+    signed = _sign(_fields())
+    assert InitDataVerifier(TOKEN).verify(signed.replace('q1', 'q2')) is None
+
+
+def test_other_bot_token_is_rejected():
+    assert InitDataVerifier(TOKEN).verify(_sign(_fields(), token='999:other')) is None
+
+
+def test_expired_init_data():
+    verifier = InitDataVerifier(TOKEN, max_age=60)
+    assert verifier.verify(_sign(_fields(time.time() - 120))) is None
+    assert InitDataVerifier(TOKEN, max_age=0).verify(_sign(_fields(time.time() - 120))) is not None
+
+
+def test_cached_entry_still_expires(monkeypatch):
+    verifier = InitDataVerifier(TOKEN, max_age=60)
+    signed = _sign(_fields())
+    assert verifier.verify(signed) is not None
+    calls = []
+    monkeypatch.setattr(verifier, '_check', lambda init_data: calls.append(init_data))
+    assert verifier.verify(signed) is not None
+    assert calls == []
+    later = time.time() + 120
+    monkeypatch.setattr('mini_app.backend.main.time.time', lambda: later)
+    assert verifier.verify(signed) is None
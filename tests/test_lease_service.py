@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from database import init_db
+from services.lease_service import LeaseService
+
+
+@pytest.fixture
+def leases(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "leases.db"}')
+    asyncio.run(init_db())
+    return LeaseService()
+
+
+def test_acquire_is_exclusive_until_expiry(leases):
+    async def scenario():
+        token = await leases.acquire('tick', 'a', 30)
+        assert token == 1
+        assert await leases.acquire('tick', 'b', 30) is None
+        assert await leases.acquire('tick', 'a', 30) == token
+        assert await leases.check('tick', 'a', token)
+        assert not await leases.check('tick', 'b', token)
+
+    asyncio.run(scenario())
+
+
+def test_renew_requires_current_token(leases):
+    async def scenario():
+        token = await leases.acquire('tick', 'a', 30)
+        assert await leases.renew('tick', 'a', token, 30)
+        assert not await leases.renew('tick', 'a', token + 1, 30)
+        assert not await leases.renew('tick', 'b', token, 30)
+
+    asyncio.run(scenario())
+
+
+def test_takeover_bumps_fencing_token(leases):
+    async def scenario():
+        first = await leases.acquire('tick', 'a', 30)
+        await leases.release('tick', 'a')
+        assert not await leases.check('tick', 'a', first)
+        assert not await leases.renew('tick', 'a', first, 30)
+        second = await leases.acquire('tick', 'b', 30)
+        assert second == first + 1
+        assert not await leases.check('tick', 'a', first)
+        assert await leases.acquire('tick', 'a', 30) is None
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_can_be_taken(leases):
+    async def scenario():
+        first = await leases.acquire('tick', 'a', -1)
+        assert await leases.acquire('tick', 'b', 30) == first + 1
+        assert await leases.acquire('other', 'a', 30) == 1
+
+    asyncio.run(scenario())
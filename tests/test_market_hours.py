@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from core.market_hours import CLOSED, EXTENDED, OPEN, PollScheduler, exchange_for, market_status, us_holidays
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_exchange_for_suffix():
+    assert exchange_for('AAPL').code == 'US'
+    assert exchange_for('VOD.L').code == 'L'
+    assert exchange_for('BRK.B').code == 'US'
+
+
+@pytest.mark.parametrize(
+    ('now', 'status'),
+    [
+        (_utc(2024, 3, 12, 15, 0), OPEN),
+        (_utc(2024, 3, 12, 12, 0), EXTENDED),
+        (_utc(2024, 3, 12, 22, 0), EXTENDED),
+        (_utc(2024, 3, 13, 2, 0), CLOSED),
+        (_utc(2024, 3, 16, 15, 0), CLOSED),
+        (_utc(2024, 7, 4, 15, 0), CLOSED),
+    ],
+)
+def test_us_equity_status(now, status):
+    assert market_status('stock', 'AAPL', now) == status
+
+
+def test_other_exchanges_use_local_time():
+    assert market_status('stock', 'VOD.L', _utc(2024, 1, 10, 9, 0)) == OPEN
+    assert market_status('stock', 'VOD.L', _utc(2024, 1, 10, 17, 0)) == CLOSED
+    assert market_status('stock', '7203.T', _utc(2024, 1, 10, 1, 0)) == OPEN
+
+
+def test_crypto_and_forex_sessions():
+    assert market_status('crypto', 'BTC', _utc(2024, 3, 16, 12, 0)) == OPEN
+    assert market_status('forex', 'EURUSD', _utc(2024, 3, 13, 12, 0)) == OPEN
+    assert market_status('forex', 'EURUSD', _utc(2024, 3, 15, 22, 0)) == CLOSED
+    assert market_status('forex', 'EURUSD', _utc(2024, 3, 16, 12, 0)) == CLOSED
+    assert market_status('forex', 'EURUSD', _utc(2024, 3, 17, 22, 0)) == OPEN
+
+
+def test_us_holidays():
+    days = us_holidays(2024)
+    assert date(2024, 1, 15) in days
+    assert date(2024, 3, 29) in days
+    assert date(2024, 11, 28) in days
+    assert date(2024, 6, 19) in days
+    assert date(2021, 12, 31) not in us_holidays(2022)
+    assert date(2021, 6, 18) not in us_holidays(2021)
+
+
+def test_interval_scales_with_heat_and_watchers():
+    scheduler = PollScheduler(base_interval=300, hot_interval=30, threshold=2.0, popular_watchers=10)
+    assert scheduler.interval(CLOSED, 1, {}) is None
+    assert scheduler.interval(OPEN, 1, {}) == 300
+    assert scheduler.interval(EXTENDED, 1, {}) == 600
+    assert scheduler.interval(OPEN, 1, {'5m': 0.6}) == 150
+    assert scheduler.interval(OPEN, 1, {'5m': -1.2}) == 75
+    assert scheduler.interval(OPEN, 1, {'5m': 2.5}) == 30
+    assert scheduler.interval(OPEN, 100, {}) < 300
+
+
+def test_wide_daily_range_alone_is_not_hot():
+    scheduler = PollScheduler(base_interval=300, hot_interval=30, threshold=1.0, windows={'5m': 300, '1h': 3600, '24h': 86400})
+    assert scheduler.heat_window == '5m'
+    assert scheduler.interval(OPEN, 1, {'5m': 0.1, '1h': 2.0, '24h': -6.5}) == 300
+    assert scheduler.interval(OPEN, 1, {'24h': 12.0}) == 300
+    assert scheduler.interval(OPEN, 1, {'5m': 1.5, '24h': 12.0}) == 30
+
+
+def test_due_skips_closed_and_recently_polled():
+    scheduler = PollScheduler(base_interval=300, hot_interval=30)
+    now = _utc(2024, 3, 16, 15, 0).timestamp()
+    keys = {('crypto', 'BTC'): 1, ('stock', 'AAPL'): 1}
+    assert scheduler.due(keys, lambda kind, symbol: {}, now) == [('crypto', 'BTC')]
+    assert scheduler.due(keys, lambda kind, symbol: {}, now + 60) == []
+    assert scheduler.due(keys, lambda kind, symbol: {}, now + 300) == [('crypto', 'BTC')]
+    stats = scheduler.stats()
+    assert stats['polled'] == 2
+    assert stats['skipped_closed'] == 3
+    assert stats['tracked'] == 2
+    scheduler.due({}, lambda kind, symbol: {}, now + 400)
+    assert scheduler.stats()['tracked'] == 0
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+
+from core.permissions import UserContext
+from core.prefetch import Prefetcher, parse_callback
+from core.shared_limits import MemoryLimitStore, ProviderQuota
+from core.ui import ScreenCache, UIMessage
+
+KEY = ('stocks_price', 'AAPL')
+USER = UserContext(platform='telegram', user_id='1', username=None, tier='free', language='en', is_admin=False)
+
+
+class _Router:
+    def __init__(self, cache: ScreenCache, quota: ProviderQuota) -> None:
+        self.cache = cache
+        self.quota = quota
+
+    async def prefetch(self, action: str, user: UserContext, payload: str | None = None) -> bool:
+        await self.cache.get_or_render(KEY, 60, self.render, speculative=True)
+        return True
+
+    async def render(self) -> UIMessage:
+        # Mirrors the services, which turn provider errors into placeholders.
+        try:
+            await self.quota.acquire('https://api.example.com/quote')
+            return UIMessage(text='AAPL 190.00')
+        except Exception:
+            return UIMessage(text='AAPL N/A')
+
+
+def _setup() -> tuple[Prefetcher, ScreenCache, _Router]:
+    cache = ScreenCache()
+    quota = ProviderQuota(MemoryLimitStore(), limits={'api.example.com': (1, 60.0)})
+    return Prefetcher(), cache, _Router(cache, quota)
+
+
+def test_parse_callback():
+    assert parse_callback('action:stocks_price:AAPL') == ('stocks_price', 'AAPL')
+    assert parse_callback('action:market_overview') == ('market_overview', None)
+    assert parse_callback('page:news:2') == ('news', '2')
+    assert parse_callback('menu:main') is None
+
+
+def test_prefetch_warms_cache():
+    prefetcher, cache, router = _setup()
+    asyncio.run(prefetcher._warm(router, USER, 'u', 'stocks_price', 'AAPL'))
+    assert prefetcher.counters['warmed'] == 1
+    assert cache.fresh(KEY)
+
+
+def test_prefetch_under_quota_pressure_caches_nothing():
+    prefetcher, cache, router = _setup()
+
+    async def scenario() -> UIMessage:
+        await router.quota.acquire('https://api.example.com/quote')
+        await prefetcher._warm(router, USER, 'u', 'stocks_price', 'AAPL')
+        return await cache.get_or_render(KEY, 60, router.render)
+
+    message = asyncio.run(scenario())
+    assert prefetcher.counters['quota'] == 1
+    assert prefetcher.counters['warmed'] == 0
+    assert message.text == 'AAPL N/A'
+    assert not cache.fresh(KEY)
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from core.price_windows import PriceWindowBook, RingWindow, parse_windows
+
+
+def test_parse_windows_units_and_fallback():
+    assert parse_windows('5m, 1h,90s,2d') == {'5m': 300.0, '1h': 3600.0, '90s': 90.0, '2d': 172800.0}
+    assert parse_windows('bogus,,0m') == parse_windows('5m,1h,24h')
+
+
+def test_window_with_span_sized_polls_holds_two_points():
+    ring = RingWindow(300)
+    ring.push(0.0, 100.0)
+    ring.push(301.0, 103.0)
+    assert len(ring) == 2
+    assert ring.move_pct() == pytest.approx(3.0)
+
+
+def test_window_keeps_newest_sample_within_a_slot():
+    ring = RingWindow(3600, slots=10)
+    ring.push(0.0, 100.0)
+    ring.push(400.0, 101.0)
+    ring.push(450.0, 90.0)
+    assert len(ring) == 2
+    assert ring.last_price == 90.0
+    assert ring.low() == 90.0
+    assert ring.high() == 101.0
+
+
+def test_jittered_polls_are_not_dropped():
+    ring = RingWindow(86400)
+    ts = 0.0
+    for i in range(100):
+        ts += 299.0 if i % 2 else 301.0
+        ring.push(ts, 100.0 + i)
+    assert len(ring) >= 50
+    assert ring.last_price == 199.0
+    assert ring.high() == 199.0
+
+
+def test_window_keeps_a_span_old_baseline():
+    ring = RingWindow(600, slots=4)
+    for ts, price in [(0, 100.0), (200, 105.0), (400, 110.0), (600, 120.0), (800, 115.0)]:
+        ring.push(float(ts), price)
+    assert ring.first() == 105.0
+    assert ring.low() == 105.0
+    assert ring.high() == 120.0
+
+
+def test_deques_match_a_full_scan():
+    rng = random.Random(7)
+    ring = RingWindow(600, slots=8)
+    slots: list[list[float]] = []
+    ts = 0.0
+    for _ in range(2000):
+        ts += rng.choice([10.0, 40.0, 90.0, 200.0])
+        price = rng.uniform(50.0, 150.0)
+        if slots and ts - slots[-1][0] < ring.resolution:
+            slots[-1][1:] = [min(slots[-1][1], price), max(slots[-1][2], price)]
+        else:
+            slots.append([ts, price, price])
+        ring.push(ts, price)
+        window = slots[-len(ring):]
+        assert ring.low() == min(price, *(lo for _, lo, _ in window))
+        assert ring.high() == max(price, *(hi for _, _, hi in window))
+
+
+def test_move_pct_prefers_largest_swing():
+    ring = RingWindow(3600, slots=60)
+    for ts, price in [(0, 100.0), (600, 80.0), (1200, 100.0)]:
+        ring.push(float(ts), price)
+    assert ring.move_pct() == pytest.approx(25.0)
+
+
+def test_book_fires_once_per_window_span():
+    book = PriceWindowBook({'5m': 300.0})
+    book.update('crypto', 'BTC', 0.0, 100.0)
+    book.update('crypto', 'BTC', 300.0, 110.0)
+    move = book.check(1, 'crypto', 'BTC', 5.0, now=300.0)
+    assert move is not None and move.window == '5m' and move.price == 110.0
+    assert book.check(1, 'crypto', 'BTC', 5.0, now=310.0) is None
+    assert book.check(2, 'crypto', 'BTC', 50.0, now=310.0) is None
+    book.prune(set(), set())
+    assert book.moves('crypto', 'BTC') == {}
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+
+from core.ratelimit import RateLimiter
+
+
+def test_burst_then_reject(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('core.ratelimit.time.monotonic', lambda: now[0])
+    limiter = RateLimiter(max_requests=4, window_seconds=4)
+    assert [limiter.check('a') for _ in range(5)] == [True, True, True, True, False]
+    now[0] += 1.0
+    assert limiter.check('a')
+    assert not limiter.check('a')
+    assert limiter.check('b')
+
+
+def test_tier_multiplier_raises_burst():
+    limiter = RateLimiter(max_requests=3, window_seconds=10)
+    assert sum(limiter.check('free') for _ in range(20)) == 3
+    assert sum(limiter.check('pro', 'pro') for _ in range(20)) == 6
+    assert sum(limiter.check('elite', 'elite') for _ in range(20)) == 12
+    stats = limiter.stats()
+    assert stats['rejected_by_tier'] == {'free': 17, 'pro': 14, 'elite': 8}
+    assert stats['allowed'] == 21
+
+
+def test_eviction_caps_keys_per_shard():
+    limiter = RateLimiter(max_requests=1, window_seconds=60, shards=1, max_keys=10)
+    for i in range(50):
+        limiter.check(f'user-{i}')
+    stats = limiter.stats()
+    assert stats['keys'] <= 10
+    assert stats['evicted'] >= 40
+
+
+def test_counters_are_consistent_across_threads():
+    limiter = RateLimiter(max_requests=1000, window_seconds=1, shards=4)
+
+    def hammer(offset: int) -> None:
+        for i in range(2000):
+            limiter.check(f'k{(offset + i) % 64}')
+
+    threads = [threading.Thread(target=hammer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = limiter.stats()
+    assert stats['allowed'] + stats['rejected'] == 16000